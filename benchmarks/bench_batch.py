@@ -0,0 +1,100 @@
+""" Throughput of analyzing many small pools: a Python loop over StudyPool.summarize() against one
+    PoolBatch built from the same pools, and from the raw arrays as a simulation would produce them.
+    Caches are cleared before every timed run, so each pool is analyzed from its store.
+
+    On a single core, with 1000 and 10000 pools of 5 to 50 outcomes, from_pools runs about 5-15x
+    faster than the loop (up to about 20x for REML) and from_arrays about 15-41x. from_pools is
+    bounded by reading each pool's store in Python, a few microseconds per pool.
+
+    Results are written as JSON in the same layout as bench_pool.py, so runs on different commits
+    can be compared with its --compare option.
+
+    Usage: python benchmarks/bench_batch.py [--pools 1000 10000] [--min-k 5] [--max-k 50] [--output results.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path[:0] = [os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')]
+
+import numpy as np  # noqa: E402
+from bench_pool import clear, environment  # noqa: E402
+from meta_analysis.PoolBatch import PoolBatch  # noqa: E402
+from meta_analysis.Study import Study  # noqa: E402
+from meta_analysis.StudyPool import StudyPool  # noqa: E402
+from meta_analysis.outcomes.Outcome import Outcome  # noqa: E402
+
+POOLS = [1000, 10000]
+ANALYSES = [('fe', 'DL'), ('re', 'DL'), ('re', 'REML'), ('auto', 'DL')]
+
+
+def make_pools(n_pools, min_k, max_k, seed=0):
+    """ Pools of between min_k and max_k pre-estimated outcomes of one label.
+
+    :return: (list, list, list) pools, effect size arrays, variance arrays
+    """
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(min_k, max_k + 1, n_pools)
+    effect_sizes = [rng.normal(0.2, 0.2, k) + rng.normal(0, 0.1) for k in sizes]
+    variances = [rng.uniform(0.01, 0.05, k) for k in sizes]
+    pools = [StudyPool([Study('', str(i), outcomes=[Outcome('crime', 30, 30, y, v)])
+                        for i, (y, v) in enumerate(zip(ys.tolist(), vs.tolist()))], outcome_label='crime')
+             for ys, vs in zip(effect_sizes, variances)]
+    for study_pool in pools:
+        study_pool._sync_store()
+    return pools, effect_sizes, variances
+
+
+def best(function, pools, repeats):
+    """ Best wall time of a function over repeats, with cleared caches before each run. """
+    seconds = float('inf')
+    for _ in range(repeats):
+        for study_pool in pools:
+            clear(study_pool)
+        start = time.perf_counter()
+        function()
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds
+
+
+def run(pool_counts=POOLS, min_k=5, max_k=50, repeats=3):
+    """ Time every analysis over each number of pools.
+
+    :return: (list) dicts with benchmark, number of pools (k), seconds and speedup over the loop
+    """
+    results = []
+    for n_pools in pool_counts:
+        pools, effect_sizes, variances = make_pools(n_pools, min_k, max_k)
+        for method, tau_square_estimator in ANALYSES:
+            timings = {
+                'loop': best(lambda: [study_pool.summarize(method, tau_square_estimator) for study_pool in pools],
+                             pools, repeats),
+                'from_pools': best(lambda: PoolBatch.from_pools(pools).result(method, tau_square_estimator),
+                                   pools, repeats),
+                'from_arrays': best(lambda: PoolBatch.from_arrays(effect_sizes, variances).result(
+                    method, tau_square_estimator), pools, repeats),
+            }
+            for name, seconds in timings.items():
+                results.append({'benchmark': f'{name}_{method}_{tau_square_estimator}', 'k': n_pools, 'labels': 1,
+                                'seconds': seconds, 'peak_bytes': 0, 'speedup': timings['loop'] / seconds})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pools', type=int, nargs='+', default=POOLS, help='numbers of pools')
+    parser.add_argument('--min-k', type=int, default=5, help='fewest outcomes per pool')
+    parser.add_argument('--max-k', type=int, default=50, help='most outcomes per pool')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs per benchmark')
+    parser.add_argument('--output', help='JSON file to write results to; printed if omitted')
+    args = parser.parse_args()
+
+    report = dict(environment(), results=run(args.pools, args.min_k, args.max_k, args.repeats))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
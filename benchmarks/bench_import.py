@@ -0,0 +1,79 @@
+""" Start-up cost of the package: wall time of importing it in a fresh interpreter, alone and
+    followed by a fixed effects meta-analysis, and which heavy optional modules got imported.
+
+    Results are written as JSON in the same layout as bench_pool.py, so runs on different commits
+    can be compared with its --compare option.
+
+    Usage: python benchmarks/bench_import.py [--repeats 10] [--output results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from bench_pool import environment
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+HEAVY_MODULES = ['numpy', 'scipy', 'multiprocessing', 'concurrent.futures']
+
+SCRIPTS = {
+    'import': 'import meta_analysis',
+    'import_and_pool_fe': ('from meta_analysis import StudyPool, Study\n'
+                           'from meta_analysis.outcomes import Outcome\n'
+                           'studies = [Study("", str(i), outcomes=[Outcome("crime", 25, 25, 0.1 * i, 0.02)])\n'
+                           '           for i in range(10)]\n'
+                           'StudyPool(studies, outcome_label="crime").meta_analysis(method="fe")'),
+}
+
+TIMER = ('import sys, time, json\n'
+         'start = time.perf_counter()\n'
+         '{script}\n'
+         'seconds = time.perf_counter() - start\n'
+         'print(json.dumps([seconds, [name for name in {heavy!r} if name in sys.modules]]))\n')
+
+
+def measure(script, repeats):
+    """ Median wall time of a script in fresh interpreters, and the heavy modules it imported.
+
+    :param script: (str) Python source to time
+    :param repeats: (int) number of interpreters to start
+    :return: (float, list) median seconds, names of imported heavy modules
+    """
+    times = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', TIMER.format(script=script, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, check=True, cwd=ROOT).stdout
+        seconds, modules = json.loads(output)
+        times.append(seconds)
+    return statistics.median(times), modules
+
+
+def run(repeats=10):
+    """ Time every start-up script.
+
+    :param repeats: (int) number of interpreters started per script
+    :return: (list) dicts with benchmark, seconds and modules
+    """
+    results = []
+    for name, script in SCRIPTS.items():
+        seconds, modules = measure(script, repeats)
+        results.append({'benchmark': name, 'k': 0, 'labels': 0, 'seconds': seconds, 'peak_bytes': 0,
+                        'modules': modules})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=10, help='fresh interpreters per benchmark')
+    parser.add_argument('--output', help='JSON file to write results to; printed if omitted')
+    args = parser.parse_args()
+
+    report = dict(environment(), results=run(args.repeats))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
@@ -0,0 +1,98 @@
+""" Per-instance memory and construction throughput of the Outcome classes, compared with
+    __dict__-backed classes that set the same attributes (the layout before __slots__).
+
+    Usage: python benchmarks/bench_outcomes.py [--n 100000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path[:0] = [os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')]
+
+from meta_analysis.outcomes import Outcome, BinaryOutcome, ContinuousOutcome  # noqa: E402
+
+
+class DictOutcome:
+    _outcome_id_tracker = 0
+
+    def __init__(self, label, treat_n, control_n, effect_size=0.0, variance=float('inf'), note=''):
+        self.label = label
+        self.treat_n = treat_n
+        self.control_n = control_n
+        self.effect_size = effect_size
+        self.variance = variance
+        self.note = note
+        self.method = 'custom'
+        self.id = 0 + DictOutcome._outcome_id_tracker
+        DictOutcome._outcome_id_tracker += 1
+
+
+class DictBinaryOutcome(DictOutcome):
+
+    def __init__(self, label, treat_n, control_n, treat_post, control_post, treat_pre=None, control_pre=None):
+        super().__init__(label, treat_n, control_n)
+        self.treat_post = treat_post
+        self.control_post = control_post
+        self.treat_pre = treat_pre
+        self.control_pre = control_pre
+
+
+class DictContinuousOutcome(DictOutcome):
+
+    def __init__(self, label, treat_n, control_n, treat_post, control_post, treat_post_sd, control_post_sd,
+                 treat_pre=None, control_pre=None, treat_pre_sd=None, control_pre_sd=None):
+        super().__init__(label, treat_n, control_n)
+        self.treat_post = treat_post
+        self.control_post = control_post
+        self.treat_pre = treat_pre
+        self.control_pre = control_pre
+        self.treat_post_sd = treat_post_sd
+        self.control_post_sd = control_post_sd
+        self.treat_pre_sd = treat_pre_sd
+        self.control_pre_sd = control_pre_sd
+
+
+CASES = [('Outcome', Outcome, DictOutcome, ('crime', 25, 25, 0.1, 0.02)),
+         ('BinaryOutcome', BinaryOutcome, DictBinaryOutcome, ('crime', 25, 25, 0.4, 0.3, 0.5, 0.45)),
+         ('ContinuousOutcome', ContinuousOutcome, DictContinuousOutcome,
+          ('crime', 25, 25, 10.0, 9.0, 2.0, 2.1, 8.0, 8.2, 2.2, 2.0))]
+
+
+def measure(cls, args, n):
+    """ Bytes allocated per instance and instances constructed per second. """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [cls(*args) for _ in range(n)]
+    size = (tracemalloc.get_traced_memory()[0] - before) / n
+    tracemalloc.stop()
+    del instances
+    start = time.perf_counter()
+    instances = [cls(*args) for _ in range(n)]
+    rate = n / (time.perf_counter() - start)
+    del instances
+    return size, rate
+
+
+def run(n):
+    """ Measure every Outcome class and its __dict__-backed counterpart.
+
+    :param n: (int) number of instances to construct per measurement
+    :return: (list) dicts with name, layout, bytes per instance and instances per second
+    """
+    results = []
+    for name, slotted, dict_backed, args in CASES:
+        for layout, cls in (('slots', slotted), ('dict', dict_backed)):
+            size, rate = measure(cls, args, n)
+            results.append({'name': name, 'layout': layout, 'bytes_per_instance': size,
+                            'instances_per_second': rate})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=100000, help='instances per measurement')
+    for result in run(parser.parse_args().n):
+        print(f"{result['name']:<18} {result['layout']:<6} {result['bytes_per_instance']:8.1f} bytes/instance "
+              f"{result['instances_per_second']:12,.0f} instances/s")
@@ -0,0 +1,245 @@
+""" Wall time and peak memory of the estimation, pooling and copying hot paths over synthetic pools
+    of k outcomes spread over a number of outcome labels.
+
+    Analyses are timed from cleared caches (running sums and per-label arrays), so they measure
+    a pass over the store rather than a memoized result.
+
+    Results are written as JSON (one record per benchmark, pool size and label count, with the
+    commit they were measured on), so runs on different commits can be compared with --compare.
+
+    Usage: python benchmarks/bench_pool.py [--k 10 1000 100000] [--labels 1 10] [--output results.json]
+                                           [--compare baseline.json] [--tolerance 1.25]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path[:0] = [os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')]
+
+import numpy as np  # noqa: E402
+from meta_analysis.Study import Study  # noqa: E402
+from meta_analysis.StudyPool import StudyPool  # noqa: E402
+from meta_analysis.outcomes import BinaryOutcome, ContinuousOutcome  # noqa: E402
+
+SIZES = [10, 100, 1000, 10 ** 4, 10 ** 5, 10 ** 6]
+LABELS = [1, 10, 100, 1000]
+OUTCOMES_PER_STUDY = 5
+
+
+def make_outcomes(cls, k, labels, rng):
+    """ k unestimated outcomes of one class with random sample sizes and measures, labels assigned in turn. """
+    treat_n = rng.integers(20, 200, k).tolist()
+    control_n = rng.integers(20, 200, k).tolist()
+    if cls is BinaryOutcome:
+        treat, control = rng.uniform(0.2, 0.8, (2, k)).tolist()
+        return [BinaryOutcome(labels[i % len(labels)], treat_n[i], control_n[i], treat[i], control[i])
+                for i in range(k)]
+    treat, control = rng.normal(10, 2, (2, k)).tolist()
+    treat_sd, control_sd = rng.uniform(1, 3, (2, k)).tolist()
+    return [ContinuousOutcome(labels[i % len(labels)], treat_n[i], control_n[i], treat[i], control[i],
+                              treat_sd[i], control_sd[i])
+            for i in range(k)]
+
+
+def make_pool(k, n_labels, seed=0):
+    """ Synthetic pool of k estimated outcomes, half binary and half continuous, spread evenly over
+        n_labels labels, OUTCOMES_PER_STUDY outcomes per study. The first label is registered.
+
+    :param k: (int) number of outcomes
+    :param n_labels: (int) number of outcome labels
+    :param seed: (int) seed of the generator
+    :return: (StudyPool) synthetic pool
+    """
+    rng = np.random.default_rng(seed)
+    labels = [f'outcome{i}' for i in range(n_labels)]
+    binary = make_outcomes(BinaryOutcome, k // 2, labels, rng)
+    continuous = make_outcomes(ContinuousOutcome, k - k // 2, labels, rng)
+    BinaryOutcome.estimate_batch(binary)
+    ContinuousOutcome.estimate_batch(continuous)
+    outcomes = [outcome for pair in zip(binary, continuous) for outcome in pair] + continuous[len(binary):]
+    studies = [Study('', f'study {i // OUTCOMES_PER_STUDY}', outcomes=outcomes[i:i + OUTCOMES_PER_STUDY])
+               for i in range(0, k, OUTCOMES_PER_STUDY)]
+    return StudyPool(studies, outcome_label=labels[0])
+
+
+def clear(study_pool):
+    """ Drop the running sums and cached arrays so the next analysis starts from the store. """
+    study_pool._accumulators = {}
+    study_pool._store._arrays_cache = {}
+
+
+def benchmarks(study_pool, k, seed=0):
+    """ Benchmarks over one pool. setup() prepares untimed state and returns the function to time. """
+    rng = np.random.default_rng(seed)
+    labels = study_pool._store.labels
+    middle = study_pool.studies[len(study_pool.studies) // 2].citation
+
+    def estimate(cls):
+        outcomes = make_outcomes(cls, k, labels, rng)
+        return lambda: [outcome.estimate() for outcome in outcomes]
+
+    def estimate_batch(cls):
+        outcomes = make_outcomes(cls, k, labels, rng)
+        return lambda: cls.estimate_batch(outcomes)
+
+    def set_outcome(label):
+        def run():
+            study_pool.set_outcome(label)
+            return study_pool.effect_sizes
+        return run
+
+    def set_outcome_after_edit():
+        outcome = study_pool.studies[0].outcomes[0]
+        outcome.set_estimate(outcome.effect_size, outcome.variance)
+        return set_outcome(labels[0])
+
+    def meta_analysis(method):
+        study_pool.set_outcome(labels[0])
+        clear(study_pool)
+        return lambda: study_pool.meta_analysis(method=method)
+
+    def calculate_q():
+        study_pool.set_outcome(labels[0])
+        clear(study_pool)
+        return study_pool.calculate_q
+
+    def remove_study_inplace():
+        copy = study_pool.copy()
+        return lambda: copy.remove_study(middle, inplace=True)
+
+    # (name, setup, whether the timed function can be called repeatedly on the same state)
+    return [('BinaryOutcome.estimate', lambda: estimate(BinaryOutcome), True),
+            ('ContinuousOutcome.estimate', lambda: estimate(ContinuousOutcome), True),
+            ('BinaryOutcome.estimate_batch', lambda: estimate_batch(BinaryOutcome), True),
+            ('ContinuousOutcome.estimate_batch', lambda: estimate_batch(ContinuousOutcome), True),
+            ('StudyPool.set_outcome', lambda: set_outcome(labels[-1]), True),
+            ('StudyPool.set_outcome_after_edit', set_outcome_after_edit, False),
+            ('StudyPool.meta_analysis_fe', lambda: meta_analysis('fe'), False),
+            ('StudyPool.meta_analysis_re', lambda: meta_analysis('re'), False),
+            ('StudyPool.meta_analysis_auto', lambda: meta_analysis('auto'), False),
+            ('StudyPool.calculate_q', calculate_q, False),
+            ('StudyPool.copy', lambda: study_pool.copy, True),
+            ('StudyPool.remove_study', lambda: lambda: study_pool.remove_study(middle), True),
+            ('StudyPool.remove_study_inplace', remove_study_inplace, False)]
+
+
+def measure(setup, repeats, reusable=True, min_time=0.05):
+    """ Best wall time per call over repeats, and peak memory allocated during one further call.
+        Fast reusable functions are called in a loop until a repeat takes at least min_time.
+
+    :param setup: (callable) prepares untimed state and returns the function to time
+    :param repeats: (int) number of timed runs
+    :param reusable: (bool) whether the function can be called repeatedly after one setup
+    :param min_time: (float) shortest duration in seconds of one repeat of a reusable function
+    :return: (float, int) seconds per call, peak bytes
+    """
+    seconds = float('inf')
+    for _ in range(repeats):
+        function = setup()
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            function()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if not reusable or elapsed >= min_time:
+                break
+        seconds = min(seconds, elapsed / calls)
+    function = setup()
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def run(sizes=SIZES, label_counts=LABELS, repeats=3, names=None):
+    """ Run every benchmark over a pool of each size and label count. Label counts larger than
+        the number of studies are skipped.
+
+    :param sizes: (list) numbers of outcomes
+    :param label_counts: (list) numbers of outcome labels
+    :param repeats: (int) number of timed runs per benchmark
+    :param names: (list) benchmarks to run; all if None
+    :return: (list) dicts with benchmark, k, labels, seconds and peak_bytes
+    """
+    results = []
+    for k in sizes:
+        for n_labels in label_counts:
+            if n_labels > k // OUTCOMES_PER_STUDY:
+                continue
+            study_pool = make_pool(k, n_labels)
+            for name, setup, reusable in benchmarks(study_pool, k):
+                if names is None or name in names:
+                    seconds, peak = measure(setup, repeats, reusable)
+                    results.append({'benchmark': name, 'k': k, 'labels': n_labels,
+                                    'seconds': seconds, 'peak_bytes': peak})
+    return results
+
+
+def environment():
+    """ Commit and versions the results were measured with. """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine()}
+
+
+def compare(results, baseline, tolerance):
+    """ Match results with a baseline run and flag slowdowns.
+
+    :param results: (list) records from run()
+    :param baseline: (list) records from an earlier run()
+    :param tolerance: (float) ratio of seconds above which a benchmark counts as a regression
+    :return: (list) dicts with benchmark, k, labels, seconds and memory ratios, and a regression flag
+    """
+    previous = {(record['benchmark'], record['k'], record['labels']): record for record in baseline}
+    comparison = []
+    for record in results:
+        before = previous.get((record['benchmark'], record['k'], record['labels']))
+        if before is None:
+            continue
+        ratio = record['seconds'] / before['seconds'] if before['seconds'] > 0 else float('inf')
+        comparison.append({'benchmark': record['benchmark'], 'k': record['k'], 'labels': record['labels'],
+                           'seconds_ratio': ratio,
+                           'peak_bytes_ratio': max(record['peak_bytes'], 1) / max(before['peak_bytes'], 1),
+                           'regression': ratio > tolerance})
+    return comparison
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--k', type=int, nargs='+', default=SIZES, help='numbers of outcomes')
+    parser.add_argument('--labels', type=int, nargs='+', default=LABELS, help='numbers of outcome labels')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs per benchmark')
+    parser.add_argument('--benchmark', nargs='+', help='benchmarks to run; all by default')
+    parser.add_argument('--output', help='JSON file to write results to; printed if omitted')
+    parser.add_argument('--compare', help='JSON file of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help='slowdown ratio reported as a regression by --compare')
+    args = parser.parse_args()
+
+    report = dict(environment(), results=run(args.k, args.labels, args.repeats, args.benchmark))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        comparison = compare(report['results'], baseline['results'], args.tolerance)
+        for record in comparison:
+            print(f"{record['benchmark']:<34} k={record['k']:<8} labels={record['labels']:<5} "
+                  f"time x{record['seconds_ratio']:.2f} memory x{record['peak_bytes_ratio']:.2f}"
+                  f"{'  REGRESSION' if record['regression'] else ''}", file=sys.stderr)
+        sys.exit(1 if any(record['regression'] for record in comparison) else 0)
@@ -1,2 +0,0 @@
-from .Study import Study
-from .StudyPool import StudyPool
\ No newline at end of file
@@ -0,0 +1,170 @@
+import csv
+import json
+import math
+from statistics import NormalDist
+import numpy as np
+from .MetaSummary import MetaSummary
+from .PublicationBias import PublicationBias
+from .estimators import TauSquareEstimator
+
+
+class BatchRunner:
+    """ Runs a meta-analysis of every outcome label of a pool, for batch jobs over thousands of
+        labels. Labels are grouped into chunks; the labels of a chunk are summarized together
+        with one segmented MetaSummary, and the requested publication bias diagnostics are run
+        per label. Chunks can be spread over a process pool, and results are yielded as each
+        chunk finishes, with at most a few chunks per worker in flight, so memory does not grow
+        with the number of labels.
+
+    Attributes:
+        method (str) random effects if 're', fixed effects if 'fe', chosen per label from its Q test if 'auto'
+        tau_square_estimator (str) between-study variance estimator
+        diagnostics (list) publication bias diagnostics to run per label, from diagnostic_columns
+        alpha (float) confidence intervals have coverage 1 - alpha
+        n_jobs (int) number of worker processes; 1 runs every chunk in the calling process
+        chunk_size (int) number of labels analyzed per task
+    """
+
+    columns = ['label', 'k', 'method', 'effect_size', 'variance', 'ci_lower', 'ci_upper', 'q', 'dof', 'p',
+               'tau_square', 'i_square', 'tau_square_estimator']
+    diagnostic_columns = {'egger': ['egger_intercept', 'egger_p'],
+                          'begg': ['begg_tau', 'begg_p'],
+                          'trim_and_fill': ['trim_and_fill_k0', 'trim_and_fill_effect_size'],
+                          'pet_peese': ['pet_peese_method', 'pet_peese_effect_size']}
+    # publication bias diagnostics need a slope and its residual variance
+    _min_diagnostic_k = 3
+
+    def __init__(self, method='auto', tau_square_estimator='DL', diagnostics=(), alpha=0.05, n_jobs=1,
+                 chunk_size=64):
+        """
+        :param method: (str) 're', 'fe' or 'auto'
+        :param tau_square_estimator: (str) 'DL', 'REML', 'ML', 'PM' or 'SJ'
+        :param diagnostics: (list) any of 'egger', 'begg', 'trim_and_fill', 'pet_peese'
+        :param alpha: (float) confidence intervals have coverage 1 - alpha
+        :param n_jobs: (int) number of worker processes
+        :param chunk_size: (int) number of labels analyzed per task
+        """
+        assert method in ('fe', 're', 'auto'), "method must be 'fe', 're' or 'auto'"
+        unknown = set(diagnostics) - set(self.diagnostic_columns)
+        assert not unknown, f'unknown diagnostics {sorted(unknown)}'
+        TauSquareEstimator.from_name(tau_square_estimator)
+        self.method = method
+        self.tau_square_estimator = tau_square_estimator
+        self.diagnostics = list(diagnostics)
+        self.alpha = alpha
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+
+    @property
+    def fields(self):
+        """ Names of the fields of every result row, in order. """
+        return self.columns + [column for name in self.diagnostics for column in self.diagnostic_columns[name]]
+
+    def run(self, study_pool, labels=None):
+        """ Analyze every label of a pool.
+
+        :param study_pool: (StudyPool) pool to analyze
+        :param labels: (list) outcome labels to analyze; defaults to every label with at least one outcome
+        :return: (generator) one dict per label with the keys in fields, in order of completion
+        """
+        study_pool._sync_store()
+        labels, effect_sizes, variances, offsets = study_pool._store.segments(labels)
+        tasks = []
+        for start in range(0, len(labels), self.chunk_size):
+            stop = min(start + self.chunk_size, len(labels))
+            rows = slice(offsets[start], offsets[stop])
+            tasks.append((labels[start:stop], effect_sizes[rows], variances[rows],
+                          offsets[start:stop + 1] - offsets[start]))
+        if self.n_jobs == 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield from self._analyze(*task)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+        tasks = iter(tasks)
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+            pending = set()
+            while True:
+                for task in tasks:
+                    pending.add(executor.submit(self._analyze, *task))
+                    if len(pending) >= 2 * self.n_jobs:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+
+    def _analyze(self, labels, effect_sizes, variances, offsets):
+        """ Summary statistics and diagnostics of one chunk of labels.
+
+        :return: (list) one result dict per label
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            summary = MetaSummary.from_segments(effect_sizes, variances, offsets)
+            result = summary.result(method=self.method, tau_square_estimator=self.tau_square_estimator)
+        critical_value = NormalDist().inv_cdf(1 - self.alpha / 2)
+        rows = []
+        for i, label in enumerate(labels):
+            margin = critical_value * math.sqrt(result.variance[i])
+            row = {'label': label, 'k': int(summary.k[i]), 'method': str(result.method[i]),
+                   'effect_size': float(result.effect_size[i]), 'variance': float(result.variance[i]),
+                   'ci_lower': float(result.effect_size[i] - margin), 'ci_upper': float(result.effect_size[i] + margin),
+                   'q': float(result.q[i]), 'dof': int(result.dof[i]), 'p': float(result.p[i]),
+                   'tau_square': float(result.tau_square[i]), 'i_square': float(result.i_square[i]),
+                   'tau_square_estimator': result.tau_square_estimator}
+            if self.diagnostics:
+                rows_of_label = slice(offsets[i], offsets[i + 1])
+                row.update(self._diagnose(effect_sizes[rows_of_label], variances[rows_of_label]))
+            rows.append(row)
+        return rows
+
+    def _diagnose(self, effect_sizes, variances):
+        """ Requested publication bias diagnostics of one label; nan if it has too few outcomes. """
+        values = {column: math.nan for name in self.diagnostics for column in self.diagnostic_columns[name]}
+        if effect_sizes.size < self._min_diagnostic_k:
+            return values
+        bias = PublicationBias(effect_sizes, variances)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if 'egger' in self.diagnostics:
+                egger = bias.egger()
+                values.update(egger_intercept=float(egger.intercept), egger_p=float(egger.p))
+            if 'begg' in self.diagnostics:
+                begg = bias.begg()
+                values.update(begg_tau=float(begg.tau), begg_p=float(begg.p))
+            if 'trim_and_fill' in self.diagnostics:
+                method = 're' if self.method == 're' else 'fe'
+                filled = bias.trim_and_fill(method=method, tau_square_estimator=self.tau_square_estimator)
+                values.update(trim_and_fill_k0=int(filled.k0), trim_and_fill_effect_size=float(filled.effect_size))
+            if 'pet_peese' in self.diagnostics:
+                pet_peese = bias.pet_peese(alpha=self.alpha)
+                values.update(pet_peese_method=pet_peese.method, pet_peese_effect_size=float(pet_peese.effect_size))
+        return values
+
+    def write(self, rows, file, output_format='csv'):
+        """ Write result rows to an open text file as they arrive.
+
+        :param rows: (iterable) result dicts, e.g. from run()
+        :param file: (file) open text file
+        :param output_format: (str) 'csv' for a header row and one line per label, 'jsonl' for one JSON object per line
+        :return: (int) number of rows written
+        """
+        assert output_format in ('csv', 'jsonl'), "output_format must be 'csv' or 'jsonl'"
+        count = 0
+        if output_format == 'csv':
+            writer = csv.DictWriter(file, fieldnames=self.fields)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                # nan is not valid JSON
+                file.write(json.dumps({key: None if isinstance(value, float) and math.isnan(value) else value
+                                       for key, value in row.items()}) + '\n')
+                count += 1
+        return count
+
+    def __repr__(self):
+        return f'BatchRunner(method={self.method!r}, tau_square_estimator={self.tau_square_estimator!r}, ' \
+               f'diagnostics={self.diagnostics}, n_jobs={self.n_jobs})'
@@ -0,0 +1,115 @@
+from collections import namedtuple
+from statistics import NormalDist
+import numpy as np
+from .MetaSummary import MetaSummary
+from .estimators import TauSquareEstimator, DerSimonianLaird
+
+
+CumulativeResult = namedtuple('CumulativeResult',
+                              ['unit', 'method', 'k', 'effect_size', 'variance', 'ci_lower', 'ci_upper',
+                               'q', 'p', 'tau_square', 'i_square'])
+
+
+class Cumulative:
+    """ Cumulative meta-analysis: the pooled estimate after each unit is added, in a given order.
+        A unit is either a single effect size or a contiguous block of effect sizes (e.g. all
+        outcomes of one study). The weighted sums of every partial pool are prefix sums of the
+        per-row weights, so fixed effects estimates, Q, p, DerSimonian-Laird tau-square,
+        I-square and confidence intervals of all partial pools cost one O(k) cumulative sum.
+        Random effects estimates re-weight every partial pool with its own tau-square; that
+        pass is done in blocks of units so memory stays bounded.
+
+    Attributes:
+        effect_sizes (numpy 1d array) effect sizes, in the order they enter the pool
+        variances (numpy 1d array) variances, in the same order
+        offsets (numpy 1d array) rows offsets[i]:offsets[i+1] belong to unit i
+        partial (MetaSummary) summary of each pool made of units 0..i
+
+    References (informal list):
+        Lau, J., Schmid, C. H., & Chalmers, T. C. (1995). Cumulative meta-analysis of clinical trials
+            builds evidence for exemplary medical care. Journal of clinical epidemiology, 48(1), 45-57.
+    """
+
+    _block_elements = 2 ** 20
+
+    def __init__(self, effect_sizes, variances, offsets=None):
+        """
+        :param effect_sizes: (numpy 1d array) effect sizes, in the order they enter the pool
+        :param variances: (numpy 1d array) variances, in the same order
+        :param offsets: (numpy 1d array) unit boundaries; defaults to one unit per effect size
+        """
+        if offsets is None:
+            offsets = np.arange(effect_sizes.size + 1)
+        self.effect_sizes = effect_sizes
+        self.variances = variances
+        self.offsets = offsets
+        ivw = 1 / variances
+        ivw_es = ivw * effect_sizes
+        ends = offsets[1:] - 1
+        sums = [np.cumsum(values)[ends] for values in (ivw, ivw * ivw, ivw_es, ivw_es * effect_sizes)]
+        self.partial = MetaSummary(offsets[1:] - offsets[0], *sums)
+
+    def partial_tau_square(self, tau_square_estimator='DL'):
+        """ Tau-square of each partial pool.
+
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :return: (numpy 1d array) tau-square of units 0..i
+        """
+        estimator = TauSquareEstimator.from_name(tau_square_estimator)
+        if isinstance(estimator, DerSimonianLaird):
+            return self.partial.tau_square
+        # iterative estimators: solve the partial pools as a batch, masking out the rows not yet added
+        tau_square = np.empty(self.partial.k.size)
+        for block, rows in self._blocks():
+            not_added = np.arange(rows)[np.newaxis, :] >= self.offsets[block + 1, np.newaxis]
+            tau_square[block] = estimator.estimate_batch(np.where(not_added, np.nan, self.effect_sizes[:rows]),
+                                                         np.where(not_added, np.nan, self.variances[:rows]))
+        return tau_square
+
+    def result(self, method='fe', tau_square_estimator='DL', alpha=0.05, units=None):
+        """ Pooled estimates after each unit is added.
+
+        :param method: (str) random effects if 're', fixed effects if 'fe'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :param alpha: (float) confidence intervals have coverage 1 - alpha
+        :param units: (list) identifiers of the units, e.g. outcome ids or study citations
+        :return: (CumulativeResult) one array element per unit
+        """
+        assert method in ('fe', 're'), "method must be 'fe' or 're'"
+        if method == 're':
+            tau_square = self.partial_tau_square(tau_square_estimator)
+            sum_w, sum_wy = self._partial_random_effects_sums(tau_square)
+        else:
+            tau_square = np.zeros(self.partial.k.size)
+            sum_w, sum_wy = self.partial.sum_w, self.partial.sum_wy
+        effect_size = sum_wy / sum_w
+        variance = 1 / sum_w
+        margin = NormalDist().inv_cdf(1 - alpha / 2) * np.sqrt(variance)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            i_square = self.partial.i_square
+        return CumulativeResult(units, method, self.partial.k, effect_size, variance,
+                                effect_size - margin, effect_size + margin,
+                                self.partial.q, self.partial.p, tau_square, i_square)
+
+    def _partial_random_effects_sums(self, tau_square):
+        """ Sum of weights and weighted effect sizes of each partial pool, where the pool of
+            units 0..i is weighted with tau_square[i]. """
+        if not np.any(tau_square):
+            return self.partial.sum_w, self.partial.sum_wy
+        sum_w = np.empty(tau_square.size)
+        sum_wy = np.empty(tau_square.size)
+        for block, rows in self._blocks():
+            added = np.arange(rows)[np.newaxis, :] < self.offsets[block + 1, np.newaxis]
+            ivw = np.where(added, 1 / (self.variances[np.newaxis, :rows] + tau_square[block, np.newaxis]), 0)
+            sum_w[block] = ivw.sum(axis=1)
+            sum_wy[block] = ivw @ self.effect_sizes[:rows]
+        return sum_w, sum_wy
+
+    def _blocks(self):
+        """ Unit indices split into blocks whose unit x row matrices stay under _block_elements,
+            each with the number of rows its last partial pool uses. """
+        n_units = self.partial.k.size
+        size = max(1, self._block_elements // max(1, self.effect_sizes.size))
+        for start in range(0, n_units, size):
+            block = np.arange(start, min(start + size, n_units))
+            yield block, self.offsets[block[-1] + 1]
@@ -0,0 +1,148 @@
+import numpy as np
+from .MetaSummary import MetaSummary
+
+
+class Gosh:
+    """ Graphical display of study heterogeneity (GOSH): the fixed effects model fit to every
+        subset of the k effect sizes, or to a random sample of subsets when 2^k - 1 is too large.
+        Subsets are encoded as bitmasks (bit i set if effect size i is included) and evaluated in
+        blocks: the weighted sums of a block are one product of its 0/1 membership matrix with the
+        k x 4 table of per-row weights, from which MetaSummary derives the estimates.
+
+        Blocks can be spread over a process pool. The weight table is placed in shared memory for
+        the workers, and results can be written straight to a .npy file opened as a memory map,
+        so runs over tens of millions of subsets do not hold the output in RAM.
+
+    Attributes:
+        effect_sizes (numpy 1d array) effect sizes
+        variances (numpy 1d array) variances
+        block_size (int) number of subsets evaluated together
+        n_jobs (int) number of worker processes; 1 evaluates blocks in the calling process
+        seed (int) seed of the SeedSequence from which block seeds are spawned when sampling
+
+    References (informal list):
+        Olkin, I., Dahabreh, I. J., & Trikalinos, T. A. (2012). GOSH - a graphical display of study
+            heterogeneity. Research Synthesis Methods, 3(3), 214-223.
+    """
+
+    dtype = np.dtype([('effect_size', np.float64), ('i_square', np.float64), ('k', np.int32)])
+    _max_bits = 63
+
+    def __init__(self, effect_sizes, variances, block_size=2 ** 16, n_jobs=1, seed=None):
+        """
+        :param effect_sizes: (numpy 1d array) effect sizes
+        :param variances: (numpy 1d array) variances
+        :param block_size: (int) number of subsets evaluated together
+        :param n_jobs: (int) number of worker processes
+        :param seed: (int) seed for reproducible subset sampling
+        """
+        self.effect_sizes = np.asarray(effect_sizes, dtype=float)
+        self.variances = np.asarray(variances, dtype=float)
+        self.block_size = block_size
+        self.n_jobs = n_jobs
+        self.seed = seed
+
+    def run(self, n_subsets=10 ** 6, path=None):
+        """ Fit the fixed effects model to every non-empty subset if there are at most n_subsets of them,
+            otherwise to n_subsets subsets drawn uniformly at random.
+
+        :param n_subsets: (int) largest number of subsets to fit
+        :param path: (str) .npy file to write the results to as a memory map; kept in memory if None
+        :return: (numpy structured array or memmap) effect_size, i_square and k of each subset. When every
+                  subset is fit, row i holds the subset with bitmask i + 1.
+        """
+        k = self.effect_sizes.size
+        exhaustive = k <= self._max_bits and 2 ** k - 1 <= n_subsets
+        total = 2 ** k - 1 if exhaustive else n_subsets
+        if path is None:
+            output = np.empty(total, dtype=self.dtype)
+        else:
+            output = np.lib.format.open_memmap(path, mode='w+', dtype=self.dtype, shape=(total,))
+
+        ivw = 1 / self.variances
+        ivw_es = ivw * self.effect_sizes
+        table = np.column_stack([ivw, ivw * ivw, ivw_es, ivw_es * self.effect_sizes])
+        starts = range(0, total, self.block_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(starts))
+        blocks = [(start, min(self.block_size, total - start), None if exhaustive else seed)
+                  for start, seed in zip(starts, seeds)]
+
+        if self.n_jobs == 1 or len(blocks) == 1:
+            for start, size, seed in blocks:
+                output[start:start + size] = self._evaluate_block(table, start, size, seed)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            from multiprocessing import shared_memory
+            memory = shared_memory.SharedMemory(create=True, size=table.nbytes)
+            try:
+                np.ndarray(table.shape, dtype=table.dtype, buffer=memory.buf)[:] = table
+                with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+                    futures = [executor.submit(self._shared_block, memory.name, table.shape, start, size, seed,
+                                               path)
+                               for start, size, seed in blocks]
+                    for future, (start, size, _) in zip(futures, blocks):
+                        result = future.result()
+                        if path is None:
+                            output[start:start + size] = result
+            finally:
+                memory.close()
+                memory.unlink()
+        if path is not None:
+            output.flush()
+        return output
+
+    @staticmethod
+    def subsets(k, start, size, seed=None):
+        """ Membership matrix of a block of subsets. Without a seed the block holds the subsets
+            with bitmasks start + 1 to start + size; with a seed, subsets are drawn uniformly
+            from all non-empty subsets.
+
+        :param k: (int) number of effect sizes
+        :param start: (int) index of the first subset of the block
+        :param size: (int) number of subsets in the block
+        :param seed: (numpy SeedSequence) seed of the block when sampling
+        :return: (numpy 2d array) True where effect size j is in subset i
+        """
+        if seed is None:
+            masks = np.arange(start + 1, start + size + 1, dtype=np.uint64)
+            return (masks[:, np.newaxis] >> np.arange(k, dtype=np.uint64)) & np.uint64(1) == 1
+        rng = np.random.default_rng(seed)
+        if k <= Gosh._max_bits:
+            masks = rng.integers(1, 2 ** k, size=size, dtype=np.uint64, endpoint=False)
+            return (masks[:, np.newaxis] >> np.arange(k, dtype=np.uint64)) & np.uint64(1) == 1
+        members = rng.random((size, k)) < 0.5
+        empty = ~members.any(axis=1)
+        while empty.any():
+            members[empty] = rng.random((int(empty.sum()), k)) < 0.5
+            empty = ~members.any(axis=1)
+        return members
+
+    @staticmethod
+    def _evaluate_block(table, start, size, seed):
+        """ Fixed effects estimate and I-square of one block of subsets. """
+        members = Gosh.subsets(table.shape[0], start, size, seed)
+        sums = members.astype(np.float64) @ table
+        summary = MetaSummary(members.sum(axis=1), *sums.T)
+        block = np.empty(size, dtype=Gosh.dtype)
+        block['effect_size'] = summary.fe_effect_size
+        with np.errstate(divide='ignore', invalid='ignore'):
+            block['i_square'] = np.where(summary.k > 1, summary.i_square, np.nan)
+        block['k'] = summary.k
+        return block
+
+    @staticmethod
+    def _shared_block(name, shape, start, size, seed, path):
+        """ Evaluate one block in a worker process, reading the weight table from shared memory.
+            Writes the block to the memory mapped output if path is given, otherwise returns it. """
+        from multiprocessing import shared_memory
+        memory = shared_memory.SharedMemory(name=name)
+        table = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+        block = Gosh._evaluate_block(table, start, size, seed)
+        del table
+        memory.close()
+        if path is None:
+            return block
+        output = np.load(path, mmap_mode='r+')
+        output[start:start + size] = block
+        output.flush()
+        return None
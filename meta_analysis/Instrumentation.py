@@ -0,0 +1,277 @@
+from collections import namedtuple
+from contextlib import contextmanager
+import functools
+import threading
+import time
+import numpy as np
+from .Study import Study
+from .StudyPool import StudyPool
+from .StudyList import StudyList
+from .OutcomeStore import OutcomeStore
+from .MetaSummary import MetaSummary
+from .WeightedAccumulator import WeightedAccumulator
+from .outcomes.Outcome import Outcome
+from .outcomes.BinaryOutcome import BinaryOutcome
+from .outcomes.ContinuousOutcome import ContinuousOutcome
+
+
+TraceEvent = namedtuple('TraceEvent', ['operation', 'cached', 'seconds', 'size'])
+
+
+def _rows(instance, *args, **kwargs):
+    return instance._store.size if '_store' in instance.__dict__ else 0
+
+
+def _outcomes(instance, *args, **kwargs):
+    return len(instance.outcomes)
+
+
+def _shared_outcomes(studies, index):
+    return len(studies._peek(index).outcomes)
+
+
+def _one(*args, **kwargs):
+    return 1
+
+
+def _first_argument(cls, values, *args, **kwargs):
+    return len(values)
+
+
+def _array_argument(values, *args, **kwargs):
+    return int(np.size(values))
+
+
+def _summary_size(summary, *args, **kwargs):
+    return int(np.sum(summary.k))
+
+
+def _estimator_cached(cache):
+    """ Probe of a MetaSummary method cached per tau-square estimator in the named dict. """
+    def probe(summary, tau_square_estimator='DL', *args, **kwargs):
+        return MetaSummary._estimator_key(tau_square_estimator) in getattr(summary, cache)
+    return probe
+
+
+class Instrumentation:
+    """ Opt-in instrumentation of StudyPool, Study and Outcome operations and of the stores and
+        summaries behind them. While enabled, every operation listed in targets records its
+        call count, cumulative wall time (including nested operations) and the size of the
+        data it was called on (rows of the pool's store, outcomes of a study, or effect sizes
+        of a summary); operations backed by a cache also count hits and misses. Pool copies share
+        their studies, so the cost of copying shows up in StudyList._own, which copies a shared
+        study the first time it is accessed or edited.
+
+        Enabling replaces the listed methods on their classes with timing wrappers and disabling
+        restores the originals, so there is no overhead at all while instrumentation is off.
+        Only one instance can be enabled at a time, since the classes are shared by the whole
+        process. Statistics can be exported with to_dict() or to_prometheus(), and trace()
+        captures the operations of one request, e.g.
+
+            instrumentation = Instrumentation()
+            with instrumentation:
+                with instrumentation.trace() as events:
+                    study_pool.summarize(method='re')
+            print(instrumentation.to_prometheus())
+
+    Attributes:
+        stats (dict) per operation name: calls, seconds, size_total, size_max, cache_hits and cache_misses
+        targets (tuple) (class, method name, size function, cache probe) of every instrumented operation;
+                 the probe runs before the call and tells whether its result will come from a cache
+    """
+
+    targets = (
+        (StudyPool, 'set_outcome', _rows, None),
+        (StudyPool, 'effect_sizes', _rows, None),
+        (StudyPool, 'variances', _rows, None),
+        (StudyPool, '_sync_store', _rows,
+         lambda pool: not pool._stale),
+        (StudyPool, '_accumulator', _rows,
+         lambda pool, label: not pool._stale and label in pool._accumulators),
+        (StudyPool, 'summary', _rows, None),
+        (StudyPool, 'summarize', _rows, None),
+        (StudyPool, 'meta_analysis', _rows, None),
+        (StudyPool, 'meta_analysis_by_label', _rows, None),
+        (StudyPool, 'calculate_ivw_effect_size', _rows, None),
+        (StudyPool, 'calculate_variance', _rows, None),
+        (StudyPool, 'calculate_q', _rows, None),
+        (StudyPool, 'calculate_re', _rows, None),
+        (StudyPool, 'calculate_i_square', _rows, None),
+        (StudyPool, 'append_study', _rows, None),
+        (StudyPool, 'remove_study', _rows, None),
+        (StudyPool, 'copy', _rows, None),
+        (StudyPool, 'leave_one_out', _rows, None),
+        (StudyPool, 'cumulative', _rows, None),
+        (StudyPool, 'subgroup_analysis', _rows, None),
+        (StudyPool, 'meta_regression', _rows, None),
+        (StudyPool, 'bootstrap', _rows, None),
+        (StudyPool, 'permutation_test', _rows, None),
+        (StudyPool, 'gosh', _rows, None),
+        (StudyPool, 'egger_test', _rows, None),
+        (StudyPool, 'begg_test', _rows, None),
+        (StudyPool, 'trim_and_fill', _rows, None),
+        (StudyPool, 'pet_peese', _rows, None),
+        (StudyPool, 'save', _rows, None),
+        (Study, 'append_outcome', _outcomes, None),
+        (Study, 'remove_outcome', _outcomes, None),
+        (Study, 'detach_outcome', _outcomes, None),
+        (Study, 'get_outcome_by_id', _outcomes, None),
+        (Study, 'get_outcomes_by_label', _outcomes, None),
+        (Study, 'copy', _outcomes, None),
+        (StudyList, '_own', _shared_outcomes, None),
+        (Outcome, 'set_label', _one, None),
+        (Outcome, 'set_n', _one, None),
+        (Outcome, 'set_estimate', _one, None),
+        (Outcome, 'copy', _one, None),
+        (BinaryOutcome, 'estimate', _one, None),
+        (BinaryOutcome, 'estimate_batch', _first_argument, None),
+        (BinaryOutcome, 'estimate_arrays', _array_argument, None),
+        (ContinuousOutcome, 'estimate', _one, None),
+        (ContinuousOutcome, 'estimate_batch', _first_argument, None),
+        (ContinuousOutcome, 'estimate_arrays', _array_argument, None),
+        (OutcomeStore, 'from_studies', _first_argument, None),
+        (OutcomeStore, 'arrays', lambda store, label: store.size, lambda store, label: label in store._arrays_cache),
+        (OutcomeStore, 'segments', lambda store, labels=None: store.size, None),
+        (OutcomeStore, 'remove_study', lambda store, study_index: store.size, None),
+        (WeightedAccumulator, 'summary', lambda accumulator, source=None: accumulator.k,
+         lambda accumulator, source=None: accumulator._summary is not None),
+        (MetaSummary, 'estimate_tau_square', _summary_size, _estimator_cached('_tau_squares')),
+        (MetaSummary, '_random_effects_sums', _summary_size, _estimator_cached('_re_sums')),
+        (MetaSummary, 'result', _summary_size, None),
+    )
+
+    _active = None
+
+    def __init__(self):
+        self.stats = {}
+        self._originals = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self):
+        """ Start recording by wrapping every target operation.
+
+        :return: None
+        """
+        assert Instrumentation._active is None, 'another Instrumentation is already enabled'
+        Instrumentation._active = self
+        for cls, name, size, probe in self.targets:
+            attribute = cls.__dict__[name]
+            self._originals.append((cls, name, attribute))
+            operation = f'{cls.__name__}.{name}'
+            if isinstance(attribute, property):
+                wrapped = property(self._wrap(operation, attribute.fget, size, probe), attribute.fset)
+            elif isinstance(attribute, (classmethod, staticmethod)):
+                wrapped = type(attribute)(self._wrap(operation, attribute.__func__, size, probe))
+            else:
+                wrapped = self._wrap(operation, attribute, size, probe)
+            setattr(cls, name, wrapped)
+
+    def disable(self):
+        """ Stop recording and restore the original operations. Recorded statistics are kept.
+
+        :return: None
+        """
+        for cls, name, attribute in reversed(self._originals):
+            setattr(cls, name, attribute)
+        self._originals = []
+        if Instrumentation._active is self:
+            Instrumentation._active = None
+
+    @property
+    def enabled(self):
+        return Instrumentation._active is self
+
+    def reset(self):
+        """ Clear recorded statistics.
+
+        :return: None
+        """
+        with self._lock:
+            self.stats = {}
+
+    @contextmanager
+    def trace(self):
+        """ Capture every instrumented operation called by the current thread inside the block,
+            in the order the calls finished.
+
+        :return: (list) TraceEvent of each call: operation, whether it was served from a cache
+                  (None if the operation has no cache), seconds and size
+        """
+        events = []
+        previous = getattr(self._local, 'trace', None)
+        self._local.trace = events
+        try:
+            yield events
+        finally:
+            self._local.trace = previous
+
+    def to_dict(self):
+        """ Recorded statistics as plain data, e.g. for JSON logging.
+
+        :return: (dict) operation name -> dict of calls, seconds, size_total, size_max, cache_hits, cache_misses
+        """
+        with self._lock:
+            return {operation: dict(stats) for operation, stats in sorted(self.stats.items())}
+
+    def to_prometheus(self, prefix='meta_analysis'):
+        """ Recorded statistics in the Prometheus text exposition format, one series per operation.
+
+        :param prefix: (str) prefix of the metric names
+        :return: (str) exposition text
+        """
+        metrics = (('calls', 'calls_total', 'counter', 'Number of calls of the operation.'),
+                   ('seconds', 'seconds_total', 'counter', 'Cumulative wall time of the operation in seconds.'),
+                   ('size_total', 'size_total', 'counter', 'Total size of the data the operation worked on.'),
+                   ('size_max', 'size_max', 'gauge', 'Largest size of the data the operation worked on.'),
+                   ('cache_hits', 'cache_hits_total', 'counter', 'Calls served from a cache.'),
+                   ('cache_misses', 'cache_misses_total', 'counter', 'Calls that computed their result.'))
+        stats = self.to_dict()
+        lines = []
+        for field, suffix, kind, description in metrics:
+            name = f'{prefix}_{suffix}'
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for operation, values in stats.items():
+                lines.append(f'{name}{{operation="{operation}"}} {values[field]}')
+        return '\n'.join(lines) + '\n'
+
+    def _wrap(self, operation, function, size, probe):
+        """ Timing wrapper of one operation. """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            cached = probe(*args, **kwargs) if probe is not None else None
+            count = size(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._record(operation, time.perf_counter() - start, count, cached)
+        return wrapper
+
+    def _record(self, operation, seconds, size, cached):
+        with self._lock:
+            stats = self.stats.get(operation)
+            if stats is None:
+                stats = self.stats[operation] = {'calls': 0, 'seconds': 0.0, 'size_total': 0, 'size_max': 0,
+                                                 'cache_hits': 0, 'cache_misses': 0}
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['size_total'] += size
+            stats['size_max'] = max(stats['size_max'], size)
+            if cached is not None:
+                stats['cache_hits' if cached else 'cache_misses'] += 1
+        events = getattr(self._local, 'trace', None)
+        if events is not None:
+            events.append(TraceEvent(operation, cached, seconds, size))
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+        return False
+
+    def __repr__(self):
+        return f'Instrumentation(enabled={self.enabled}, operations={len(self.stats)})'
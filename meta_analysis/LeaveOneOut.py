@@ -0,0 +1,130 @@
+from collections import namedtuple
+import numpy as np
+from .MetaSummary import MetaSummary
+from .estimators import TauSquareEstimator, DerSimonianLaird
+
+
+LeaveOneOutResult = namedtuple('LeaveOneOutResult',
+                               ['unit', 'method', 'effect_size', 'variance', 'q', 'p', 'tau_square', 'i_square',
+                                'standardized_residual', 'dffits', 'cooks_distance', 'covariance_ratio', 'hat'])
+
+
+class LeaveOneOut:
+    """ Leave-one-out sensitivity analysis and influence diagnostics. A unit is either a single
+        effect size or a contiguous block of effect sizes (e.g. all outcomes of one study).
+        The weighted sums of every reduced pool are obtained by subtracting the sums of one
+        unit from the sums of the full pool, so fixed effects estimates, Q, p, DerSimonian-Laird
+        tau-square and I-square of all k reduced pools cost one O(k) array computation.
+        Random effects estimates re-weight every reduced pool with its own tau-square; that
+        pass is done in blocks of units so memory stays bounded.
+
+    Attributes:
+        effect_sizes (numpy 1d array) effect sizes, with the rows of each unit contiguous
+        variances (numpy 1d array) variances, in the same order
+        offsets (numpy 1d array) rows offsets[i]:offsets[i+1] belong to unit i
+        full (MetaSummary) summary of the full pool
+        units (MetaSummary) summary of each unit on its own
+        reduced (MetaSummary) summary of each pool with one unit left out
+
+    References (informal list):
+        Viechtbauer, W., & Cheung, M. W. L. (2010). Outlier and influence diagnostics for meta-analysis.
+            Research synthesis methods, 1(2), 112-125.
+    """
+
+    _block_elements = 2 ** 20
+
+    def __init__(self, effect_sizes, variances, offsets=None):
+        """
+        :param effect_sizes: (numpy 1d array) effect sizes, with the rows of each unit contiguous
+        :param variances: (numpy 1d array) variances, in the same order
+        :param offsets: (numpy 1d array) unit boundaries; defaults to one unit per effect size
+        """
+        if offsets is None:
+            offsets = np.arange(effect_sizes.size + 1)
+        self.effect_sizes = effect_sizes
+        self.variances = variances
+        self.offsets = offsets
+        self.full = MetaSummary.from_arrays(effect_sizes, variances)
+        self.units = MetaSummary.from_segments(effect_sizes, variances, offsets)
+        self.reduced = MetaSummary(self.full.k - self.units.k,
+                                   self.full.sum_w - self.units.sum_w,
+                                   self.full.sum_w2 - self.units.sum_w2,
+                                   self.full.sum_wy - self.units.sum_wy,
+                                   self.full.sum_wy2 - self.units.sum_wy2)
+
+    def reduced_tau_square(self, tau_square_estimator='DL'):
+        """ Tau-square of each reduced pool.
+
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :return: (numpy 1d array) tau-square with unit i left out
+        """
+        estimator = TauSquareEstimator.from_name(tau_square_estimator)
+        if isinstance(estimator, DerSimonianLaird):
+            return self.reduced.tau_square
+        # iterative estimators: solve the reduced pools as a batch, masking out one unit per row
+        unit_of_row = np.repeat(np.arange(self.units.k.size), self.units.k)
+        tau_square = np.empty(self.units.k.size)
+        for block in self._blocks():
+            left_out = unit_of_row[np.newaxis, :] == block[:, np.newaxis]
+            tau_square[block] = estimator.estimate_batch(np.where(left_out, np.nan, self.effect_sizes),
+                                                         np.where(left_out, np.nan, self.variances))
+        return tau_square
+
+    def result(self, method='auto', tau_square_estimator='DL', units=None):
+        """ Reduced estimates and influence diagnostics of every unit.
+
+        :param method: (str) random effects if 're', fixed effects if 'fe', chosen from the Q test
+                        of the full pool if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :param units: (list) identifiers of the units, e.g. outcome ids or study citations
+        :return: (LeaveOneOutResult) one array element per unit
+        """
+        if method == 'auto':
+            method = 're' if self.full.p < 0.05 else 'fe'
+        if method == 're':
+            tau_square = self.full.estimate_tau_square(tau_square_estimator)
+            reduced_tau_square = self.reduced_tau_square(tau_square_estimator)
+        else:
+            tau_square = 0.0
+            reduced_tau_square = np.zeros(self.units.k.size)
+        effect_size = self.full.effect_size(method, tau_square_estimator)
+        variance = self.full.variance(method, tau_square_estimator)
+        reduced_sum_w, reduced_sum_wy = self._reduced_random_effects_sums(reduced_tau_square)
+        reduced_effect_size = reduced_sum_wy / reduced_sum_w
+        reduced_variance = 1 / reduced_sum_w
+
+        # each unit collapsed to a single fixed effects estimate
+        unit_effect_size = self.units.fe_effect_size
+        unit_variance = self.units.fe_variance
+        hat = MetaSummary.segment_sum(1 / (self.variances + tau_square), self.offsets) * variance
+        difference = effect_size - reduced_effect_size
+        standardized_residual = (unit_effect_size - reduced_effect_size) / \
+            np.sqrt(unit_variance + reduced_tau_square + reduced_variance)
+        dffits = difference / np.sqrt(hat * (reduced_tau_square + unit_variance))
+        return LeaveOneOutResult(units, method, reduced_effect_size, reduced_variance,
+                                 self.reduced.q, self.reduced.p, reduced_tau_square, self.reduced.i_square,
+                                 standardized_residual, dffits, np.square(difference) / variance,
+                                 reduced_variance / variance, hat)
+
+    def _reduced_random_effects_sums(self, tau_square):
+        """ Sum of weights and weighted effect sizes of each reduced pool, where the pool without
+            unit i is weighted with tau_square[i]. """
+        if not np.any(tau_square):
+            return self.reduced.sum_w, self.reduced.sum_wy
+        sum_w = np.empty(tau_square.size)
+        sum_wy = np.empty(tau_square.size)
+        for block in self._blocks():
+            ivw = 1 / (self.variances[np.newaxis, :] + tau_square[block, np.newaxis])
+            sum_w[block] = ivw.sum(axis=1)
+            sum_wy[block] = ivw @ self.effect_sizes
+        unit_ivw = 1 / (self.variances + np.repeat(tau_square, self.units.k))
+        sum_w -= MetaSummary.segment_sum(unit_ivw, self.offsets)
+        sum_wy -= MetaSummary.segment_sum(unit_ivw * self.effect_sizes, self.offsets)
+        return sum_w, sum_wy
+
+    def _blocks(self):
+        """ Unit indices split into blocks whose unit x row matrices stay under _block_elements. """
+        n_units = self.units.k.size
+        size = max(1, self._block_elements // max(1, self.effect_sizes.size))
+        for start in range(0, n_units, size):
+            yield np.arange(start, min(start + size, n_units))
@@ -0,0 +1,167 @@
+from collections import namedtuple
+import warnings
+import numpy as np
+from .estimators import TauSquareEstimator, DerSimonianLaird, RestrictedMaximumLikelihood
+
+
+MetaRegressionResult = namedtuple('MetaRegressionResult',
+                                  ['moderators', 'method', 'coefficients', 'standard_errors', 'z', 'p',
+                                   'covariance', 'tau_square', 'qm', 'qm_dof', 'qm_p', 'qe', 'qe_dof', 'qe_p',
+                                   'tau_square_estimator'])
+
+
+class MetaRegression:
+    """ Fixed and mixed effects meta-regression of effect sizes on moderators, fit by weighted
+        least squares. Coefficients come from a Cholesky factorization of the weighted Gram
+        matrix X'WX, so the cost of a fit is one O(k p^2) pass over the design plus O(p^3).
+        The Gram matrices under fixed effects weights are computed once for the full design;
+        any subset of moderators is fit under fixed effects, and gets its DerSimonian-Laird
+        residual tau-square, from slices of those matrices without touching the k rows again.
+        Mixed effects fits re-weight the rows with the residual tau-square of the model.
+
+        The QE test of residual heterogeneity uses the weighted residual sum of squares under
+        fixed effects weights; the QM omnibus test covers every coefficient except the intercept.
+
+    Attributes:
+        effect_sizes (numpy 1d array) effect sizes
+        variances (numpy 1d array) variances
+        design (numpy 2d array) design matrix, one row per effect size, intercept column first
+        names (list) name of each design column
+        intercept (bool) whether the first design column is the intercept
+
+    References (informal list):
+        Raudenbush, S. W. (2009). Analyzing effect sizes: Random-effects models. In The handbook of
+            research synthesis and meta-analysis (2nd ed., pp. 295-315).
+
+        Viechtbauer, W. (2005). Bias and efficiency of meta-analytic variance estimators in the
+            random-effects model. Journal of Educational and Behavioral Statistics, 30(3), 261-293.
+    """
+
+    def __init__(self, effect_sizes, variances, moderators, names=None, intercept=True):
+        """
+        :param effect_sizes: (numpy 1d array) effect sizes
+        :param variances: (numpy 1d array) variances
+        :param moderators: (numpy 2d array) one row per effect size, one column per moderator
+        :param names: (list) moderator names; defaults to 'x1', 'x2', ...
+        :param intercept: (bool) add an intercept column to the design
+        """
+        moderators = np.asarray(moderators, dtype=float).reshape(len(effect_sizes), -1)
+        if names is None:
+            names = [f'x{i + 1}' for i in range(moderators.shape[1])]
+        assert len(names) == moderators.shape[1], 'names must have one element per moderator column'
+        self.effect_sizes = np.asarray(effect_sizes, dtype=float)
+        self.variances = np.asarray(variances, dtype=float)
+        self.intercept = intercept
+        if intercept:
+            moderators = np.column_stack([np.ones(self.effect_sizes.size), moderators])
+            names = ['intercept'] + list(names)
+        self.design = moderators
+        self.names = list(names)
+        # fixed effects Gram matrices of the full design, shared by every moderator subset
+        weights = 1 / self.variances
+        weighted_design = self.design * weights[:, np.newaxis]
+        self._fe_gram = weighted_design.T @ self.design
+        self._fe_gram_squared = (weighted_design * weights[:, np.newaxis]).T @ self.design
+        self._fe_moment = weighted_design.T @ self.effect_sizes
+        self._fe_sum_wy2 = np.dot(weights * self.effect_sizes, self.effect_sizes)
+        self._fe_sum_w = weights.sum()
+
+    def fit(self, moderators=None, method='re', tau_square_estimator='DL'):
+        """ Fit the model on a subset of the moderators.
+
+        :param moderators: (list) moderator names to include; defaults to all. The intercept is always included
+                            if the model has one.
+        :param method: (str) mixed effects if 're', fixed effects if 'fe', chosen from the QE test if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) 'DL' or 'REML' residual tau-square estimator
+        :return: (MetaRegressionResult) coefficients, standard errors, z and p-values, coefficient covariance,
+                  residual tau-square, QM and QE tests
+        """
+        # SciPy is imported on first use to keep the package import cheap
+        from scipy.linalg import cho_factor, cho_solve
+        from scipy.stats import chi2, norm
+        columns = self._columns(moderators)
+        estimator = TauSquareEstimator.from_name(tau_square_estimator)
+        if not isinstance(estimator, (DerSimonianLaird, RestrictedMaximumLikelihood)):
+            raise ValueError('Meta-regression supports DL and REML tau-square estimators')
+        k, p = self.effect_sizes.size, columns.size
+        gram = self._fe_gram[np.ix_(columns, columns)]
+        factor = cho_factor(gram)
+        coefficients = cho_solve(factor, self._fe_moment[columns])
+        qe = self._fe_sum_wy2 - np.dot(coefficients, self._fe_moment[columns])
+        qe_dof = k - p
+        qe_p = chi2.sf(qe, qe_dof)
+        if method == 'auto':
+            method = 're' if qe_p < 0.05 else 'fe'
+
+        tau_square = 0.0
+        if method == 're':
+            trace = self._fe_sum_w - np.trace(cho_solve(factor, self._fe_gram_squared[np.ix_(columns, columns)]))
+            tau_square = max(0.0, (qe - qe_dof) / trace)
+            if isinstance(estimator, RestrictedMaximumLikelihood):
+                tau_square = self._reml(columns, tau_square, estimator)
+            if tau_square > 0:
+                weights = 1 / (self.variances + tau_square)
+                weighted_design = self.design[:, columns] * weights[:, np.newaxis]
+                factor = cho_factor(weighted_design.T @ self.design[:, columns])
+                coefficients = cho_solve(factor, weighted_design.T @ self.effect_sizes)
+
+        covariance = cho_solve(factor, np.eye(p))
+        standard_errors = np.sqrt(np.diag(covariance))
+        z = coefficients / standard_errors
+        tested = slice(1, None) if self.intercept else slice(None)
+        tested_coefficients = coefficients[tested]
+        qm = float(tested_coefficients @ np.linalg.solve(covariance[tested, tested], tested_coefficients)) \
+            if tested_coefficients.size else 0.0
+        qm_dof = tested_coefficients.size
+        return MetaRegressionResult([self.names[column] for column in columns], method, coefficients,
+                                    standard_errors, z, 2 * norm.sf(np.abs(z)), covariance, tau_square,
+                                    qm, qm_dof, chi2.sf(qm, qm_dof) if qm_dof else np.nan,
+                                    qe, qe_dof, qe_p, estimator.name)
+
+    def fit_subsets(self, subsets, method='re', tau_square_estimator='DL'):
+        """ Fit the model on many subsets of the moderators, reusing the cached Gram matrices.
+
+        :param subsets: (list) each element is a list of moderator names
+        :param method: (str) mixed effects if 're', fixed effects if 'fe', chosen from the QE test if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) 'DL' or 'REML' residual tau-square estimator
+        :return: (list) MetaRegressionResult of each subset
+        """
+        return [self.fit(subset, method, tau_square_estimator) for subset in subsets]
+
+    def _columns(self, moderators):
+        """ Design column indices of the requested moderators, intercept first. """
+        if moderators is None:
+            return np.arange(len(self.names))
+        try:
+            columns = [self.names.index(name) for name in moderators]
+        except ValueError:
+            raise ValueError(f'Unknown moderator in {list(moderators)}')
+        if self.intercept:
+            columns = [0] + [column for column in columns if column != 0]
+        return np.array(columns, dtype=np.intp)
+
+    def _reml(self, columns, tau_square, estimator):
+        """ Residual tau-square by Fisher scoring on the restricted likelihood, started from tau_square.
+            Traces of the projection matrix P = W - WX(X'WX)^-1X'W are taken from p x p products
+            so no k x k matrix is formed. """
+        from scipy.linalg import cho_factor, cho_solve
+        design = self.design[:, columns]
+        for _ in range(estimator.max_iter):
+            weights = 1 / (self.variances + tau_square)
+            weighted_design = design * weights[:, np.newaxis]
+            factor = cho_factor(weighted_design.T @ design)
+            coefficients = cho_solve(factor, weighted_design.T @ self.effect_sizes)
+            residuals = self.effect_sizes - design @ coefficients
+            square_weighted = cho_solve(factor, (weighted_design * weights[:, np.newaxis]).T @ design)
+            cube_weighted = cho_solve(factor, (weighted_design * np.square(weights)[:, np.newaxis]).T @ design)
+            trace_p = weights.sum() - np.trace(square_weighted)
+            trace_pp = np.square(weights).sum() - 2 * np.trace(cube_weighted) + \
+                np.sum(square_weighted * square_weighted.T)
+            updated = max(0.0, tau_square +
+                          (np.sum(np.square(weights * residuals)) - trace_p) / trace_pp)
+            if abs(updated - tau_square) <= estimator.tol:
+                return updated
+            tau_square = updated
+        warnings.warn(f'{estimator.name} tau-square estimate did not converge for 1 pool(s) '
+                      f'after {estimator.max_iter} iterations')
+        return tau_square
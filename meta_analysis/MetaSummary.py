@@ -0,0 +1,323 @@
+from collections import namedtuple
+import math
+import numpy as np
+from .estimators import TauSquareEstimator, DerSimonianLaird
+
+
+MetaAnalysisResult = namedtuple('MetaAnalysisResult',
+                                ['method', 'effect_size', 'variance', 'q', 'dof', 'p', 'tau_square', 'i_square',
+                                 'tau_square_estimator'])
+
+
+class MetaSummary:
+    """ Sufficient statistics of an inverse variance weighted meta-analysis. The weighted
+        sums are computed in one pass over the effect sizes and variances, and every statistic
+        used by StudyPool (fixed and random effects estimates, Q, p-value, tau-square, I-square)
+        is derived from them without rebuilding the weights. The DerSimonian-Laird tau-square
+        comes straight from the sums; other tau-square estimators (see estimators package)
+        read the effect sizes and variances once and are cached per estimator.
+
+        A summary can also describe many pools at once (see from_segments()); the sums are
+        then 1d arrays with one element per pool and every statistic is computed element-wise.
+
+    Attributes:
+        k (int) number of effect sizes
+        sum_w (float) sum of inverse variance weights
+        sum_w2 (float) sum of squared weights
+        sum_wy (float) sum of weighted effect sizes
+        sum_wy2 (float) sum of weighted squared effect sizes
+        effect_sizes (numpy 1d array) effect sizes, kept for random effects re-weighting
+        variances (numpy 1d array) variances, kept for random effects re-weighting
+        offsets (numpy 1d array) for segmented summaries, rows offsets[i]:offsets[i+1] belong to pool i
+    """
+
+    def __init__(self, k, sum_w, sum_w2, sum_wy, sum_wy2, effect_sizes=None, variances=None, source=None,
+                 offsets=None):
+        """
+        :param k: (int) number of effect sizes
+        :param sum_w: (float) sum of inverse variance weights
+        :param sum_w2: (float) sum of squared weights
+        :param sum_wy: (float) sum of weighted effect sizes
+        :param sum_wy2: (float) sum of weighted squared effect sizes
+        :param effect_sizes: (numpy 1d array) effect sizes; required for random effects estimates
+        :param variances: (numpy 1d array) variances; required for random effects estimates
+        :param source: (callable) returns (effect_sizes, variances) when they were not passed directly;
+                        lets a summary built from running sums fetch the arrays only if they are needed
+        :param offsets: (numpy 1d array) segment boundaries when the summary describes many pools
+        """
+        self.k = k
+        self.sum_w = sum_w
+        self.sum_w2 = sum_w2
+        self.sum_wy = sum_wy
+        self.sum_wy2 = sum_wy2
+        self.effect_sizes = effect_sizes
+        self.variances = variances
+        self._source = source
+        self.offsets = offsets
+        self._p = None
+        self._tau_squares = {}
+        self._re_sums = {}
+
+    @classmethod
+    def from_arrays(cls, effect_sizes, variances):
+        """ Compute the weighted sums from effect sizes and variances.
+
+        :param effect_sizes: (numpy 1d array) effect sizes
+        :param variances: (numpy 1d array) variances
+        :return: (MetaSummary)
+        """
+        ivw = 1 / variances
+        ivw_es = ivw * effect_sizes
+        return cls(effect_sizes.size, ivw.sum(), np.dot(ivw, ivw), ivw_es.sum(), np.dot(ivw_es, effect_sizes),
+                   effect_sizes, variances)
+
+    @classmethod
+    def from_segments(cls, effect_sizes, variances, offsets):
+        """ Compute the weighted sums of many pools at once with segmented reductions.
+
+        :param effect_sizes: (numpy 1d array) effect sizes, with the rows of each pool contiguous
+        :param variances: (numpy 1d array) variances, in the same order
+        :param offsets: (numpy 1d array) rows offsets[i]:offsets[i+1] belong to pool i
+        :return: (MetaSummary) summary whose sums are 1d arrays with one element per pool
+        """
+        ivw = 1 / variances
+        ivw_es = ivw * effect_sizes
+        sums = [cls.segment_sum(values, offsets) for values in (ivw, ivw * ivw, ivw_es, ivw_es * effect_sizes)]
+        return cls(np.diff(offsets), *sums, effect_sizes=effect_sizes, variances=variances, offsets=offsets)
+
+    @staticmethod
+    def segment_sum(values, offsets):
+        """ Sum contiguous segments of an array; empty segments sum to zero.
+
+        :param values: (numpy 1d array) values to sum
+        :param offsets: (numpy 1d array) segment boundaries
+        :return: (numpy 1d array) sum of each segment
+        """
+        sums = np.zeros(len(offsets) - 1)
+        non_empty = offsets[1:] > offsets[:-1]
+        if non_empty.any():
+            sums[non_empty] = np.add.reduceat(values, offsets[:-1][non_empty])
+        return sums
+
+    @staticmethod
+    def chi2_sf(x, dof):
+        """ Survival function of the chi-square distribution, 1 - cdf(x), for one value. This is the
+            regularized upper incomplete gamma function Q(dof / 2, x / 2), computed from its series
+            below a + 1 and its continued fraction (modified Lentz) above, as in Numerical Recipes 6.2.
+
+        :param x: (float) chi-square statistic
+        :param dof: (float) degrees of freedom
+        :return: (float) upper tail probability; nan if x is nan or dof is not positive
+        """
+        if math.isnan(x) or not dof > 0:
+            return math.nan
+        if x <= 0:
+            return 1.0
+        if math.isinf(x):
+            return 0.0
+        a = dof / 2
+        x = x / 2
+        log_prefactor = a * math.log(x) - x - math.lgamma(a)
+        max_iter = int(10 * math.sqrt(a)) + 100
+        if x < a + 1:
+            term = total = 1 / a
+            for n in range(1, max_iter):
+                term *= x / (a + n)
+                total += term
+                if abs(term) < abs(total) * 1e-16:
+                    break
+            return 1 - total * math.exp(log_prefactor)
+        tiny = 1e-300
+        b = x + 1 - a
+        c = 1 / tiny
+        d = 1 / b
+        fraction = d
+        for n in range(1, max_iter):
+            an = -n * (n - a)
+            b += 2
+            d = an * d + b
+            d = d if abs(d) > tiny else tiny
+            c = b + an / c
+            c = c if abs(c) > tiny else tiny
+            d = 1 / d
+            fraction *= d * c
+            if abs(d * c - 1) < 1e-16:
+                break
+        return math.exp(log_prefactor) * fraction
+
+    @property
+    def dof(self):
+        return self.k - 1
+
+    @property
+    def fe_effect_size(self):
+        """ Fixed effects mean; nan for an empty segment of a segmented summary. """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.sum_wy / self.sum_w
+
+    @property
+    def fe_variance(self):
+        with np.errstate(divide='ignore'):
+            return 1 / self.sum_w
+
+    @property
+    def q(self):
+        """ Q statistic, sum(w * (y - fixed effects mean)^2), expanded into the weighted sums. """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.sum_wy2 - self.sum_wy ** 2 / self.sum_w
+
+    @property
+    def p(self):
+        """ p-value from one-sided chi-square test of Q with k-1 degrees of freedom. A single pool
+            uses chi2_sf(), so fixed effects pooling never imports SciPy; summaries of many pools
+            use the survival function of the vectorized SciPy distribution, imported on first use;
+            both keep their precision in the far tail, where 1 - cdf rounds to zero. """
+        if self._p is None:
+            if np.ndim(self.q) == 0:
+                self._p = self.chi2_sf(float(self.q), float(self.dof))
+            else:
+                from scipy.stats import chi2
+                self._p = chi2.sf(self.q, self.dof)
+        return self._p
+
+    @property
+    def tau_square(self):
+        """ DerSimonian-Laird estimate of between-study variance, truncated at zero.
+            Zero for a pool of one effect size, as in estimators.DerSimonianLaird. """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tau_square = (self.q - self.dof) / (self.sum_w - self.sum_w2 / self.sum_w)
+        return np.where(self.k > 1, np.maximum(tau_square, 0), 0.0)[()]
+
+    @property
+    def i_square(self):
+        """ (Q - dof) / Q, not truncated; nan where Q is zero, e.g. for a single effect size. """
+        q = self.q
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (q - self.dof) / q
+
+    @property
+    def re_effect_size(self):
+        return self.effect_size('re')
+
+    @property
+    def re_variance(self):
+        return self.variance('re')
+
+    def estimate_tau_square(self, tau_square_estimator='DL'):
+        """ Between-study variance from the chosen estimator.
+
+        :param tau_square_estimator: (str or TauSquareEstimator) 'DL', 'REML', 'ML', 'PM', 'SJ' or estimator instance
+        :return: (float) tau-square
+        """
+        key = self._estimator_key(tau_square_estimator)
+        if key not in self._tau_squares:
+            estimator = TauSquareEstimator.from_name(tau_square_estimator)
+            if isinstance(estimator, DerSimonianLaird):
+                self._tau_squares[key] = self.tau_square
+            elif self.offsets is not None:
+                self._tau_squares[key] = estimator.estimate_batch(*self._padded_arrays())
+            else:
+                self._tau_squares[key] = estimator.estimate(*self._arrays())
+        return self._tau_squares[key]
+
+    def effect_size(self, method='fe', tau_square_estimator='DL'):
+        """ Weighted mean effect size.
+
+        :param method: (str) random effects effect size if 're', fixed effects effect size if 'fe'
+        :param tau_square_estimator: (str or TauSquareEstimator) tau-square estimator for random effects
+        :return: (float) weighted mean effect size
+        """
+        if method == 're':
+            sum_w, sum_wy = self._random_effects_sums(tau_square_estimator)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return sum_wy / sum_w
+        return self.fe_effect_size
+
+    def variance(self, method='fe', tau_square_estimator='DL'):
+        """ Variance of weighted mean effect size.
+
+        :param method: (str) random effects variance if 're', fixed effects variance if 'fe'
+        :param tau_square_estimator: (str or TauSquareEstimator) tau-square estimator for random effects
+        :return: (float) variance of weighted mean effect size
+        """
+        if method == 're':
+            sum_w, _ = self._random_effects_sums(tau_square_estimator)
+            with np.errstate(divide='ignore'):
+                return 1 / sum_w
+        return self.fe_variance
+
+    def result(self, method='auto', tau_square_estimator='DL'):
+        """ Collect the meta-analysis statistics into one record.
+
+        :param method: (str) random effects meta-analysis if 're', fixed effects meta-analysis if 'fe',
+                        base choice on statistical significance (p<0.05) of Q statistic if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) tau-square estimator for random effects
+        :return: (MetaAnalysisResult) method used, effect size, variance, Q, dof, p, tau-square, I-square,
+                  tau-square estimator
+        """
+        estimator = TauSquareEstimator.from_name(tau_square_estimator)
+        if self.offsets is not None:
+            use_re = self.p < 0.05 if method == 'auto' else np.full(self.k.shape, method == 're')
+            # random effects sums are only needed if some pool uses them
+            re_method = 're' if use_re.any() else 'fe'
+            return MetaAnalysisResult(np.where(use_re, 're', 'fe'),
+                                      np.where(use_re, self.effect_size(re_method, tau_square_estimator),
+                                               self.fe_effect_size),
+                                      np.where(use_re, self.variance(re_method, tau_square_estimator),
+                                               self.fe_variance),
+                                      self.q, self.dof, self.p,
+                                      self.estimate_tau_square(tau_square_estimator),
+                                      self.i_square,
+                                      estimator.name)
+        if method == 'auto':
+            method = 're' if self.p < 0.05 else 'fe'
+        return MetaAnalysisResult(method,
+                                  self.effect_size(method, tau_square_estimator),
+                                  self.variance(method, tau_square_estimator),
+                                  self.q, self.dof, self.p,
+                                  self.estimate_tau_square(tau_square_estimator),
+                                  self.i_square,
+                                  estimator.name)
+
+    def _arrays(self):
+        """ Effect sizes and variances, fetched from the source on first use. """
+        if self.variances is None and self._source is not None:
+            self.effect_sizes, self.variances = self._source()
+        assert self.variances is not None, 'estimate requires effect sizes and variances'
+        return self.effect_sizes, self.variances
+
+    def _padded_arrays(self):
+        """ Effect sizes and variances of a segmented summary as nan-padded 2d arrays, one row per
+            pool, scattered in one step rather than split and stacked pool by pool.
+        """
+        effect_sizes, variances = self._arrays()
+        pools = np.repeat(np.arange(self.k.size), self.k)
+        positions = np.arange(effect_sizes.size) - np.repeat(self.offsets[:-1], self.k)
+        padded = np.full((2, self.k.size, self.k.max(initial=0)), np.nan)
+        padded[0, pools, positions] = effect_sizes
+        padded[1, pools, positions] = variances
+        return padded[0], padded[1]
+
+    @staticmethod
+    def _estimator_key(tau_square_estimator):
+        if isinstance(tau_square_estimator, str):
+            return tau_square_estimator.upper()
+        return tau_square_estimator
+
+    def _random_effects_sums(self, tau_square_estimator='DL'):
+        """ Sum of random effects weights and weighted effect sizes, computed once per estimator. """
+        key = self._estimator_key(tau_square_estimator)
+        if key not in self._re_sums:
+            tau_square = self.estimate_tau_square(tau_square_estimator)
+            if not np.any(tau_square):
+                self._re_sums[key] = (self.sum_w, self.sum_wy)
+            else:
+                effect_sizes, variances = self._arrays()
+                if self.offsets is not None:
+                    ivw = 1 / (variances + np.repeat(tau_square, self.k))
+                    self._re_sums[key] = (self.segment_sum(ivw, self.offsets),
+                                          self.segment_sum(ivw * effect_sizes, self.offsets))
+                else:
+                    ivw = 1 / (variances + tau_square)
+                    self._re_sums[key] = (ivw.sum(), np.dot(ivw, effect_sizes))
+        return self._re_sums[key]
@@ -0,0 +1,199 @@
+from collections import namedtuple
+import csv
+import math
+import numpy as np
+from .Study import Study
+from .StudyPool import StudyPool
+from .outcomes.BinaryOutcome import BinaryOutcome
+from .outcomes.ContinuousOutcome import ContinuousOutcome
+
+
+LoadError = namedtuple('LoadError', ['line', 'citation', 'message'])
+
+
+class OutcomeLoader:
+    """ Streaming loader that builds studies from a table of coded outcomes, one outcome per row
+        (e.g. a CSV export of an extraction spreadsheet). Rows are read lazily and processed in
+        chunks through a generator pipeline: parse the row, construct a BinaryOutcome or
+        ContinuousOutcome, estimate the effect sizes of the whole chunk with estimate_batch(),
+        and group outcomes into studies by citation. Only the current chunk of raw rows is held
+        in memory. Rows that are malformed (missing fields, non-numeric values, proportions of
+        0 or 1, which have no logit) or whose estimates are not finite are skipped and recorded
+        in errors instead of aborting the load.
+
+        Every row needs citation, label, treat_n, control_n and the post-period fields of its
+        outcome type (see fields); note, pre-period fields and a type column are optional.
+
+    Attributes:
+        outcome_type (str) 'binary' or 'continuous'; read from the type column of each row if None
+        columns (dict) maps outcome fields (see fields) to column names in the source
+        moderators (list) columns holding study-level moderators
+        chunk_size (int) number of rows estimated together
+        use_pre (bool) use gains scores for rows with complete pre-period data
+        errors (list) LoadError of every skipped row of the last load
+    """
+
+    fields = {'binary': ('treat_post', 'control_post', 'treat_pre', 'control_pre'),
+              'continuous': ('treat_post', 'control_post', 'treat_post_sd', 'control_post_sd',
+                             'treat_pre', 'control_pre', 'treat_pre_sd', 'control_pre_sd')}
+    classes = {'binary': BinaryOutcome, 'continuous': ContinuousOutcome}
+
+    def __init__(self, outcome_type=None, columns=None, moderators=(), chunk_size=10000, use_pre=False):
+        """
+        :param outcome_type: (str) 'binary' or 'continuous'; read from the type column of each row if None
+        :param columns: (dict) column name of each field whose column is not named after the field
+        :param moderators: (list) columns holding study-level moderators
+        :param chunk_size: (int) number of rows estimated together
+        :param use_pre: (bool) use gains scores for rows with complete pre-period data
+        """
+        assert outcome_type in (None, 'binary', 'continuous'), "outcome_type must be 'binary' or 'continuous'"
+        self.outcome_type = outcome_type
+        self.columns = dict(columns or {})
+        self.moderators = list(moderators)
+        self.chunk_size = chunk_size
+        self.use_pre = use_pre
+        self.errors = []
+
+    def load(self, source):
+        """ Read every row of a source and group the estimated outcomes into studies.
+
+        :param source: (str, file or iterable) path of a CSV file, open file, or iterable of dict rows
+        :return: (list) studies in order of first appearance; skipped rows are listed in errors
+        """
+        self.errors = []
+        studies = {}
+        for row, outcome in self.outcomes(source):
+            citation = row[self._column('citation')]
+            study = studies.get(citation)
+            if study is None:
+                study = Study(row.get(self._column('note'), '') or '', citation,
+                              moderators={name: self._moderator(row.get(name)) for name in self.moderators})
+                studies[citation] = study
+            study.append_outcome(outcome)
+        return list(studies.values())
+
+    def load_pool(self, source, outcome_label=''):
+        """ Read a source into a StudyPool.
+
+        :param source: (str, file or iterable) path of a CSV file, open file, or iterable of dict rows
+        :param outcome_label: (str) type of outcome to register
+        :return: (StudyPool) pool of the loaded studies; skipped rows are listed in errors
+        """
+        return StudyPool(self.load(source), outcome_label=outcome_label)
+
+    def rows(self, source):
+        """ Yield (line number, row) pairs from a source without reading it all at once.
+
+        :param source: (str, file or iterable) path of a CSV file, open file, or iterable of dict rows
+        :return: (generator) line number and dict of column values of each row
+        """
+        if isinstance(source, str):
+            with open(source, newline='') as file:
+                yield from self.rows(file)
+        elif hasattr(source, 'read'):
+            reader = csv.DictReader(source)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            yield from enumerate(source, start=1)
+
+    def chunks(self, rows):
+        """ Group a stream of rows into lists of at most chunk_size rows.
+
+        :param rows: (iterable) rows from rows()
+        :return: (generator) lists of rows
+        """
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def outcomes(self, source):
+        """ Yield each valid row with its estimated outcome. Invalid rows are added to errors.
+
+        :param source: (str, file or iterable) path of a CSV file, open file, or iterable of dict rows
+        :return: (generator) row and outcome pairs, in source order
+        """
+        for chunk in self.chunks(self.rows(source)):
+            parsed = []
+            for line, row in chunk:
+                try:
+                    parsed.append((line, row, *self._parse(row)))
+                except (KeyError, ValueError, TypeError) as error:
+                    self.errors.append(LoadError(line, row.get(self._column('citation')), self._message(error)))
+            # estimate each kind of outcome of the chunk in one batch
+            groups = {}
+            for entry in parsed:
+                groups.setdefault((type(entry[2]), entry[3]), []).append(entry[2])
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                for (cls, use_pre), outcomes in groups.items():
+                    cls.estimate_batch(outcomes, use_pre=use_pre)
+            for line, row, outcome, _ in parsed:
+                if math.isfinite(outcome.effect_size) and math.isfinite(outcome.variance) and outcome.variance > 0:
+                    yield row, outcome
+                else:
+                    self.errors.append(LoadError(line, row.get(self._column('citation')),
+                                                 'effect size or variance is not finite'))
+
+    def _parse(self, row):
+        """ Construct the outcome described by a row.
+
+        :return: (Outcome, bool) unestimated outcome, and whether gains scores will be used
+        """
+        outcome_type = self.outcome_type or row[self._column('type')].strip().lower()
+        if outcome_type not in self.fields:
+            raise ValueError(f'unknown outcome type {outcome_type!r}')
+        if not row.get(self._column('citation')):
+            raise ValueError('missing citation')
+        values = {field: self._number(row.get(self._column(field))) for field in self.fields[outcome_type]}
+        for field in self.fields[outcome_type]:
+            if 'post' in field and values[field] is None:
+                raise ValueError(f'missing {field}')
+        if outcome_type == 'binary':
+            for field, value in values.items():
+                # logits are undefined at proportions of 0 and 1
+                if value is not None and not 0 < value < 1:
+                    raise ValueError(f'{field} = {value} is not a proportion strictly between 0 and 1')
+        pre = [values[field] for field in self.fields[outcome_type] if 'pre' in field]
+        use_pre = self.use_pre and all(value is not None for value in pre)
+        outcome = self.classes[outcome_type](row[self._column('label')],
+                                             self._count(row[self._column('treat_n')]),
+                                             self._count(row[self._column('control_n')]),
+                                             **values)
+        return outcome, use_pre
+
+    def _column(self, field):
+        return self.columns.get(field, field)
+
+    @staticmethod
+    def _number(value):
+        """ Parse an optional number; empty cells are None. """
+        if value is None or str(value).strip() == '':
+            return None
+        return float(value)
+
+    @staticmethod
+    def _count(value):
+        """ Parse a sample size, which must be a positive whole number. """
+        count = float(value)
+        if not count.is_integer() or count <= 0:
+            raise ValueError(f'sample size {value!r} is not a positive whole number')
+        return int(count)
+
+    @staticmethod
+    def _moderator(value):
+        """ Moderators are numbers where possible and text otherwise. """
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+
+    @staticmethod
+    def _message(error):
+        if isinstance(error, KeyError):
+            return f'missing column {error.args[0]!r}'
+        return str(error)
@@ -0,0 +1,357 @@
+import numpy as np
+
+
+class OutcomeStore:
+    """ Columnar store holding the numeric fields of every outcome in a pool of studies.
+        Each row is one outcome. Labels are integer coded and each row records the index
+        of the study it belongs to, so selecting an outcome type is a boolean mask instead
+        of a walk over Study and Outcome objects. A label to row index and the
+        (effect_sizes, variances) arrays of each label are cached until rows of that label change.
+        Stores are shared copy-on-write (see share()): the columns are copied only when one of
+        the stores sharing them is first modified.
+
+    Attributes:
+        labels (list) outcome labels; the position of a label is its integer code
+        size (int) number of rows in use
+        effect_sizes (numpy 1d array) effect size of each row
+        variances (numpy 1d array) variance of each row
+        treat_ns (numpy 1d array) treatment group sample size of each row
+        control_ns (numpy 1d array) control group sample size of each row
+        label_codes (numpy 1d array) integer code of each row's label
+        study_index (numpy 1d array) index of the study each row belongs to
+        outcome_ids (numpy 1d array) id of the Outcome each row was taken from, or -1
+    """
+
+    _columns = (('effect_sizes', np.float64),
+                ('variances', np.float64),
+                ('treat_ns', np.int64),
+                ('control_ns', np.int64),
+                ('label_codes', np.int32),
+                ('study_index', np.int32),
+                ('outcome_ids', np.int64))
+
+    def __init__(self, capacity=16):
+        """
+        :param capacity: (int) number of rows to allocate before the first resize
+        """
+        self.labels = []
+        self._label_codes = {}
+        self.size = 0
+        self._data = {name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in self._columns}
+        self._label_index = None
+        self._arrays_cache = {}
+        self._shared = False
+
+    @classmethod
+    def from_studies(cls, studies):
+        """ Build a store from a list of studies.
+
+        :param studies: (list) collection containing studies
+        :return: (OutcomeStore) store with one row per outcome, in study order
+        """
+        store = cls(capacity=sum(len(study.outcomes) for study in studies))
+        for study_index, study in enumerate(studies):
+            store.append_study(study, study_index)
+        return store
+
+    @classmethod
+    def from_columns(cls, labels, columns):
+        """ Build a store over existing column arrays, e.g. memory maps of a saved pool, without
+            copying them. The store treats the arrays as shared: they are copied before the
+            first modification, so read-only arrays can be used.
+
+        :param labels: (list) outcome labels; the position of a label is its integer code
+        :param columns: (dict) array of every column, keyed by column name, all of the same length
+        :return: (OutcomeStore) store with one row per array element
+        """
+        store = cls(capacity=1)
+        store.labels = list(labels)
+        store._label_codes = {label: code for code, label in enumerate(store.labels)}
+        store._data = {name: columns[name] for name, _ in cls._columns}
+        store.size = len(store._data['effect_sizes'])
+        store._shared = True
+        return store
+
+    @property
+    def effect_sizes(self):
+        return self._data['effect_sizes'][:self.size]
+
+    @property
+    def variances(self):
+        return self._data['variances'][:self.size]
+
+    @property
+    def treat_ns(self):
+        return self._data['treat_ns'][:self.size]
+
+    @property
+    def control_ns(self):
+        return self._data['control_ns'][:self.size]
+
+    @property
+    def label_codes(self):
+        return self._data['label_codes'][:self.size]
+
+    @property
+    def study_index(self):
+        return self._data['study_index'][:self.size]
+
+    @property
+    def outcome_ids(self):
+        return self._data['outcome_ids'][:self.size]
+
+    def encode_label(self, label):
+        """ Get the integer code of a label, registering the label if it is new.
+
+        :param label: (str) type of outcome
+        :return: (int) label code
+        """
+        code = self._label_codes.get(label)
+        if code is None:
+            self._detach()
+            code = len(self.labels)
+            self._label_codes[label] = code
+            self.labels.append(label)
+        return code
+
+    def label_code(self, label):
+        """ Get the integer code of a label without registering it.
+
+        :param label: (str) type of outcome
+        :return: (int) label code, or -1 if no row has this label
+        """
+        return self._label_codes.get(label, -1)
+
+    def mask(self, label):
+        """ Boolean mask selecting the rows of one outcome type.
+
+        :param label: (str) type of outcome
+        :return: (numpy 1d array) True for rows with the given label
+        """
+        return self.label_codes == self.label_code(label)
+
+    def rows(self, label):
+        """ Row indices of one outcome type, in row order.
+
+        :param label: (str) type of outcome
+        :return: (numpy 1d array) indices of rows with the given label
+        """
+        code = self.label_code(label)
+        if code < 0:
+            return np.array([], dtype=np.intp)
+        order, offsets = self._index()
+        return order[offsets[code]:offsets[code + 1]]
+
+    def outcome_positions(self):
+        """ Position of each row's outcome in the outcome list of its study. Rows of a study are
+            kept in the order of its outcomes, though rows appended later are not contiguous.
+
+        :return: (numpy 1d array) position of each row within its study
+        """
+        order = np.argsort(self.study_index, kind='stable')
+        starts = np.flatnonzero(np.diff(self.study_index[order], prepend=-1))
+        positions = np.empty(self.size, dtype=np.intp)
+        positions[order] = np.arange(self.size) - np.repeat(starts, np.diff(np.append(starts, self.size)))
+        return positions
+
+    def segments(self, labels=None):
+        """ Effect sizes and variances of several outcome types, grouped so that the rows of
+            each label are contiguous. Suitable for segmented reductions such as np.add.reduceat.
+
+        :param labels: (list) outcome labels to include; defaults to every label with at least one row
+        :return: (list, numpy 1d array, numpy 1d array, numpy 1d array) labels, effect sizes, variances,
+                  and offsets such that rows offsets[i]:offsets[i+1] belong to labels[i]
+        """
+        order, offsets = self._index()
+        counts = np.diff(offsets)
+        if labels is None:
+            codes = np.flatnonzero(counts)
+            labels = [self.labels[code] for code in codes]
+            rows = order
+        else:
+            labels = list(labels)
+            codes = np.array([self.label_code(label) for label in labels], dtype=np.intp)
+            rows = np.concatenate([order[offsets[code]:offsets[code + 1]] for code in codes if code >= 0] +
+                                  [np.array([], dtype=np.intp)])
+        segment_offsets = np.zeros(len(labels) + 1, dtype=np.intp)
+        np.cumsum([counts[code] if code >= 0 else 0 for code in codes], out=segment_offsets[1:])
+        return labels, self.effect_sizes[rows], self.variances[rows], segment_offsets
+
+    def arrays(self, label):
+        """ Effect sizes and variances of one outcome type. Results are cached per label,
+            and the returned arrays are read-only because they are shared between calls.
+
+        :param label: (str) type of outcome
+        :return: (numpy 1d array, numpy 1d array) effect sizes, variances
+        """
+        arrays = self._arrays_cache.get(label)
+        if arrays is None:
+            rows = self.rows(label)
+            arrays = (self.effect_sizes[rows], self.variances[rows])
+            for array in arrays:
+                array.setflags(write=False)
+            self._arrays_cache[label] = arrays
+        return arrays
+
+    def append(self, label, study_index, treat_n, control_n, effect_size, variance, outcome_id=-1):
+        """ Add one outcome row.
+
+        :return: (int) index of the new row
+        """
+        self._detach()
+        self._reserve(self.size + 1)
+        row = self.size
+        self._data['effect_sizes'][row] = effect_size
+        self._data['variances'][row] = variance
+        self._data['treat_ns'][row] = treat_n
+        self._data['control_ns'][row] = control_n
+        self._data['label_codes'][row] = self.encode_label(label)
+        self._data['study_index'][row] = study_index
+        self._data['outcome_ids'][row] = outcome_id
+        self.size += 1
+        self._invalidate([label])
+        return row
+
+    def extend(self, labels, study_index, treat_ns, control_ns, effect_sizes, variances, outcome_ids=-1):
+        """ Add many outcome rows at once. All arguments except labels may be scalars
+            or arrays of the same length as labels.
+
+        :return: (numpy 1d array) indices of the new rows
+        """
+        count = len(labels)
+        self._detach()
+        self._reserve(self.size + count)
+        rows = slice(self.size, self.size + count)
+        self._data['effect_sizes'][rows] = effect_sizes
+        self._data['variances'][rows] = variances
+        self._data['treat_ns'][rows] = treat_ns
+        self._data['control_ns'][rows] = control_ns
+        self._data['label_codes'][rows] = [self.encode_label(label) for label in labels]
+        self._data['study_index'][rows] = study_index
+        self._data['outcome_ids'][rows] = outcome_ids
+        self.size += count
+        self._invalidate(set(labels))
+        return np.arange(rows.start, rows.stop)
+
+    def append_study(self, study, study_index):
+        """ Add one row for every outcome of a study.
+
+        :param study: (Study) study whose outcomes are added
+        :param study_index: (int) position of the study in its pool
+        :return: (numpy 1d array) indices of the new rows
+        """
+        outcomes = study.outcomes
+        return self.extend([outcome.label for outcome in outcomes],
+                           study_index,
+                           [outcome.treat_n for outcome in outcomes],
+                           [outcome.control_n for outcome in outcomes],
+                           [outcome.effect_size for outcome in outcomes],
+                           [outcome.variance for outcome in outcomes],
+                           [outcome.id for outcome in outcomes])
+
+    def remove_study(self, study_index):
+        """ Drop the rows of one study and shift the index of later studies down by one.
+            Rows are compacted, so this takes time linear in the number of rows.
+
+        :param study_index: (int) position of the study in its pool
+        :return: None
+        """
+        keep = self.study_index != study_index
+        size = int(keep.sum())
+        if self._shared:
+            # write the kept rows to new columns instead of copying the shared ones first
+            labels = self._labels_of(~keep)
+            self._data = {name: self._data[name][:self.size][keep] for name, _ in self._columns}
+            self._detach(copy_columns=False)
+            self._invalidate(labels)
+        else:
+            self._invalidate(self._labels_of(~keep))
+            for name, _ in self._columns:
+                self._data[name][:size] = self._data[name][:self.size][keep]
+        self.size = size
+        study_index_column = self._data['study_index'][:size]
+        study_index_column[study_index_column > study_index] -= 1
+
+    def set_estimates(self, rows, effect_sizes, variances):
+        """ Overwrite effect sizes and variances of existing rows, e.g. with the output
+            of BinaryOutcome.estimate_arrays() or ContinuousOutcome.estimate_arrays().
+
+        :param rows: (array-like) row indices or boolean mask
+        :param effect_sizes: (array-like) new effect sizes
+        :param variances: (array-like) new variances
+        :return: None
+        """
+        self._detach()
+        self.effect_sizes[rows] = effect_sizes
+        self.variances[rows] = variances
+        self._invalidate(self._labels_of(rows))
+
+    def share(self):
+        """ Create a copy of the store that shares its columns and caches until either store is modified.
+
+        :return: (OutcomeStore) copy-on-write copy of calling instance
+        """
+        store = OutcomeStore.__new__(OutcomeStore)
+        store.__dict__.update(self.__dict__)
+        store._shared = self._shared = True
+        return store
+
+    def copy(self):
+        """ Create a copy of the store, trimmed to the rows in use.
+
+        :return: (OutcomeStore) copy of calling instance
+        """
+        store = OutcomeStore(capacity=self.size)
+        store.labels = list(self.labels)
+        store._label_codes = dict(self._label_codes)
+        store.size = self.size
+        for name, _ in self._columns:
+            store._data[name][:self.size] = self._data[name][:self.size]
+        return store
+
+    def _detach(self, copy_columns=True):
+        """ Give a shared store its own columns, labels and caches before it is modified. """
+        if not self._shared:
+            return
+        if copy_columns:
+            self._data = {name: column.copy() for name, column in self._data.items()}
+        self.labels = list(self.labels)
+        self._label_codes = dict(self._label_codes)
+        self._arrays_cache = dict(self._arrays_cache)
+        self._shared = False
+
+    def _index(self):
+        """ Rows sorted by label code, and offsets delimiting the rows of each code. """
+        if self._label_index is None:
+            order = np.argsort(self.label_codes, kind='stable')
+            offsets = np.zeros(len(self.labels) + 1, dtype=np.intp)
+            np.cumsum(np.bincount(self.label_codes, minlength=len(self.labels)), out=offsets[1:])
+            self._label_index = (order, offsets)
+        return self._label_index
+
+    def _labels_of(self, rows):
+        """ Labels present in a selection of rows. """
+        return [self.labels[code] for code in np.unique(self.label_codes[rows])]
+
+    def _invalidate(self, labels):
+        """ Drop the label index and the cached arrays of labels whose rows changed. """
+        self._label_index = None
+        for label in labels:
+            self._arrays_cache.pop(label, None)
+
+    def _reserve(self, size):
+        """ Grow column arrays geometrically so appends are amortized constant time. """
+        capacity = len(self._data['effect_sizes'])
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for name, dtype in self._columns:
+            column = np.empty(capacity, dtype=dtype)
+            column[:self.size] = self._data[name][:self.size]
+            self._data[name] = column
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f'OutcomeStore(rows={self.size}, labels={len(self.labels)})'
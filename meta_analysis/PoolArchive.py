@@ -0,0 +1,373 @@
+from collections.abc import MutableSequence
+import itertools
+import json
+import os
+import weakref
+import numpy as np
+from .Study import Study
+from .OutcomeStore import OutcomeStore
+from .outcomes.Outcome import Outcome
+from .outcomes.BinaryOutcome import BinaryOutcome
+from .outcomes.ContinuousOutcome import ContinuousOutcome
+
+
+class PoolArchive:
+    """ On-disk format of a StudyPool: a directory of .npy files holding the numeric fields of
+        every outcome and study as columns, and a string table holding every distinct label,
+        citation, note and estimation method once as UTF-8 bytes. Columns refer to strings by
+        their index in the table.
+
+        Opening an archive maps the files into memory (np.load with mmap_mode) instead of reading
+        them, so it takes constant time regardless of the number of outcomes. Pages are read
+        when an analysis touches them, and processes that open the same archive share them
+        through the page cache. Study and Outcome objects are only built for the studies that
+        are accessed (see ArchivedStudies).
+
+        Outcomes get fresh ids from Outcome._id_allocator when the archive is opened, so ids
+        never collide with outcomes created in the opening process.
+
+    Attributes:
+        path (str) directory holding the archive
+        mmap_mode (str) mode passed to np.load; 'r' maps files read-only, None reads them into memory
+        n_studies (int) number of studies
+        n_outcomes (int) number of outcomes
+        labels (list) outcome labels; the position of a label is its integer code
+        moderator_names (list) names of study-level moderators
+    """
+
+    version = 1
+    kinds = (Outcome, BinaryOutcome, ContinuousOutcome)
+    measures = ('treat_post', 'control_post', 'treat_pre', 'control_pre',
+                'treat_post_sd', 'control_post_sd', 'treat_pre_sd', 'control_pre_sd')
+    _missing_moderator = -2
+    _numeric_moderator = -1
+
+    def __init__(self, path, mmap_mode='r'):
+        """
+        :param path: (str) directory holding the archive
+        :param mmap_mode: (str) 'r' to map files read-only, None to read them into memory
+        """
+        assert mmap_mode in ('r', None), "mmap_mode must be 'r' or None"
+        self.path = path
+        self.mmap_mode = mmap_mode
+        with open(os.path.join(path, 'header.json')) as file:
+            header = json.load(file)
+        if header['version'] != self.version:
+            raise ValueError(f'unsupported archive version {header["version"]}')
+        self.n_studies = header['studies']
+        self.n_outcomes = header['outcomes']
+        self._strings = self._load('strings')
+        self._string_offsets = self._load('string_offsets')
+        self.labels = [self.string(index) for index in self._load('labels')]
+        self.moderator_names = [self.string(index) for index in self._load('moderator_names')]
+        start = Outcome._id_allocator.reserve(self.n_outcomes).start
+        self.outcome_ids = np.arange(start, start + self.n_outcomes, dtype=np.int64)
+        self._mapped = {}
+
+    @classmethod
+    def save(cls, study_pool, path):
+        """ Write a pool to a directory, creating it if needed. Outcomes of types other than
+            BinaryOutcome and ContinuousOutcome are saved as Outcome.
+
+        :param study_pool: (StudyPool) pool to save
+        :param path: (str) directory to write the archive to
+        :return: None
+        """
+        study_pool._sync_store()
+        store = study_pool._store
+        studies = study_pool.studies._objects()
+        outcomes = [outcome for study in studies for outcome in study.outcomes]
+        strings = {}
+
+        def encode(value):
+            return strings.setdefault(value, len(strings))
+
+        moderator_names = list(dict.fromkeys(name for study in studies for name in study.moderators))
+        moderator_values = np.full((len(studies), len(moderator_names)), np.nan)
+        moderator_text = np.full((len(studies), len(moderator_names)), cls._missing_moderator, dtype=np.int32)
+        for i, study in enumerate(studies):
+            for j, name in enumerate(moderator_names):
+                if name not in study.moderators:
+                    continue
+                value = study.moderators[name]
+                if isinstance(value, str):
+                    moderator_text[i, j] = encode(value)
+                else:
+                    moderator_values[i, j] = value
+                    moderator_text[i, j] = cls._numeric_moderator
+
+        measures = np.full((len(outcomes), len(cls.measures)), np.nan)
+        kinds = np.zeros(len(outcomes), dtype=np.int8)
+        for row, outcome in enumerate(outcomes):
+            for kind in range(len(cls.kinds) - 1, 0, -1):
+                if isinstance(outcome, cls.kinds[kind]):
+                    kinds[row] = kind
+                    break
+            for column, name in enumerate(cls.measures):
+                value = getattr(outcome, name, None)
+                if value is not None:
+                    measures[row, column] = value
+
+        columns = {
+            'labels': [encode(label) for label in store.labels],
+            'moderator_names': [encode(name) for name in moderator_names],
+            'moderator_values': moderator_values,
+            'moderator_text': moderator_text,
+            'study_citations': [encode(study.citation) for study in studies],
+            'study_notes': [encode(study.note) for study in studies],
+            'study_offsets': np.cumsum([0] + [len(study.outcomes) for study in studies]),
+            'outcome_kinds': kinds,
+            'outcome_notes': [encode(outcome.note) for outcome in outcomes],
+            'outcome_methods': [encode(outcome.method) for outcome in outcomes],
+            'outcome_measures': measures}
+        # rows appended to a study after the store was built sit at its end; save them in outcome order
+        order = np.argsort(store.study_index, kind='stable')
+        for name, _ in OutcomeStore._columns:
+            if name != 'outcome_ids':
+                columns[name] = getattr(store, name)[order]
+        encoded = [value.encode('utf-8') for value in strings]
+        columns['strings'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        columns['string_offsets'] = np.cumsum([0] + [len(value) for value in encoded])
+
+        os.makedirs(path, exist_ok=True)
+        for name, column in columns.items():
+            column = np.asarray(column)
+            if name in ('labels', 'moderator_names', 'study_citations', 'study_notes', 'outcome_notes',
+                        'outcome_methods'):
+                column = column.astype(np.int32)
+            np.save(os.path.join(path, name + '.npy'), column)
+        with open(os.path.join(path, 'header.json'), 'w') as file:
+            json.dump({'version': cls.version, 'studies': len(studies), 'outcomes': len(outcomes)}, file)
+
+    def store(self):
+        """ Columnar store over the mapped outcome columns. Columns are copied into memory only
+            if the store is modified.
+
+        :return: (OutcomeStore) store with one row per outcome, in study order
+        """
+        columns = {name: self._column(name) for name, _ in OutcomeStore._columns if name != 'outcome_ids'}
+        columns['outcome_ids'] = self.outcome_ids
+        return OutcomeStore.from_columns(self.labels, columns)
+
+    def studies(self):
+        """ Studies of the archive, built on first access.
+
+        :return: (ArchivedStudies) mutable sequence of studies
+        """
+        return ArchivedStudies(self)
+
+    def string(self, index):
+        """ Decode one entry of the string table.
+
+        :param index: (int) position of the string in the table
+        :return: (str) decoded string
+        """
+        return bytes(self._strings[self._string_offsets[index]:self._string_offsets[index + 1]]).decode('utf-8')
+
+    def study(self, index):
+        """ Build one study and its outcomes from the archive.
+
+        :param index: (int) position of the study in the saved pool
+        :return: (Study) new study
+        """
+        start, stop = (int(offset) for offset in self._column('study_offsets')[index:index + 2])
+        moderators = {}
+        text = self._column('moderator_text')[index]
+        values = self._column('moderator_values')[index]
+        for name, code, value in zip(self.moderator_names, text.tolist(), values.tolist()):
+            if code == self._numeric_moderator:
+                moderators[name] = value
+            elif code != self._missing_moderator:
+                moderators[name] = self.string(code)
+        return Study(self.string(self._column('study_notes')[index]),
+                     self.string(self._column('study_citations')[index]),
+                     outcomes=[self.outcome(row) for row in range(start, stop)],
+                     moderators=moderators)
+
+    def outcome(self, row):
+        """ Build one outcome from the archive. Attributes are set directly, so building an
+            outcome neither allocates an id nor counts as an edit.
+
+        :param row: (int) position of the outcome in the saved pool
+        :return: (Outcome) new Outcome, BinaryOutcome or ContinuousOutcome
+        """
+        cls = self.kinds[self._column('outcome_kinds')[row]]
+        outcome = cls.__new__(cls)
+        outcome.label = self.labels[self._column('label_codes')[row]]
+        outcome.treat_n = int(self._column('treat_ns')[row])
+        outcome.control_n = int(self._column('control_ns')[row])
+        outcome.effect_size = float(self._column('effect_sizes')[row])
+        outcome.variance = float(self._column('variances')[row])
+        outcome.note = self.string(self._column('outcome_notes')[row])
+        outcome.method = self.string(self._column('outcome_methods')[row])
+        outcome.id = int(self.outcome_ids[row])
+        if cls is not Outcome:
+            measures = self._column('outcome_measures')[row].tolist()
+            for name, value in zip(self.measures, measures):
+                if hasattr(cls, name):
+                    setattr(outcome, name, None if np.isnan(value) else value)
+        return outcome
+
+    def _column(self, name):
+        """ Mapped column, opened once per archive. """
+        if name not in self._mapped:
+            self._mapped[name] = self._load(name)
+        return self._mapped[name]
+
+    def _load(self, name):
+        return np.load(os.path.join(self.path, name + '.npy'), mmap_mode=self.mmap_mode)
+
+    def __repr__(self):
+        return f'PoolArchive(path={self.path!r}, studies={self.n_studies}, outcomes={self.n_outcomes})'
+
+
+class ArchivedStudies(MutableSequence):
+    """ List of the studies of an opened archive, each built from the archive the first time it
+        is accessed and kept afterwards, so edits to a study persist. Studies can be added,
+        replaced and removed as in a list.
+
+    Attributes:
+        archive (PoolArchive) archive the studies are read from
+    """
+
+    def __init__(self, archive):
+        """
+        :param archive: (PoolArchive) archive the studies are read from
+        """
+        self.archive = archive
+        # archive index of every position, or a negative key for studies added after opening;
+        # the first _size elements are in use and the rest is spare capacity for appends
+        self._buffer = np.arange(archive.n_studies, dtype=np.int64)
+        self._size = archive.n_studies
+        # built and added studies by key
+        self._built = {}
+        self._keys = itertools.count(1)
+        # key of every built or added study by id, None for a study added under several keys
+        self._key_of = {}
+        # position of every key; None until first needed
+        self._index = None
+        # pools holding these studies; studies register them when they are built
+        self._pools = []
+
+    @property
+    def _positions(self):
+        return self._buffer[:self._size]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        key = int(self._positions[index])
+        study = self._built.get(key)
+        if study is None:
+            study = self._built[key] = self.archive.study(key)
+            self._key_of[id(study)] = key
+            for ref in self._pools:
+                study_pool = ref()
+                if study_pool is not None:
+                    study._attach(study_pool)
+        return study
+
+    def __setitem__(self, index, study):
+        self._positions[index] = self._add(study)
+        self._index = None
+
+    def __delitem__(self, index):
+        positions = np.delete(self._positions, index)
+        self._buffer[:positions.size] = positions
+        self._size = positions.size
+        self._index = None
+
+    def insert(self, index, study):
+        """ Insert a study before index, as list.insert(). Spare capacity grows geometrically,
+            so appending takes amortized constant time; inserting elsewhere shifts later positions.
+        """
+        size = self._size
+        index = min(max(index + size if index < 0 else index, 0), size)
+        if size == self._buffer.size:
+            buffer = np.empty(max(2 * size, 16), dtype=np.int64)
+            buffer[:size] = self._buffer[:size]
+            self._buffer = buffer
+        self._buffer[index + 1:size + 1] = self._buffer[index:size]
+        key = self._buffer[index] = self._add(study)
+        self._size = size + 1
+        if index == size and self._index is not None:
+            self._index[key] = index
+        else:
+            self._index = None
+
+    def __len__(self):
+        return self._size
+
+    def _attach(self, study_pool):
+        """ Register a pool with the studies built so far and with every study built later. """
+        self._pools.append(weakref.ref(study_pool))
+        for study in self._built.values():
+            study._attach(study_pool)
+
+    def _peek(self, index):
+        """ Study at a position, as self[index]. """
+        return self[index]
+
+    def _objects(self):
+        """ Every study of the list, building the studies not built yet. """
+        return list(self)
+
+    def _position(self, study):
+        """ Position of a study, found by identity in constant time.
+
+        :param study: (Study) study of the list
+        :return: (int) position, -1 if the study was added more than once, or None if it is not held
+        """
+        if id(study) not in self._key_of:
+            return None
+        key = self._key_of[id(study)]
+        if key is None:
+            return -1
+        if self._index is None:
+            self._index = dict(zip(self._positions.tolist(), range(self._size)))
+        return self._index.get(key)
+
+    def _add(self, study):
+        """ Key a study that does not come from the archive. """
+        key = -next(self._keys)
+        self._built[key] = study
+        self._key_of[id(study)] = None if id(study) in self._key_of else key
+        return key
+
+    def _index_keys(self):
+        """ Key the built studies by id, e.g. after they were copied or unpickled. """
+        self._key_of = {}
+        for key, study in self._built.items():
+            self._key_of[id(study)] = None if id(study) in self._key_of else key
+
+    def copy(self):
+        """ Create a copy of the list. Studies built so far are copied with Study.copy(); the
+            others are built from the archive when the copy first accesses them.
+
+        :return: (ArchivedStudies) copy of calling instance, registered with no pool
+        """
+        studies = ArchivedStudies.__new__(ArchivedStudies)
+        studies.archive = self.archive
+        studies._buffer = self._positions.copy()
+        studies._size = self._size
+        studies._built = {key: study.copy() for key, study in self._built.items()}
+        studies._keys = self._keys
+        studies._index_keys()
+        studies._index = None if self._index is None else dict(self._index)
+        studies._pools = []
+        return studies
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        # pools register again when they are unpickled, and ids do not survive pickling
+        state['_pools'] = []
+        state['_key_of'] = {}
+        state['_index'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._index_keys()
+
+    def __repr__(self):
+        return f'ArchivedStudies(studies={len(self)}, built={len(self._built)})'
@@ -0,0 +1,130 @@
+import numpy as np
+from .MetaSummary import MetaSummary, MetaAnalysisResult
+
+
+class PoolBatch:
+    """ Many independent pools analyzed together, e.g. the replicates of a simulation study or
+        one pool per region. The effect sizes of every pool are packed into one ragged array,
+        with the rows of each pool contiguous, and the fixed and random effects estimates, Q,
+        tau-square and I-square of all pools come from one segmented MetaSummary
+        (see MetaSummary.from_segments()), so the analysis costs a few array elements per pool
+        rather than a Python call chain. Building the batch from arrays (from_arrays(),
+        from_padded()) is vectorized as well; from_pools() still reads each pool's store in
+        Python, which takes a few microseconds per pool (see benchmarks/bench_batch.py).
+
+    Attributes:
+        effect_sizes (numpy 1d array) effect sizes, with the rows of each pool contiguous
+        variances (numpy 1d array) variances, in the same order
+        offsets (numpy 1d array) rows offsets[i]:offsets[i+1] belong to pool i
+        names (list) identifier of each pool, or None
+        summary (MetaSummary) summary of each pool
+    """
+
+    def __init__(self, effect_sizes, variances, offsets, names=None):
+        """
+        :param effect_sizes: (numpy 1d array) effect sizes, with the rows of each pool contiguous
+        :param variances: (numpy 1d array) variances, in the same order
+        :param offsets: (numpy 1d array) pool boundaries
+        :param names: (list) identifier of each pool
+        """
+        self.effect_sizes = np.asarray(effect_sizes, dtype=float)
+        self.variances = np.asarray(variances, dtype=float)
+        self.offsets = np.asarray(offsets, dtype=np.intp)
+        assert self.effect_sizes.shape == self.variances.shape, 'effect sizes and variances must have the same shape'
+        assert self.offsets[0] == 0 and self.offsets[-1] == self.effect_sizes.size, \
+            'offsets must start at 0 and end at the number of effect sizes'
+        assert names is None or len(names) == len(self), 'names must have one element per pool'
+        self.names = names
+        self.summary = MetaSummary.from_segments(self.effect_sizes, self.variances, self.offsets)
+
+    @classmethod
+    def from_pools(cls, study_pools, outcome_label=None, names=None):
+        """ Stack the outcomes of one type from many pools.
+
+        :param study_pools: (list) StudyPool objects
+        :param outcome_label: (str) type of outcome to analyze; the label registered in each pool if None
+        :param names: (list) identifier of each pool
+        :return: (PoolBatch)
+        """
+        stores = []
+        codes = []
+        for study_pool in study_pools:
+            study_pool._sync_store()
+            stores.append(study_pool._store)
+            codes.append(study_pool._store.label_code(study_pool.outcome_label if outcome_label is None
+                                                      else outcome_label))
+        # gather the columns of every store at once and keep the rows of each pool's label
+        sizes = [len(store) for store in stores]
+        keep = np.concatenate([store.label_codes for store in stores] + [np.array([], dtype=np.intp)]) == \
+            np.repeat(codes, sizes)
+        pools = np.repeat(np.arange(len(stores)), sizes)[keep]
+        offsets = np.zeros(len(stores) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(pools, minlength=len(stores)), out=offsets[1:])
+        empty = [np.array([])]
+        return cls(np.concatenate([store.effect_sizes for store in stores] + empty)[keep],
+                   np.concatenate([store.variances for store in stores] + empty)[keep], offsets, names)
+
+    @classmethod
+    def from_arrays(cls, effect_sizes, variances, names=None):
+        """ Stack per-pool arrays of different lengths.
+
+        :param effect_sizes: (list) 1d arrays of effect sizes, one per pool
+        :param variances: (list) 1d arrays of variances, one per pool
+        :param names: (list) identifier of each pool
+        :return: (PoolBatch)
+        """
+        assert len(effect_sizes) == len(variances), 'effect sizes and variances must have one array per pool'
+        offsets = np.zeros(len(effect_sizes) + 1, dtype=np.intp)
+        np.cumsum([len(array) for array in effect_sizes], out=offsets[1:])
+        empty = [np.array([])]
+        return cls(np.concatenate(list(effect_sizes) + empty), np.concatenate(list(variances) + empty), offsets,
+                   names)
+
+    @classmethod
+    def from_padded(cls, effect_sizes, variances, names=None):
+        """ Unpack pools stored one per row of 2d arrays, padded with nan, as produced by
+            simulations that draw a fixed maximum number of studies per pool.
+
+        :param effect_sizes: (numpy 2d array) one pool per row, padded with nan
+        :param variances: (numpy 2d array) one pool per row, padded with nan
+        :param names: (list) identifier of each pool
+        :return: (PoolBatch)
+        """
+        effect_sizes = np.atleast_2d(np.asarray(effect_sizes, dtype=float))
+        variances = np.atleast_2d(np.asarray(variances, dtype=float))
+        valid = ~(np.isnan(effect_sizes) | np.isnan(variances))
+        offsets = np.zeros(valid.shape[0] + 1, dtype=np.intp)
+        np.cumsum(valid.sum(axis=1), out=offsets[1:])
+        # boolean indexing is row-major, so the rows of each pool stay contiguous
+        return cls(effect_sizes[valid], variances[valid], offsets, names)
+
+    def result(self, method='auto', tau_square_estimator='DL'):
+        """ Meta-analysis of every pool.
+
+        :param method: (str) random effects if 're', fixed effects if 'fe', chosen per pool from
+                        its Q test if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :return: (MetaAnalysisResult) one array element per pool
+        """
+        return self.summary.result(method=method, tau_square_estimator=tau_square_estimator)
+
+    def results(self, method='auto', tau_square_estimator='DL'):
+        """ Meta-analysis of every pool, split into one record per pool.
+
+        :param method: (str) random effects if 're', fixed effects if 'fe', chosen per pool from
+                        its Q test if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :return: (list) MetaAnalysisResult of each pool, as StudyPool.summarize() would return it
+        """
+        result = self.result(method=method, tau_square_estimator=tau_square_estimator)
+        return [MetaAnalysisResult(str(method), effect_size, variance, q, int(dof), p, tau_square, i_square,
+                                   result.tau_square_estimator)
+                for method, effect_size, variance, q, dof, p, tau_square, i_square
+                in zip(result.method, result.effect_size, result.variance, result.q, result.dof, result.p,
+                       result.tau_square, result.i_square)]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __repr__(self):
+        return f'PoolBatch(pools={len(self)}, outcomes={self.effect_sizes.size})'
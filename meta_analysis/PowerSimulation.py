@@ -0,0 +1,149 @@
+from collections import namedtuple
+from statistics import NormalDist
+import math
+import numpy as np
+from .PoolBatch import PoolBatch
+from .outcomes.BinaryOutcome import BinaryOutcome
+from .outcomes.ContinuousOutcome import ContinuousOutcome
+
+
+PowerResult = namedtuple('PowerResult', ['power', 'power_se', 'n_replicates', 'effect_size', 'tau_square',
+                                         'random_effects_rate', 'effect_size_draws', 'detected'])
+
+
+class PowerSimulation:
+    """ Monte Carlo power of a planned meta-analysis. Each replicate is a synthetic pool of k studies
+        whose true effects are drawn around effect_size with between-study variance tau_square.
+        For binary and continuous outcomes, group summaries (proportions, or means and standard
+        deviations) are drawn from each study's sample sizes, and effect sizes are coded with the
+        vectorized estimators of BinaryOutcome and ContinuousOutcome, so replicates use the same
+        logit and SMD formulas, and the same large-sample variances, as real studies. For normal
+        outcomes, each standardized mean difference is drawn from its large-sample normal
+        distribution, with the variance of ContinuousOutcome.variance_arrays().
+        A chunk of replicates is drawn as 2d arrays (replicates x studies, nan-padded when k
+        varies) and pooled with one PoolBatch, without building Outcome or StudyPool objects.
+        Chunks can be spread over a process pool; every chunk gets its own seed spawned from
+        one SeedSequence, so results do not depend on n_jobs.
+
+    Attributes:
+        effect_size (float) mean true standardized mean difference
+        tau_square (float) between-study variance of true effects
+        k (int or tuple) number of studies per pool, or (min, max) drawn uniformly per replicate
+        sample_size (int or tuple) size of each group, or (min, max) drawn uniformly per study and group
+        outcome_type (str) 'binary', 'continuous' or 'normal'
+        control_rate (float) proportion of "successes" in control groups, for binary outcomes
+        method (str) pooled estimate used in each replicate: 'fe', 're' or 'auto'
+        tau_square_estimator (str or TauSquareEstimator) between-study variance estimator
+        alpha (float) significance level of the two-sided test of the pooled effect
+        chunk_size (int) number of replicates drawn together
+        n_jobs (int) number of worker processes; 1 evaluates chunks in the calling process
+        seed (int) seed of the SeedSequence from which chunk seeds are spawned
+
+    References (informal list):
+        Borenstein, M., Hedges, L. V., Higgins, J. P., & Rothstein, H. R. (2009). Introduction to
+            meta-analysis. John Wiley & Sons.
+
+        Hedges, L. V., & Pigott, T. D. (2001). The power of statistical tests in meta-analysis.
+            Psychological methods, 6(3), 203.
+    """
+
+    def __init__(self, effect_size, tau_square=0.0, k=10, sample_size=(20, 200), outcome_type='normal',
+                 control_rate=0.3, method='auto', tau_square_estimator='DL', alpha=0.05, chunk_size=1000,
+                 n_jobs=1, seed=None):
+        assert outcome_type in ('binary', 'continuous', 'normal'), \
+            "outcome_type must be 'binary', 'continuous' or 'normal'"
+        assert method in ('fe', 're', 'auto'), "method must be 'fe', 're' or 'auto'"
+        assert 0 < control_rate < 1, 'control_rate must be between 0 and 1'
+        assert tau_square >= 0, 'tau_square must be non-negative'
+        self.effect_size = effect_size
+        self.tau_square = tau_square
+        self.k = k
+        self.sample_size = sample_size
+        self.outcome_type = outcome_type
+        self.control_rate = control_rate
+        self.method = method
+        self.tau_square_estimator = tau_square_estimator
+        self.alpha = alpha
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs
+        self.seed = seed
+
+    def run(self, n_replicates=10000):
+        """ Simulate replicates and count how often the pooled effect is significant.
+
+        :param n_replicates: (int) number of synthetic pools
+        :return: (PowerResult) share of replicates with a significant pooled effect and its standard error,
+                  mean pooled effect size and tau-square, share of replicates pooled with random effects,
+                  pooled effect size and detection of every replicate
+        """
+        sizes = [min(self.chunk_size, n_replicates - start) for start in range(0, n_replicates, self.chunk_size)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        if self.n_jobs == 1 or len(sizes) == 1:
+            chunks = [self._chunk(size, seed) for size, seed in zip(sizes, seeds)]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+                chunks = list(executor.map(self._chunk, sizes, seeds))
+        effect_sizes, tau_squares, random_effects, detected = (np.concatenate(column) for column in zip(*chunks))
+        power = detected.mean()
+        return PowerResult(power, math.sqrt(power * (1 - power) / n_replicates), n_replicates,
+                           effect_sizes.mean(), tau_squares.mean(), random_effects.mean(), effect_sizes, detected)
+
+    def draw(self, n_replicates, rng):
+        """ Draw synthetic pools and code their studies.
+
+        :param n_replicates: (int) number of synthetic pools
+        :param rng: (numpy Generator) source of random numbers
+        :return: (numpy 2d array, numpy 2d array) effect sizes and variances, one pool per row, padded with nan
+        """
+        if isinstance(self.k, int):
+            k = np.full(n_replicates, self.k)
+        else:
+            k = rng.integers(self.k[0], self.k[1] + 1, n_replicates)
+        shape = (n_replicates, k.max(initial=0))
+        if isinstance(self.sample_size, int):
+            treat_n = control_n = np.full(shape, self.sample_size)
+        else:
+            treat_n, control_n = rng.integers(self.sample_size[0], self.sample_size[1] + 1, (2,) + shape)
+        true_effects = self.effect_size + math.sqrt(self.tau_square) * rng.standard_normal(shape)
+
+        if self.outcome_type == 'binary':
+            # shift the control log odds by the true effect on the logit scale, as estimate() undoes it
+            control_logit = math.log(self.control_rate / (1 - self.control_rate))
+            treat_rate = 1 / (1 + np.exp(-(control_logit + true_effects * math.pi / math.sqrt(3))))
+            # observed proportions, with half a success added so no group has a rate of 0 or 1
+            treat_post = (rng.binomial(treat_n, treat_rate) + 0.5) / (treat_n + 1)
+            control_post = (rng.binomial(control_n, self.control_rate) + 0.5) / (control_n + 1)
+            effect_sizes, variances = BinaryOutcome.estimate_arrays(treat_n, control_n, treat_post, control_post)
+        elif self.outcome_type == 'continuous':
+            # unit standard deviation in both groups, so the true mean difference is the true SMD
+            treat_post = true_effects + rng.standard_normal(shape) / np.sqrt(treat_n)
+            control_post = rng.standard_normal(shape) / np.sqrt(control_n)
+            treat_sd = np.sqrt(rng.chisquare(treat_n - 1) / (treat_n - 1))
+            control_sd = np.sqrt(rng.chisquare(control_n - 1) / (control_n - 1))
+            effect_sizes, variances = ContinuousOutcome.estimate_arrays(treat_n, control_n, treat_post,
+                                                                        control_post, treat_sd, control_sd)
+        else:
+            variances = ContinuousOutcome.variance_arrays(treat_n, control_n, true_effects)
+            effect_sizes = true_effects + np.sqrt(variances) * rng.standard_normal(shape)
+        padding = np.arange(shape[1]) >= k[:, np.newaxis]
+        effect_sizes[padding] = np.nan
+        variances[padding] = np.nan
+        return effect_sizes, variances
+
+    def _chunk(self, size, seed):
+        """ Draw and pool one chunk of replicates.
+
+        :return: (numpy 1d array, numpy 1d array, numpy 1d array, numpy 1d array) pooled effect size,
+                  tau-square, whether random effects were used and whether the effect was detected
+        """
+        effect_sizes, variances = self.draw(size, np.random.default_rng(seed))
+        result = PoolBatch.from_padded(effect_sizes, variances).result(
+            method=self.method, tau_square_estimator=self.tau_square_estimator)
+        z = result.effect_size / np.sqrt(result.variance)
+        detected = np.abs(z) > NormalDist().inv_cdf(1 - self.alpha / 2)
+        return result.effect_size, result.tau_square, result.method == 're', detected
+
+    def __repr__(self):
+        return f'PowerSimulation(effect_size={self.effect_size}, tau_square={self.tau_square}, k={self.k}, ' \
+               f'outcome_type={self.outcome_type!r}, method={self.method!r})'
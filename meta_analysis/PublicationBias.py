@@ -0,0 +1,179 @@
+from collections import namedtuple
+import numpy as np
+from .MetaSummary import MetaSummary
+
+
+EggerResult = namedtuple('EggerResult', ['intercept', 'standard_error', 't', 'p', 'slope'])
+BeggResult = namedtuple('BeggResult', ['tau', 'p'])
+TrimAndFillResult = namedtuple('TrimAndFillResult',
+                               ['estimator', 'side', 'k0', 'method', 'effect_size', 'variance',
+                                'filled_effect_sizes', 'filled_variances'])
+PetPeeseResult = namedtuple('PetPeeseResult',
+                            ['pet_effect_size', 'pet_standard_error', 'pet_p',
+                             'peese_effect_size', 'peese_standard_error', 'peese_p', 'method', 'effect_size'])
+
+
+class PublicationBias:
+    """ Small-study effect and publication bias diagnostics for one pool of effect sizes.
+        Effect sizes are sorted once on construction and prefix sums of the inverse variance
+        weights are kept, so each trim-and-fill iteration gets the estimate of the trimmed pool
+        (the smallest k - k0 effect sizes) from the prefix sums instead of rebuilding a pool.
+
+    Attributes:
+        effect_sizes (numpy 1d array) effect sizes
+        variances (numpy 1d array) variances
+
+    References (informal list):
+        Egger, M., Smith, G. D., Schneider, M., & Minder, C. (1997). Bias in meta-analysis detected by
+            a simple, graphical test. BMJ, 315(7109), 629-634.
+
+        Begg, C. B., & Mazumdar, M. (1994). Operating characteristics of a rank correlation test for
+            publication bias. Biometrics, 50(4), 1088-1101.
+
+        Duval, S., & Tweedie, R. (2000). Trim and fill: a simple funnel-plot-based method of testing and
+            adjusting for publication bias in meta-analysis. Biometrics, 56(2), 455-463.
+
+        Stanley, T. D., & Doucouliagos, H. (2014). Meta-regression approximations to reduce publication
+            selection bias. Research Synthesis Methods, 5(1), 60-78.
+    """
+
+    def __init__(self, effect_sizes, variances):
+        """
+        :param effect_sizes: (numpy 1d array) effect sizes
+        :param variances: (numpy 1d array) variances
+        """
+        self.effect_sizes = np.asarray(effect_sizes, dtype=float)
+        self.variances = np.asarray(variances, dtype=float)
+        self._order = np.argsort(self.effect_sizes, kind='stable')
+        self._prefix_sums = {}
+
+    def egger(self):
+        """ Egger's regression test: the standardized effect size is regressed on precision and a
+            non-zero intercept indicates funnel plot asymmetry.
+
+        :return: (EggerResult) intercept, its standard error, t statistic and two-sided p-value, and slope
+        """
+        # SciPy is imported on first use to keep the package import cheap
+        from scipy.stats import t as t_distribution
+        standard_errors = np.sqrt(self.variances)
+        coefficients, standard_error = self._wls(1 / standard_errors, self.effect_sizes / standard_errors,
+                                                 np.ones(self.effect_sizes.size))
+        t = coefficients[0] / standard_error[0]
+        p = 2 * t_distribution.sf(abs(t), self.effect_sizes.size - 2)
+        return EggerResult(coefficients[0], standard_error[0], t, p, coefficients[1])
+
+    def begg(self):
+        """ Begg and Mazumdar's rank correlation test between standardized effect sizes and variances.
+
+        :return: (BeggResult) Kendall's tau and its p-value
+        """
+        from scipy.stats import kendalltau
+        summary = MetaSummary.from_arrays(self.effect_sizes, self.variances)
+        standardized = (self.effect_sizes - summary.fe_effect_size) / np.sqrt(self.variances - summary.fe_variance)
+        tau, p = kendalltau(standardized, self.variances)
+        return BeggResult(tau, p)
+
+    def trim_and_fill(self, estimator='L0', side=None, method='fe', tau_square_estimator='DL', max_iter=100):
+        """ Duval and Tweedie's trim-and-fill. The k0 most extreme effect sizes on the side opposite the
+            missing studies are trimmed, the pooled effect size is re-estimated and k0 is re-estimated
+            from the ranks of the deviations, until k0 stops changing. Mirror images of the trimmed
+            effect sizes are then filled in and the pool is re-estimated.
+
+        :param estimator: (str) 'L0' or 'R0' estimator of the number of missing effect sizes
+        :param side: (str) side of the funnel plot on which effect sizes are missing, 'left' or 'right';
+                      chosen from the sign of Egger's intercept if None
+        :param method: (str) random effects if 're', fixed effects if 'fe'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator for 're'
+        :param max_iter: (int) maximum number of iterations
+        :return: (TrimAndFillResult) estimator, side, number of filled effect sizes, method, effect size and
+                  variance of the filled pool, filled effect sizes and their variances
+        """
+        from scipy.stats import rankdata
+        assert estimator in ('L0', 'R0'), "estimator must be 'L0' or 'R0'"
+        if side is None:
+            side = 'left' if self.egger().intercept > 0 else 'right'
+        assert side in ('left', 'right'), "side must be 'left' or 'right'"
+        # trim from the right of the sorted effect sizes; mirror the data when studies are missing on the right
+        sign = 1.0 if side == 'left' else -1.0
+        effect_sizes, variances, _ = self._sorted(side)
+        k = effect_sizes.size
+
+        k0 = 0
+        for _ in range(max_iter):
+            effect_size = self._trimmed_summary(side, k - k0).effect_size(method, tau_square_estimator)
+            deviations = effect_sizes - effect_size
+            ranks = rankdata(np.abs(deviations))
+            if estimator == 'L0':
+                wilcoxon = ranks[deviations > 0].sum()
+                updated = (4 * wilcoxon - k * (k + 1)) / (2 * k - 1)
+            else:
+                # length of the run of positive deviations among the largest absolute deviations
+                signs = deviations[np.argsort(-ranks, kind='stable')] > 0
+                updated = (np.argmin(signs) if not signs.all() else k) - 1
+            updated = min(max(0, int(round(updated))), k - 1)
+            if updated == k0:
+                break
+            k0 = updated
+
+        filled_effect_sizes = 2 * effect_size - effect_sizes[k - k0:]
+        filled_variances = variances[k - k0:]
+        summary = MetaSummary.from_arrays(np.concatenate([effect_sizes, filled_effect_sizes]),
+                                          np.concatenate([variances, filled_variances]))
+        return TrimAndFillResult(estimator, side, k0, method,
+                                 sign * summary.effect_size(method, tau_square_estimator),
+                                 summary.variance(method, tau_square_estimator),
+                                 sign * filled_effect_sizes, filled_variances)
+
+    def pet_peese(self, alpha=0.05):
+        """ PET-PEESE. The precision-effect test (PET) regresses effect sizes on their standard errors
+            and the precision-effect estimate with standard error (PEESE) on their variances, both
+            weighted by inverse variance. The PEESE intercept is used when the PET intercept is
+            significant at alpha, otherwise the PET intercept.
+
+        :param alpha: (float) significance level of the PET intercept
+        :return: (PetPeeseResult) intercept, standard error and p-value of both models, the model
+                  used and its bias-corrected effect size
+        """
+        from scipy.stats import t as t_distribution
+        weights = 1 / self.variances
+        dof = self.effect_sizes.size - 2
+        pet, pet_standard_error = self._wls(np.sqrt(self.variances), self.effect_sizes, weights)
+        peese, peese_standard_error = self._wls(self.variances, self.effect_sizes, weights)
+        pet_p = 2 * t_distribution.sf(abs(pet[0] / pet_standard_error[0]), dof)
+        peese_p = 2 * t_distribution.sf(abs(peese[0] / peese_standard_error[0]), dof)
+        method = 'PEESE' if pet_p < alpha else 'PET'
+        return PetPeeseResult(pet[0], pet_standard_error[0], pet_p, peese[0], peese_standard_error[0], peese_p,
+                              method, peese[0] if method == 'PEESE' else pet[0])
+
+    def _sorted(self, side):
+        """ Effect sizes sorted ascending (negated first if side is 'right'), their variances and
+            prefix sums of the weighted sums, cached per side. """
+        if side not in self._prefix_sums:
+            order = self._order if side == 'left' else self._order[::-1]
+            effect_sizes = (1.0 if side == 'left' else -1.0) * self.effect_sizes[order]
+            variances = self.variances[order]
+            ivw = 1 / variances
+            ivw_es = ivw * effect_sizes
+            sums = [np.cumsum(values) for values in (ivw, ivw * ivw, ivw_es, ivw_es * effect_sizes)]
+            self._prefix_sums[side] = (effect_sizes, variances, sums)
+        return self._prefix_sums[side]
+
+    def _trimmed_summary(self, side, size):
+        """ Summary of the size smallest sorted effect sizes, from prefix sums. """
+        effect_sizes, variances, sums = self._sorted(side)
+        return MetaSummary(size, *(total[size - 1] for total in sums),
+                           effect_sizes=effect_sizes[:size], variances=variances[:size])
+
+    @staticmethod
+    def _wls(x, y, weights):
+        """ Weighted least squares of y on an intercept and x, with standard errors scaled by the
+            residual variance.
+
+        :return: (numpy 1d array, numpy 1d array) intercept and slope, their standard errors
+        """
+        design = np.column_stack([np.ones(x.size), x])
+        scale = np.sqrt(weights)
+        coefficients = np.linalg.lstsq(design * scale[:, np.newaxis], y * scale, rcond=None)[0]
+        residual_variance = np.sum(np.square((y - design @ coefficients) * scale)) / (x.size - 2)
+        covariance = residual_variance * np.linalg.inv(design.T @ (design * weights[:, np.newaxis]))
+        return coefficients, np.sqrt(np.diag(covariance))
@@ -0,0 +1,141 @@
+from collections import namedtuple
+import numpy as np
+from .MetaSummary import MetaSummary
+from .estimators import TauSquareEstimator, DerSimonianLaird
+
+
+BootstrapResult = namedtuple('BootstrapResult',
+                             ['method', 'effect_size', 'effect_size_ci', 'tau_square', 'tau_square_ci',
+                              'effect_size_draws', 'tau_square_draws'])
+PermutationResult = namedtuple('PermutationResult',
+                               ['method', 'effect_size', 'effect_size_p', 'q', 'q_p', 'n_permutations'])
+
+
+class Resampler:
+    """ Bootstrap and permutation inference for a pooled estimate. Resamples are drawn as index,
+        sign or noise matrices of chunk_size rows and evaluated with the inverse variance formulas
+        of MetaSummary on whole chunks at once, so memory is bounded by chunk_size x k regardless of
+        the number of resamples. Chunks can be spread over a process pool; every chunk gets its own
+        seed spawned from one SeedSequence, so results do not depend on n_jobs.
+
+    Attributes:
+        effect_sizes (numpy 1d array) effect sizes of the pool
+        variances (numpy 1d array) variances of the pool
+        method (str) 'fe' or 're'; the pooled estimate used for every resample
+        tau_square_estimator (str or TauSquareEstimator) between-study variance estimator for 're'
+        chunk_size (int) number of resamples evaluated together
+        n_jobs (int) number of worker processes; 1 evaluates chunks in the calling process
+        seed (int) seed of the SeedSequence from which chunk seeds are spawned
+
+    References (informal list):
+        Adams, D. C., Gurevitch, J., & Rosenberg, M. S. (1997). Resampling tests for meta-analysis
+            of ecological data. Ecology, 78(4), 1277-1283.
+
+        Follmann, D. A., & Proschan, M. A. (1999). Valid inference in random effects meta-analysis.
+            Biometrics, 55(3), 732-737.
+    """
+
+    def __init__(self, effect_sizes, variances, method='re', tau_square_estimator='DL',
+                 chunk_size=1000, n_jobs=1, seed=None):
+        assert method in ('fe', 're'), "method must be 'fe' or 're'"
+        self.effect_sizes = np.asarray(effect_sizes, dtype=float)
+        self.variances = np.asarray(variances, dtype=float)
+        self.method = method
+        self.tau_square_estimator = tau_square_estimator
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs
+        self.seed = seed
+
+    def bootstrap(self, n_resamples=10000, alpha=0.05):
+        """ Nonparametric bootstrap of the pooled effect size and tau-square. Effect sizes are
+            resampled with replacement together with their variances.
+
+        :param n_resamples: (int) number of bootstrap resamples
+        :param alpha: (float) percentile confidence intervals have coverage 1 - alpha
+        :return: (BootstrapResult) estimates, percentile confidence intervals and bootstrap draws
+        """
+        effect_size, tau_square, _ = self._evaluate(self.effect_sizes[np.newaxis], self.variances[np.newaxis],
+                                                    self.method, self.tau_square_estimator)
+        draws = self._map(self._bootstrap_chunk, n_resamples)
+        effect_size_draws = np.concatenate([draw[0] for draw in draws])
+        tau_square_draws = np.concatenate([draw[1] for draw in draws])
+        quantiles = [alpha / 2, 1 - alpha / 2]
+        return BootstrapResult(self.method, effect_size[0], tuple(np.quantile(effect_size_draws, quantiles)),
+                               tau_square[0], tuple(np.quantile(tau_square_draws, quantiles)),
+                               effect_size_draws, tau_square_draws)
+
+    def permutation_test(self, n_permutations=10000):
+        """ Resampling p-values for the pooled effect size and the Q statistic.
+            The pooled effect is tested against zero by randomly flipping the signs of the effect
+            sizes. Q is tested against homogeneity by redrawing effect sizes around the fixed
+            effects mean with their own sampling variances (Monte Carlo null distribution),
+            since Q is invariant to relabeling effect sizes.
+
+        :param n_permutations: (int) number of resamples for each test
+        :return: (PermutationResult) observed statistics and their p-values
+        """
+        effect_size, _, q = self._evaluate(self.effect_sizes[np.newaxis], self.variances[np.newaxis],
+                                           self.method, self.tau_square_estimator)
+        draws = self._map(self._permutation_chunk, n_permutations)
+        effect_size_draws = np.concatenate([draw[0] for draw in draws])
+        q_draws = np.concatenate([draw[1] for draw in draws])
+        effect_size_p = (np.count_nonzero(np.abs(effect_size_draws) >= abs(effect_size[0])) + 1) / \
+                        (n_permutations + 1)
+        q_p = (np.count_nonzero(q_draws >= q[0]) + 1) / (n_permutations + 1)
+        return PermutationResult(self.method, effect_size[0], effect_size_p, q[0], q_p, n_permutations)
+
+    def _map(self, function, n):
+        """ Split n resamples into chunks, each with its own spawned seed, and evaluate them
+            serially or in a process pool. """
+        sizes = [min(self.chunk_size, n - start) for start in range(0, n, self.chunk_size)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        args = [(self.effect_sizes, self.variances, self.method, self.tau_square_estimator, size, seed)
+                for size, seed in zip(sizes, seeds)]
+        if self.n_jobs == 1 or len(args) == 1:
+            return [function(*arg) for arg in args]
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+            return list(executor.map(function, *zip(*args)))
+
+    @staticmethod
+    def _evaluate(effect_sizes, variances, method, tau_square_estimator):
+        """ Pooled effect size, tau-square and Q of every row of 2d effect size and variance arrays.
+
+        :return: (numpy 1d array, numpy 1d array, numpy 1d array) effect size, tau-square, Q per row
+        """
+        ivw = 1 / variances
+        ivw_es = ivw * effect_sizes
+        summary = MetaSummary(effect_sizes.shape[1], ivw.sum(axis=1), np.square(ivw).sum(axis=1),
+                              ivw_es.sum(axis=1), (ivw_es * effect_sizes).sum(axis=1))
+        if method == 'fe':
+            return summary.fe_effect_size, np.zeros(effect_sizes.shape[0]), summary.q
+        estimator = TauSquareEstimator.from_name(tau_square_estimator)
+        if isinstance(estimator, DerSimonianLaird):
+            tau_square = summary.tau_square
+        else:
+            tau_square = estimator.estimate_batch(effect_sizes, variances)
+        ivw = 1 / (variances + tau_square[:, np.newaxis])
+        return (ivw * effect_sizes).sum(axis=1) / ivw.sum(axis=1), tau_square, summary.q
+
+    @staticmethod
+    def _bootstrap_chunk(effect_sizes, variances, method, tau_square_estimator, size, seed):
+        """ Evaluate one chunk of bootstrap resamples. Static so it can be sent to worker processes. """
+        rng = np.random.default_rng(seed)
+        index = rng.integers(0, effect_sizes.size, size=(size, effect_sizes.size))
+        effect_size, tau_square, _ = Resampler._evaluate(effect_sizes[index], variances[index],
+                                                         method, tau_square_estimator)
+        return effect_size, tau_square
+
+    @staticmethod
+    def _permutation_chunk(effect_sizes, variances, method, tau_square_estimator, size, seed):
+        """ Evaluate one chunk of sign-flip permutations and homogeneous Monte Carlo draws. """
+        rng = np.random.default_rng(seed)
+        shape = (size, effect_sizes.size)
+        signs = rng.choice(np.array([-1.0, 1.0]), size=shape)
+        tiled_variances = np.broadcast_to(variances, shape)
+        effect_size, _, _ = Resampler._evaluate(signs * effect_sizes, tiled_variances, method, tau_square_estimator)
+        ivw = 1 / variances
+        fe_effect_size = np.dot(ivw, effect_sizes) / ivw.sum()
+        null_effect_sizes = fe_effect_size + np.sqrt(variances) * rng.standard_normal(shape)
+        _, _, q = Resampler._evaluate(null_effect_sizes, tiled_variances, 'fe', tau_square_estimator)
+        return effect_size, q
@@ -0,0 +1,193 @@
+from .outcomes.Outcome import Outcome
+import weakref
+
+
+class Study:
+    """ Defines a research study by holding effect size and variance
+    values used for meta-analysis. Includes methods to help calculate
+    effect size and variance.
+
+    Attributes:
+        note (str) text describing study
+        citation (str) study citation
+        moderators (dictionary) study-level moderators for meta-regression, e.g. {'year': 2019}
+        outcomes (list) Outcomes from study
+        _outcomes_by_id (dictionary) Outcomes keyed by id, rebuilt when outcomes is changed directly
+        _pools (list) weak references to the pools holding this study, notified when an outcome is
+            edited, appended or replaced, and before the study or its outcomes are edited through
+            their setters, so that pools sharing the study copy-on-write take a copy first;
+            not copied or pickled
+
+    """
+
+    def __init__(self, note='', citation='', outcomes=None, moderators=None):
+        """ Initialize Study
+
+        :param note: (str) text describing study
+        :param citation: (str) study citation
+        :param outcome_list: (list) 1d iterable of outcomes with which to initialize study
+        :param moderators: (dict) study-level moderator values keyed by moderator name
+        """
+        self.note = note
+        self.citation = citation
+        self.outcomes = outcomes or []
+        self.moderators = moderators or {}
+        self._outcomes_by_id = {}
+        self._pools = []
+        for outcome in self.outcomes:
+            outcome._attach(self)
+
+    def append_outcome(self, outcome):
+        assert isinstance(outcome, Outcome), 'Argument outcome must be of type Outcome'
+        self._before_edit()
+        self.outcomes.append(outcome)
+        self._outcomes_by_id[outcome.id] = outcome
+        outcome._attach(self)
+        self._notify(appended=outcome)
+
+    def remove_outcome(self, outcome_id):
+        outcome = self._lookup(outcome_id)
+        if outcome is None:
+            raise ValueError('Outcome ID not found')
+        study = self.copy()
+        for index, candidate in enumerate(study.outcomes):
+            if candidate.id == outcome_id:
+                del study.outcomes[index]
+                candidate._detach(study)
+                break
+        study._outcomes_by_id.pop(outcome_id, None)
+        return study
+
+    def detach_outcome(self, outcome_id):
+        """ Replace an outcome that is also held by other studies, e.g. one passed to the
+            constructors of two studies, by a private copy, so that it can be edited without
+            changing the other studies.
+
+        :param outcome_id: (int) id of outcome
+        :return: (Outcome) private copy of the outcome, now held by this study
+        """
+        outcome = self._lookup(outcome_id)
+        if outcome is None:
+            raise ValueError('Outcome ID not found')
+        self._before_edit()
+        for index, candidate in enumerate(self.outcomes):
+            if candidate is outcome:
+                self.outcomes[index] = self._outcomes_by_id[outcome_id] = outcome.copy()
+                outcome._detach(self)
+                self.outcomes[index]._attach(self)
+                self._notify()
+                return self.outcomes[index]
+
+    def _lookup(self, outcome_id):
+        """ Find an outcome by id through the id index. The index is rebuilt if it does not
+            match the outcome list, e.g. after outcomes was assigned or edited directly.
+
+        :param outcome_id: (int) id of outcome
+        :return: (Outcome) outcome with the given id, or None
+        """
+        outcome = self._outcomes_by_id.get(outcome_id)
+        if outcome is None or outcome.id != outcome_id or len(self._outcomes_by_id) != len(self.outcomes):
+            self._outcomes_by_id = {outcome.id: outcome for outcome in self.outcomes}
+            outcome = self._outcomes_by_id.get(outcome_id)
+        return outcome
+
+    def _attach(self, study_pool):
+        """ Register a pool holding this study, so that it is notified of edits. """
+        self._pools[:] = [ref for ref in self._pools if ref() is not None]
+        self._pools.append(weakref.ref(study_pool))
+
+    def _detach(self, study_pool):
+        """ Stop notifying a pool that no longer holds this study. """
+        self._pools[:] = [ref for ref in self._pools if ref() is not None and ref() is not study_pool]
+
+    def _before_edit(self):
+        """ Tell the pools holding this study that it is about to be edited, so that pools sharing
+            it with another pool replace it by a copy first.
+        """
+        for ref in list(self._pools):
+            study_pool = ref()
+            if study_pool is not None:
+                study_pool._before_edit(self)
+
+    def _notify(self, appended=None):
+        """ Tell the pools holding this study that one of its outcomes changed. An appended
+            outcome is added to each pool's columnar copy; any other change marks it stale.
+
+        :param appended: (Outcome) outcome just appended to the study, or None for an edit
+        :return: None
+        """
+        for ref in self._pools:
+            study_pool = ref()
+            if study_pool is None:
+                continue
+            if appended is None:
+                study_pool._stale = True
+            else:
+                study_pool._append_outcome(self, appended)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_pools']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pools = []
+        for outcome in self.outcomes:
+            outcome._attach(self)
+
+    def list_outcomes(self):
+        for outcome in self.outcomes:
+            print(outcome)
+
+    def get_outcome_by_id(self, outcome_id):
+        outcome = self._lookup(outcome_id)
+        return False if outcome is None else outcome
+
+    def get_outcomes_by_label(self, label):
+        return [outcome for outcome in self.outcomes if outcome.label == label]
+
+    def set_note(self, note):
+        self._before_edit()
+        self.note = note
+
+    def get_note(self):
+        return self.note
+
+    def set_citation(self, citation):
+        self._before_edit()
+        self.citation = citation
+
+    def get_citation(self):
+        return self.citation
+
+    def set_moderator(self, name, value):
+        self._before_edit()
+        self.moderators[name] = value
+
+    def get_moderator(self, name):
+        return self.moderators[name]
+
+    def copy(self):
+        """ Create a copy of class instance. The copy has its own outcome list, moderators and
+            Outcome objects, so edits made through either study do not reach the other.
+            The copy belongs to no pool.
+
+        :param None
+        :return: copy of calling instance
+        """
+        study = Study.__new__(Study)
+        study.__dict__.update(self.__dict__)
+        study.outcomes = [outcome.copy() for outcome in self.outcomes]
+        study.moderators = dict(self.moderators)
+        study._outcomes_by_id = {outcome.id: outcome for outcome in study.outcomes}
+        study._pools = []
+        for outcome in study.outcomes:
+            outcome._attach(study)
+        return study
+
+    def __repr__(self):
+        return self.citation
+
+    def __str__(self):
+        return self.citation
\ No newline at end of file
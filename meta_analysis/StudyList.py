@@ -0,0 +1,154 @@
+from collections.abc import MutableSequence
+import weakref
+
+
+class StudyList(MutableSequence):
+    """ List of the studies of a pool. Copies of the list share their Study objects copy-on-write:
+        a shared study is replaced by a private Study.copy() the first time it is accessed through
+        the list or edited through the setters of the study or its outcomes, so copying a pool
+        creates no Study or Outcome objects and untouched studies stay shared.
+        Attributes assigned directly on a shared study or outcome are not seen.
+    """
+
+    def __init__(self, studies=()):
+        """
+        :param studies: (iterable) studies held by the list
+        """
+        self._studies = list(studies)
+        # True where the study is held copy-on-write and is copied before it is handed out or edited
+        self._shared = [False] * len(self._studies)
+        self._n_shared = 0
+        # position of every study by id, -1 for a study held more than once; None until first needed
+        self._index = None
+        # pools holding these studies
+        self._pools = []
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self._shared[index]:
+            return self._own(index)
+        return self._studies[index]
+
+    def __setitem__(self, index, study):
+        if self._shared[index]:
+            self._shared[index] = False
+            self._n_shared -= 1
+        self._studies[index] = study
+        self._index = None
+
+    def __delitem__(self, index):
+        if self._shared[index]:
+            self._n_shared -= 1
+        del self._studies[index]
+        del self._shared[index]
+        self._index = None
+
+    def insert(self, index, study):
+        """ Insert a study before index, as list.insert(). Appending keeps the position index. """
+        size = len(self._studies)
+        if index >= size and self._index is not None:
+            key = id(study)
+            self._index[key] = -1 if key in self._index else size
+        else:
+            self._index = None
+        self._studies.insert(index, study)
+        self._shared.insert(index, False)
+
+    def __len__(self):
+        return len(self._studies)
+
+    def _peek(self, index):
+        """ Study at a position, without copying a shared study. Only for reading. """
+        return self._studies[index]
+
+    def _objects(self):
+        """ Studies held by the list, without copying shared ones. Only for reading. """
+        return self._studies
+
+    def _position(self, study):
+        """ Position of a study, found by identity in constant time.
+
+        :param study: (Study) study of the list
+        :return: (int) position, -1 if the study is held more than once, or None if it is not held
+        """
+        if self._index is None:
+            index = {}
+            for position, candidate in enumerate(self._studies):
+                key = id(candidate)
+                index[key] = -1 if key in index else position
+            self._index = index
+        return self._index.get(id(study))
+
+    def _attach(self, study_pool):
+        """ Register a pool with the studies, and with the private copies made later. """
+        self._pools.append(weakref.ref(study_pool))
+        for study in self._studies:
+            study._attach(study_pool)
+
+    def _own(self, index):
+        """ Replace the shared study at a position by a private copy, registered with the pools
+            of the list in place of the original.
+
+        :param index: (int) position of a shared study
+        :return: (Study) private copy
+        """
+        study = self._studies[index]
+        copy = study.copy()
+        self._studies[index] = copy
+        self._shared[index] = False
+        self._n_shared -= 1
+        if self._index is not None:
+            if self._index.get(id(study)) == index:
+                del self._index[id(study)]
+                self._index[id(copy)] = index
+            else:
+                self._index = None
+        for ref in self._pools:
+            study_pool = ref()
+            if study_pool is not None:
+                study._detach(study_pool)
+                copy._attach(study_pool)
+        return copy
+
+    def _before_edit(self, study):
+        """ Give the list its own copy of a study it shares, before the study is edited.
+
+        :param study: (Study) study about to be edited
+        :return: None
+        """
+        if not self._n_shared:
+            return
+        position = self._position(study)
+        if position is None:
+            return
+        positions = [position] if position >= 0 else \
+            [i for i, candidate in enumerate(self._studies) if candidate is study]
+        for position in positions:
+            if self._shared[position]:
+                self._own(position)
+
+    def copy(self):
+        """ Create a copy of the list holding the same Study objects. The copy replaces a study by
+            a private copy before it is first accessed through the copy or edited through any list,
+            so edits do not reach the other list.
+
+        :return: (StudyList) copy of calling instance, registered with no pool
+        """
+        studies = StudyList.__new__(StudyList)
+        studies._studies = list(self._studies)
+        studies._shared = [True] * len(self._studies)
+        studies._n_shared = len(self._studies)
+        studies._index = None if self._index is None else dict(self._index)
+        studies._pools = []
+        return studies
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        # pools register again when they are unpickled, and ids do not survive pickling
+        state['_pools'] = []
+        state['_index'] = None
+        return state
+
+    def __repr__(self):
+        return f'StudyList(studies={len(self)}, shared={self._n_shared})'
@@ -0,0 +1,617 @@
+from functools import partial
+from .Study import Study
+from .StudyList import StudyList
+from .OutcomeStore import OutcomeStore
+from .WeightedAccumulator import WeightedAccumulator
+from .MetaSummary import MetaSummary, MetaAnalysisResult
+from .LeaveOneOut import LeaveOneOut
+from .Cumulative import Cumulative
+from .Subgroup import Subgroup
+from .PublicationBias import PublicationBias
+from .Gosh import Gosh
+from .MetaRegression import MetaRegression
+from .Resampling import Resampler
+from .PoolArchive import PoolArchive, ArchivedStudies
+import numpy as np
+
+
+class StudyPool:
+    """ Holds a pool of research studies and performs meta-analysis,
+        provides methods to calculate statistics of interest,
+        and producing tree plots (tree plots not yet implemented)
+
+    Attributes:
+        studies (StudyList or ArchivedStudies) mutable sequence of the studies; copies of the pool
+            share untouched Study objects copy-on-write
+        outcome_label (str) type of outcome currently registered; set using set_outcome() method
+        effect_sizes (numpy 1d array) effect sizes associated with currently registered outcome_label
+        variances (numpy 1d array) variances associated with currently registered outcome_label
+        _store (OutcomeStore) columnar copy of the numeric outcome data of all studies
+        _stale (bool) set by the studies of the pool when one of their outcomes is edited or replaced;
+            _store is rebuilt before its next use. Appended outcomes are added to _store directly
+        _accumulators (dict) running weighted sums per outcome label, updated as studies are added and removed
+
+    References (informal list):
+        DerSimonian, R., & Laird, N. (1986). Meta-analysis in clinical trials. Controlled clinical trials, 7(3), 177-188
+
+        Lipsey, M. W., & Wilson, D. B. (2001). Practical meta-analysis. SAGE publications, Inc.
+
+        Washington State Institute for Public Policy. (December 2018). Benefit-cost technical documentation.
+            Olympia, WA
+
+        Borenstein, M., Higgins, J. P., Hedges, L. V., & Rothstein, H. R. (2017).
+            Basics of meta‐analysis: I2 is not an absolute measure of heterogeneity.
+            Research synthesis methods, 8(1), 5-18.
+    """
+
+    def __init__(self, studies, outcome_label=''):
+        """
+        :param studies: (list) collection containing studies
+        :param outcome_label: (str) type of outcome to use on initialization
+        """
+        assert len(studies) >= 2, 'studies must be a list of length >= 2'
+        if not isinstance(studies, (StudyList, ArchivedStudies)):
+            assert all(isinstance(x, Study) for x in studies), \
+                'studies can only contain object of type Study'
+            studies = StudyList(studies)
+
+        self.studies = studies
+        self._attach_studies()
+        self._store = OutcomeStore.from_studies(studies._objects())
+        self._stale = False
+        self._accumulators = {}
+        self.outcome_label = outcome_label
+        if outcome_label:
+            self.set_outcome(outcome_label)
+        else:
+            print('Warning: outcome_label not set. Set outcome_label with StudyPool.set_outcome() method.')
+
+    def append_study(self, study):
+        """ Add study to study pool.
+
+        :param study: (Study) study to be added
+        :return: None
+        """
+        assert isinstance(study, Study), 'Argument outcome must be of type Study'
+        self.studies.append(study)
+        study._attach(self)
+        self._store.append_study(study, len(self.studies) - 1)
+        self._update_accumulators(study, 1)
+
+    def remove_study(self, citation, inplace=False):
+        """ Remove the study with the given citation from the study pool. The running sums are
+            updated in one step per outcome of the study, but finding the study, deleting it from
+            the list and compacting the columnar store each take time linear in the size of the pool.
+
+        :param citation: (str) citation of study to be removed
+        :param inplace: (bool) whether to remove the study in place, or to return a new StudyPool
+        :return: (StudyPool) if inplace=False, copy of study pool without the study
+        """
+        study_pool = self if inplace else self.copy()
+        for study_index, study in enumerate(study_pool.studies._objects()):
+            if study.citation == citation:
+                del study_pool.studies[study_index]
+                study._detach(study_pool)
+                study_pool._store.remove_study(study_index)
+                study_pool._update_accumulators(study, -1)
+                return None if inplace else study_pool
+        raise ValueError('Study citation not found')
+
+    def set_outcome(self, outcome_label):
+        """ Register outcome type for meta-analysis. Only one outcome type can
+            be registered at a time. All class operations are performed on the registered
+            outcome type. Arrays are served from a per-label cache, so switching between
+            labels does not rescan the pool unless studies or outcomes changed.
+
+        :param outcome_label: (str) type of outcome
+        :param inplace: (bool) whether to set the outcome in place, or to return a new StudyPool
+        :return: (StudyPool) if inplace=True, return StudyPool with outcome_label registered
+        """
+        self._sync_store()
+        self.outcome_label = outcome_label
+
+    @property
+    def effect_sizes(self):
+        self._sync_store()
+        return self._store.arrays(self.outcome_label)[0]
+
+    @property
+    def variances(self):
+        self._sync_store()
+        return self._store.arrays(self.outcome_label)[1]
+
+    def _sync_store(self):
+        """ Rebuild the columnar store, and with it the per-label cache and running sums,
+            if an outcome of the pool was edited since it was last built.
+
+        :return: None
+        """
+        if self._stale:
+            self._store = OutcomeStore.from_studies(self.studies._objects())
+            self._stale = False
+            self._accumulators = {}
+
+    def _attach_studies(self):
+        """ Register the pool with its studies, so that edits to their outcomes mark it stale.
+            Studies of an opened archive register it when they are built.
+
+        :return: None
+        """
+        self.studies._attach(self)
+
+    def _before_edit(self, study):
+        """ Replace a study shared copy-on-write with another pool by a private copy before it is edited.
+
+        :param study: (Study) study of the pool about to be edited
+        :return: None
+        """
+        if isinstance(self.studies, StudyList):
+            self.studies._before_edit(study)
+
+    def _append_outcome(self, study, outcome):
+        """ Add an outcome just appended to one of the pool's studies to the columnar store and the
+            running sums, instead of rebuilding them. The new row goes at the end of the store, so the
+            rows of a study stay in the order of its outcomes but are no longer contiguous. The study is
+            found through the position index of the study list, so appending takes constant time.
+
+        :param study: (Study) study of the pool the outcome was appended to
+        :param outcome: (Outcome) appended outcome
+        :return: None
+        """
+        if self._stale:
+            return
+        position = self.studies._position(study)
+        if position is None or position < 0:
+            # a study held more than once is left to a rebuild
+            self._stale = True
+            return
+        self._store.append(outcome.label, position, outcome.treat_n, outcome.control_n, outcome.effect_size,
+                           outcome.variance, outcome.id)
+        accumulator = self._accumulators.get(outcome.label)
+        if accumulator is not None:
+            accumulator.add(outcome.effect_size, outcome.variance)
+
+    def _outcomes(self, rows):
+        """ Outcome objects of rows of the store, mapped through the study index and the position
+            of each row among the rows of its study.
+
+        :param rows: (numpy 1d array) row indices
+        :return: (list) Outcome of each row
+        """
+        positions = self._store.outcome_positions()
+        return [self.studies._peek(study_index).outcomes[position]
+                for study_index, position in zip(self._store.study_index[rows].tolist(), positions[rows].tolist())]
+
+    def _accumulator(self, outcome_label):
+        """ Running weighted sums of one outcome type, started from the store on first use.
+
+        :param outcome_label: (str) type of outcome
+        :return: (WeightedAccumulator)
+        """
+        self._sync_store()
+        accumulator = self._accumulators.get(outcome_label)
+        if accumulator is None:
+            accumulator = WeightedAccumulator.from_arrays(*self._store.arrays(outcome_label))
+            self._accumulators[outcome_label] = accumulator
+        return accumulator
+
+    def _update_accumulators(self, study, sign):
+        """ Add (sign=1) or remove (sign=-1) the outcomes of a study from the running sums
+            that have already been started. Costs one update per outcome of the study.
+
+        :return: None
+        """
+        if self._stale:
+            # store is stale and will be rebuilt along with the running sums
+            return
+        for outcome in study.outcomes:
+            accumulator = self._accumulators.get(outcome.label)
+            if accumulator is not None:
+                if sign > 0:
+                    accumulator.add(outcome.effect_size, outcome.variance)
+                else:
+                    accumulator.remove(outcome.effect_size, outcome.variance)
+
+    def meta_analysis(self, method='auto', tau_square_estimator='DL'):
+        """ Perform meta-analysis.
+
+        :param method: (str) random effects meta-analysis if 're', fixed effects meta-analysis if 'fe',
+                        base choice on statistical significance (p<0.05) of Q statistic if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator used for
+                        random effects: 'DL' (DerSimonian-Laird), 'REML', 'ML', 'PM' (Paule-Mandel),
+                        'SJ' (Sidik-Jonkman)
+        :return: (float, float) weighted mean effect size, variance of effect size
+        """
+        result = self.summarize(method=method, tau_square_estimator=tau_square_estimator)
+        return result.effect_size, result.variance
+
+    def summarize(self, method='auto', tau_square_estimator='DL'):
+        """ Perform meta-analysis and return every statistic of interest in one record.
+            All values come from a single MetaSummary of the registered outcome.
+
+        :param method: (str) random effects meta-analysis if 're', fixed effects meta-analysis if 'fe',
+                        base choice on statistical significance (p<0.05) of Q statistic if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :return: (MetaAnalysisResult) method used, effect size, variance, Q, dof, p, tau-square, I-square,
+                  tau-square estimator
+        """
+        return self.summary().result(method=method, tau_square_estimator=tau_square_estimator)
+
+    def meta_analysis_by_label(self, outcome_labels=None, method='auto', tau_square_estimator='DL'):
+        """ Perform meta-analysis for many outcome types at once. Outcomes are grouped by label
+            and all statistics are computed with segmented array reductions, without registering
+            each label in turn.
+
+        :param outcome_labels: (list) types of outcome to analyze; defaults to every label in the pool
+        :param method: (str) random effects meta-analysis if 're', fixed effects meta-analysis if 'fe',
+                        base choice on statistical significance (p<0.05) of Q statistic if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :return: (dict) outcome label -> MetaAnalysisResult
+        """
+        self._sync_store()
+        labels, effect_sizes, variances, offsets = self._store.segments(outcome_labels)
+        result = MetaSummary.from_segments(effect_sizes, variances, offsets).result(
+            method=method, tau_square_estimator=tau_square_estimator)
+        table = {}
+        for i, label in enumerate(labels):
+            table[label] = MetaAnalysisResult(str(result.method[i]), result.effect_size[i], result.variance[i],
+                                              result.q[i], int(result.dof[i]), result.p[i],
+                                              result.tau_square[i], result.i_square[i],
+                                              result.tau_square_estimator)
+        return table
+
+    def leave_one_out(self, by='outcome', method='auto', tau_square_estimator='DL'):
+        """ Leave-one-out sensitivity analysis of the registered outcome, with influence diagnostics.
+            All reduced pools are computed from the full-pool sums by subtraction instead of
+            removing and re-analyzing each study.
+
+        :param by: (str) leave out one outcome at a time if 'outcome', or all outcomes of one study if 'study'
+        :param method: (str) random effects if 're', fixed effects if 'fe', chosen from the Q test
+                        of the full pool if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :return: (LeaveOneOutResult) reduced estimates, Q, p, tau-square, I-square, standardized residuals,
+                  DFFITS, Cook's distances, covariance ratios and hat values; one element per outcome id
+                  or study citation, listed in the unit field
+        """
+        self._sync_store()
+        rows = self._store.rows(self.outcome_label)
+        if by == 'outcome':
+            offsets = None
+            units = self._store.outcome_ids[rows].tolist()
+        elif by == 'study':
+            study_index = self._store.study_index[rows]
+            order = np.argsort(study_index, kind='stable')
+            rows = rows[order]
+            study_index = study_index[order]
+            starts = np.flatnonzero(np.diff(study_index, prepend=-1))
+            offsets = np.append(starts, rows.size)
+            units = [self.studies._peek(i).citation for i in study_index[starts]]
+        else:
+            raise ValueError("by must be 'outcome' or 'study'")
+        leave_one_out = LeaveOneOut(self._store.effect_sizes[rows], self._store.variances[rows], offsets)
+        return leave_one_out.result(method=method, tau_square_estimator=tau_square_estimator, units=units)
+
+    def cumulative(self, key=None, by='study', method='fe', tau_square_estimator='DL', alpha=0.05):
+        """ Cumulative meta-analysis of the registered outcome: the pooled estimate after each study
+            (or outcome) is added, in the order given by key. All partial pools are computed from
+            prefix sums of the weights instead of building a pool per step.
+
+        :param key: (callable) sort key applied to each Study if by is 'study', or to each Outcome
+                     if by is 'outcome', e.g. lambda study: study.citation; pool order if None
+        :param by: (str) add one outcome at a time if 'outcome', or all outcomes of one study if 'study'
+        :param method: (str) random effects if 're', fixed effects if 'fe'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :param alpha: (float) confidence intervals have coverage 1 - alpha
+        :return: (CumulativeResult) number of outcomes, effect size, variance, confidence interval, Q, p,
+                  tau-square and I-square after each step; one element per outcome id or study citation,
+                  listed in the unit field
+        """
+        self._sync_store()
+        rows = self._store.rows(self.outcome_label)
+        study_index = self._store.study_index[rows]
+        if by == 'outcome':
+            if key is not None:
+                keys = [key(outcome) for outcome in self._outcomes(rows)]
+                rows = rows[sorted(range(rows.size), key=keys.__getitem__)]
+            offsets = None
+            units = self._store.outcome_ids[rows].tolist()
+        elif by == 'study':
+            present = np.unique(study_index)
+            if key is not None:
+                present = sorted(present, key=lambda i: key(self.studies._peek(i)))
+            position = np.empty(len(self.studies), dtype=np.intp)
+            position[present] = np.arange(len(present))
+            order = np.argsort(position[study_index], kind='stable')
+            rows = rows[order]
+            offsets = np.zeros(len(present) + 1, dtype=np.intp)
+            np.cumsum(np.bincount(position[study_index], minlength=len(present)), out=offsets[1:])
+            units = [self.studies._peek(i).citation for i in present]
+        else:
+            raise ValueError("by must be 'outcome' or 'study'")
+        cumulative = Cumulative(self._store.effect_sizes[rows], self._store.variances[rows], offsets)
+        return cumulative.result(method=method, tau_square_estimator=tau_square_estimator, alpha=alpha, units=units)
+
+    def subgroup_analysis(self, key, by='study', method='auto', tau_square_estimator='DL'):
+        """ Subgroup analysis of the registered outcome. Groups are formed from the pool's own
+            arrays and summarized with one segmented reduction, instead of building a pool per group.
+
+        :param key: (callable) grouping key applied to each Study if by is 'study', or to each Outcome
+                     if by is 'outcome', e.g. lambda study: study.moderators['country']
+        :param by: (str) group outcomes by a key of their study if 'study', or of the outcome itself if 'outcome'
+        :param method: (str) random effects if 're', fixed effects if 'fe', chosen per group from
+                        its Q test if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :return: (SubgroupResult) groups in order of first appearance, MetaAnalysisResult with one array
+                  element per group, between-group Q, its degrees of freedom and p-value
+        """
+        self._sync_store()
+        rows = self._store.rows(self.outcome_label)
+        if by == 'study':
+            study_keys = {}
+            for i in np.unique(self._store.study_index[rows]):
+                study_keys[i] = key(self.studies._peek(i))
+            keys = [study_keys[i] for i in self._store.study_index[rows]]
+        elif by == 'outcome':
+            keys = [key(outcome) for outcome in self._outcomes(rows)]
+        else:
+            raise ValueError("by must be 'study' or 'outcome'")
+        codes = {}
+        group_of_row = np.array([codes.setdefault(value, len(codes)) for value in keys], dtype=np.intp)
+        order = np.argsort(group_of_row, kind='stable')
+        offsets = np.zeros(len(codes) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(group_of_row, minlength=len(codes)), out=offsets[1:])
+        rows = rows[order]
+        subgroup = Subgroup(self._store.effect_sizes[rows], self._store.variances[rows], offsets)
+        return subgroup.result(method=method, tau_square_estimator=tau_square_estimator, groups=list(codes))
+
+    def egger_test(self):
+        """ Egger's regression test for funnel plot asymmetry of the registered outcome.
+
+        :return: (EggerResult) intercept, its standard error, t statistic and two-sided p-value, and slope
+        """
+        return PublicationBias(self.effect_sizes, self.variances).egger()
+
+    def begg_test(self):
+        """ Begg and Mazumdar's rank correlation test for publication bias of the registered outcome.
+
+        :return: (BeggResult) Kendall's tau and its p-value
+        """
+        return PublicationBias(self.effect_sizes, self.variances).begg()
+
+    def trim_and_fill(self, estimator='L0', side=None, method='fe', tau_square_estimator='DL'):
+        """ Duval and Tweedie's trim-and-fill adjustment of the registered outcome.
+
+        :param estimator: (str) 'L0' or 'R0' estimator of the number of missing effect sizes
+        :param side: (str) side on which effect sizes are missing, 'left' or 'right'; chosen from Egger's test if None
+        :param method: (str) random effects if 're', fixed effects if 'fe'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator for 're'
+        :return: (TrimAndFillResult) number of filled effect sizes, adjusted effect size and variance,
+                  filled effect sizes and their variances
+        """
+        return PublicationBias(self.effect_sizes, self.variances).trim_and_fill(
+            estimator=estimator, side=side, method=method, tau_square_estimator=tau_square_estimator)
+
+    def pet_peese(self, alpha=0.05):
+        """ PET-PEESE bias-corrected effect size of the registered outcome.
+
+        :param alpha: (float) significance level of the PET intercept used to choose PEESE
+        :return: (PetPeeseResult) estimates of both models, the model used and its effect size
+        """
+        return PublicationBias(self.effect_sizes, self.variances).pet_peese(alpha=alpha)
+
+    def gosh(self, n_subsets=10 ** 6, path=None, block_size=2 ** 16, n_jobs=1, seed=None):
+        """ GOSH analysis of the registered outcome: the fixed effects model fit to every subset of its
+            outcomes, or to n_subsets random subsets when there are more subsets than that.
+
+        :param n_subsets: (int) largest number of subsets to fit
+        :param path: (str) .npy file to write the results to as a memory map; kept in memory if None
+        :param block_size: (int) number of subsets evaluated together
+        :param n_jobs: (int) number of worker processes
+        :param seed: (int) seed for reproducible subset sampling
+        :return: (numpy structured array or memmap) effect_size, i_square and k of each subset
+        """
+        gosh = Gosh(self.effect_sizes, self.variances, block_size=block_size, n_jobs=n_jobs, seed=seed)
+        return gosh.run(n_subsets=n_subsets, path=path)
+
+    def meta_regression(self, moderators, method='re', tau_square_estimator='DL', intercept=True):
+        """ Meta-regression of the registered outcome on study-level moderators.
+
+        :param moderators: (list) names of moderators, looked up in Study.moderators of each study
+        :param method: (str) mixed effects if 're', fixed effects if 'fe', chosen from the QE test if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) 'DL' or 'REML' residual tau-square estimator
+        :param intercept: (bool) include an intercept
+        :return: (MetaRegressionResult) coefficients, standard errors, z and p-values, coefficient covariance,
+                  residual tau-square, QM and QE tests
+        """
+        return self.regression_model(moderators, intercept).fit(method=method,
+                                                                tau_square_estimator=tau_square_estimator)
+
+    def regression_model(self, moderators, intercept=True):
+        """ Build a meta-regression model of the registered outcome, e.g. to fit many moderator
+            subsets with MetaRegression.fit_subsets().
+
+        :param moderators: (list) names of moderators, looked up in Study.moderators of each study
+        :param intercept: (bool) include an intercept
+        :return: (MetaRegression) model over every outcome of the registered label
+        """
+        self._sync_store()
+        rows = self._store.rows(self.outcome_label)
+        study_index = self._store.study_index[rows]
+        present = np.unique(study_index)
+        values = np.empty((len(self.studies), len(moderators)))
+        for i in present:
+            study = self.studies._peek(i)
+            try:
+                values[i] = [study.moderators[name] for name in moderators]
+            except KeyError as error:
+                raise ValueError(f'Study {study.citation} has no moderator {error.args[0]}')
+        return MetaRegression(self._store.effect_sizes[rows], self._store.variances[rows], values[study_index],
+                              names=list(moderators), intercept=intercept)
+
+    def bootstrap(self, n_resamples=10000, method='auto', tau_square_estimator='DL', alpha=0.05,
+                  chunk_size=1000, n_jobs=1, seed=None):
+        """ Bootstrap confidence intervals for the pooled effect size and tau-square of the registered outcome.
+
+        :param n_resamples: (int) number of bootstrap resamples
+        :param method: (str) random effects if 're', fixed effects if 'fe', chosen from the Q test
+                        of the observed pool if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :param alpha: (float) percentile confidence intervals have coverage 1 - alpha
+        :param chunk_size: (int) resamples evaluated together; bounds memory at chunk_size x k
+        :param n_jobs: (int) number of worker processes
+        :param seed: (int) seed for reproducible resampling
+        :return: (BootstrapResult) estimates, confidence intervals and bootstrap draws
+        """
+        return self._resampler(method, tau_square_estimator, chunk_size, n_jobs, seed).bootstrap(
+            n_resamples=n_resamples, alpha=alpha)
+
+    def permutation_test(self, n_permutations=10000, method='auto', tau_square_estimator='DL',
+                         chunk_size=1000, n_jobs=1, seed=None):
+        """ Resampling p-values for the pooled effect size and Q statistic of the registered outcome.
+
+        :param n_permutations: (int) number of resamples for each test
+        :param method: (str) random effects if 're', fixed effects if 'fe', chosen from the Q test
+                        of the observed pool if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :param chunk_size: (int) resamples evaluated together; bounds memory at chunk_size x k
+        :param n_jobs: (int) number of worker processes
+        :param seed: (int) seed for reproducible resampling
+        :return: (PermutationResult) observed statistics and their p-values
+        """
+        return self._resampler(method, tau_square_estimator, chunk_size, n_jobs, seed).permutation_test(
+            n_permutations=n_permutations)
+
+    def _resampler(self, method, tau_square_estimator, chunk_size, n_jobs, seed):
+        if method == 'auto':
+            method = 're' if self.summary().p < 0.05 else 'fe'
+        return Resampler(self.effect_sizes, self.variances, method=method, tau_square_estimator=tau_square_estimator,
+                         chunk_size=chunk_size, n_jobs=n_jobs, seed=seed)
+
+    def summary(self):
+        """ Weighted sums of the registered outcome. Sums are kept up to date as studies are
+            appended and removed, so fixed effects and DerSimonian-Laird statistics do not
+            require a pass over the pool; the effect size and variance arrays are only read
+            for random effects estimates.
+
+        :return: (MetaSummary) sufficient statistics of registered outcome
+        """
+        accumulator = self._accumulator(self.outcome_label)
+        return accumulator.summary(source=partial(self._store.arrays, self.outcome_label))
+
+    def calculate_ivw_effect_size(self, method='fe', tau_square_estimator='DL'):
+        """ Calculate inverse variance weighted mean effect size.
+
+        :param method: (str) random effects effect size if 're', fixed effects effect size if 'fe'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :return: (float) weighted mean effect size
+        """
+        # if method is random effects, add between-study heterogeneity
+        return self.summary().effect_size(method=method, tau_square_estimator=tau_square_estimator)
+
+    def calculate_variance(self, method='fe', tau_square_estimator='DL'):
+        """ Calculate variance of weighted mean effect size.
+
+        :param method: random effects variance estimate if 're', fixed effects variance estimate if 'fe'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :return: variance of effect size
+        """
+        # if method is random effects, add between-study heterogeneity
+        return self.summary().variance(method=method, tau_square_estimator=tau_square_estimator)
+
+    def calculate_q(self):
+        """ Calculate Q statistic to test dispersion around the weighted mean effect size.
+            Q is defined as the sum of squared standardized effect sizes. This method uses
+            a rearranged form of the equation that facilitates computation.
+            Q is asymptotically distributed chi-square with k-1 degrees of freedom.
+
+        :return: (float, int, float) Q statistic, Q-stat degrees of freedom, p-value from one-sided chi-square test
+        """
+        summary = self.summary()
+        return summary.q, summary.dof, summary.p
+
+    def calculate_re(self, tau_square_estimator='DL'):
+        """ Calculate tau-square, the random effect portion of the variance estimate used
+            in random effects meta-analysis. Tau-square can be interpreted as the between-study
+            variance, or between-study heterogeneity, which is ignored in fixed effects meta-analysis.
+
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator;
+                        defaults to DerSimonian-Laird (DL) approach (based on MM)
+        :return: (float) tau-square
+        """
+        return self.summary().estimate_tau_square(tau_square_estimator)
+
+    def calculate_i_square(self):
+        """ Calculate I-square, an estimate of the proportion of the total variance that is between-study variance.
+            I-square is calculated as tau-square / (tau-square + sigma_square), where tau-square is
+            between-study variance and sigma-square is within-study variance from sampling error.
+
+        :return: I-square, the proportion of the total variance that is between-study variance
+        """
+        return self.summary().i_square
+
+    def copy(self, full=True):
+        """ Create a copy of StudyPool. The copy shares the Study objects with the original and a study
+            is replaced by a private copy (see Study.copy()) when it is first accessed through the copy,
+            or edited through the setters of either pool, so edits made through either pool do not reach
+            the other. The columnar store is shared too and copied only when one of the pools adds or
+            removes a study. Copying takes time linear in the number of studies but creates no Study or
+            Outcome objects; built studies of an opened archive are copied, the others are built when
+            the copy accesses them.
+
+        :param full: (bool) If full=true, copy outcome_label, effect_sizes, and variances in addition to studies list.
+        :return: (StudyPool) copy of calling instance
+        """
+        if not full:
+            return StudyPool(self.studies.copy())
+        self._sync_store()
+        study_pool = StudyPool.__new__(StudyPool)
+        study_pool.__dict__.update(self.__dict__)
+        study_pool.studies = self.studies.copy()
+        study_pool._attach_studies()
+        study_pool._store = self._store.share()
+        study_pool._accumulators = {label: accumulator.copy() for label, accumulator in self._accumulators.items()}
+        return study_pool
+
+    def save(self, path):
+        """ Write the pool to a directory in the PoolArchive format: numeric columns as .npy files
+            and labels, citations and notes in a string table.
+
+        :param path: (str) directory to write the pool to
+        :return: None
+        """
+        PoolArchive.save(self, path)
+
+    @classmethod
+    def load(cls, path, outcome_label='', mmap_mode='r'):
+        """ Open a pool saved with save(). Columns are memory mapped, so opening takes constant time;
+            pages are read as analyses use them and are shared by every process that opens the
+            same directory. Study objects are built when first accessed. Outcome ids are
+            reassigned on load.
+
+        :param path: (str) directory the pool was saved to
+        :param outcome_label: (str) type of outcome to register
+        :param mmap_mode: (str) 'r' to map the columns read-only, None to read them into memory
+        :return: (StudyPool) pool backed by the saved columns; they are copied into memory only if
+                  the pool is modified
+        """
+        archive = PoolArchive(path, mmap_mode=mmap_mode)
+        study_pool = cls.__new__(cls)
+        study_pool.studies = archive.studies()
+        study_pool._attach_studies()
+        study_pool._store = archive.store()
+        study_pool._stale = False
+        study_pool._accumulators = {}
+        study_pool.outcome_label = outcome_label
+        return study_pool
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # studies do not pickle their pools
+        self._attach_studies()
+
+    def __repr__(self):
+        result = 'Study pool containing: '
+        for study in self.studies._objects():
+            result += '\n' + '\t' + str(study)
+        return result
+
@@ -0,0 +1,54 @@
+from collections import namedtuple
+import numpy as np
+from .MetaSummary import MetaSummary
+
+
+SubgroupResult = namedtuple('SubgroupResult', ['groups', 'within', 'q_between', 'dof_between', 'p_between'])
+
+
+class Subgroup:
+    """ Subgroup analysis. The rows of each group are contiguous, so the weighted sums of every
+        group come from one segmented reduction (see MetaSummary.from_segments()) and the
+        per-group estimates, within-group Q statistics and the between-group test cost about
+        as much as a single meta-analysis of the pool.
+
+    Attributes:
+        effect_sizes (numpy 1d array) effect sizes, with the rows of each group contiguous
+        variances (numpy 1d array) variances, in the same order
+        offsets (numpy 1d array) rows offsets[i]:offsets[i+1] belong to group i
+        summary (MetaSummary) summary of each group
+
+    References (informal list):
+        Borenstein, M., & Higgins, J. P. (2013). Meta-analysis and subgroups.
+            Prevention science, 14(2), 134-143.
+    """
+
+    def __init__(self, effect_sizes, variances, offsets):
+        """
+        :param effect_sizes: (numpy 1d array) effect sizes, with the rows of each group contiguous
+        :param variances: (numpy 1d array) variances, in the same order
+        :param offsets: (numpy 1d array) group boundaries
+        """
+        self.effect_sizes = effect_sizes
+        self.variances = variances
+        self.offsets = offsets
+        self.summary = MetaSummary.from_segments(effect_sizes, variances, offsets)
+
+    def result(self, method='auto', tau_square_estimator='DL', groups=None):
+        """ Estimates of every group and the test of differences between groups. The between-group
+            Q compares the group estimates, weighted by the inverse of their variances, with their
+            weighted mean; under random effects each group uses its own tau-square.
+
+        :param method: (str) random effects if 're', fixed effects if 'fe', chosen per group from
+                        its Q test if 'auto'
+        :param tau_square_estimator: (str or TauSquareEstimator) between-study variance estimator
+        :param groups: (list) identifiers of the groups
+        :return: (SubgroupResult) groups, MetaAnalysisResult with one array element per group,
+                  between-group Q, its degrees of freedom and p-value
+        """
+        within = self.summary.result(method=method, tau_square_estimator=tau_square_estimator)
+        weights = 1 / within.variance
+        mean = np.dot(weights, within.effect_size) / weights.sum()
+        q_between = np.dot(weights, np.square(within.effect_size - mean))
+        dof_between = weights.size - 1
+        return SubgroupResult(groups, within, q_between, dof_between, MetaSummary.chi2_sf(q_between, dof_between))
@@ -0,0 +1,102 @@
+from .MetaSummary import MetaSummary
+
+
+class WeightedAccumulator:
+    """ Running inverse variance weighted sums of one outcome type. Outcomes are added and
+        removed one at a time in constant time, so pooled fixed effects and DerSimonian-Laird
+        statistics stay available while studies enter and leave a pool. Sums use Neumaier's
+        variant of Kahan compensated summation so that long sequences of additions and
+        removals do not accumulate rounding error.
+
+    Attributes:
+        k (int) number of outcomes currently accumulated
+    """
+
+    _fields = ('sum_w', 'sum_w2', 'sum_wy', 'sum_wy2')
+
+    def __init__(self):
+        self.k = 0
+        self._sums = [0.0] * len(self._fields)
+        self._compensations = [0.0] * len(self._fields)
+        self._summary = None
+
+    @classmethod
+    def from_arrays(cls, effect_sizes, variances):
+        """ Start an accumulator from existing effect sizes and variances.
+
+        :param effect_sizes: (numpy 1d array) effect sizes
+        :param variances: (numpy 1d array) variances
+        :return: (WeightedAccumulator)
+        """
+        accumulator = cls()
+        summary = MetaSummary.from_arrays(effect_sizes, variances)
+        accumulator.k = summary.k
+        accumulator._sums = [float(getattr(summary, field)) for field in cls._fields]
+        return accumulator
+
+    def add(self, effect_size, variance):
+        """ Add one outcome to the sums.
+
+        :param effect_size: (float) effect size of outcome
+        :param variance: (float) variance of outcome
+        :return: None
+        """
+        self._update(effect_size, variance, 1)
+
+    def remove(self, effect_size, variance):
+        """ Remove one previously added outcome from the sums.
+
+        :param effect_size: (float) effect size of outcome
+        :param variance: (float) variance of outcome
+        :return: None
+        """
+        self._update(effect_size, variance, -1)
+
+    def summary(self, source=None):
+        """ Summary of the accumulated outcomes. The summary is cached until the next update.
+
+        :param source: (callable) returns current (effect_sizes, variances); only called if
+                        random effects estimates are requested
+        :return: (MetaSummary) sufficient statistics of accumulated outcomes
+        """
+        if self._summary is None:
+            sums = [total + compensation for total, compensation in zip(self._sums, self._compensations)]
+            self._summary = MetaSummary(self.k, *sums, source=source)
+        return self._summary
+
+    def copy(self):
+        """ Create a copy of the accumulator; the cached summary is not shared.
+
+        :return: (WeightedAccumulator) copy of calling instance
+        """
+        accumulator = WeightedAccumulator()
+        accumulator.k = self.k
+        accumulator._sums = list(self._sums)
+        accumulator._compensations = list(self._compensations)
+        return accumulator
+
+    def _update(self, effect_size, variance, sign):
+        ivw = 1 / variance
+        ivw_es = ivw * effect_size
+        terms = (ivw, ivw * ivw, ivw_es, ivw_es * effect_size)
+        self.k += sign
+        self._summary = None
+        if self.k == 0:
+            # nothing left to sum; drop any residual rounding error
+            self._sums = [0.0] * len(self._fields)
+            self._compensations = [0.0] * len(self._fields)
+            return
+        sums = self._sums
+        compensations = self._compensations
+        for i, term in enumerate(terms):
+            term = sign * term
+            total = sums[i] + term
+            # Neumaier: recover the low-order bits lost by whichever operand is smaller
+            if abs(sums[i]) >= abs(term):
+                compensations[i] += (sums[i] - total) + term
+            else:
+                compensations[i] += (term - total) + sums[i]
+            sums[i] = total
+
+    def __repr__(self):
+        return f'WeightedAccumulator(k={self.k})'
@@ -0,0 +1,19 @@
+from .Study import Study
+from .StudyPool import StudyPool
+from .StudyList import StudyList
+from .OutcomeStore import OutcomeStore
+from .MetaSummary import MetaSummary, MetaAnalysisResult
+from .WeightedAccumulator import WeightedAccumulator
+from .LeaveOneOut import LeaveOneOut, LeaveOneOutResult
+from .Resampling import Resampler, BootstrapResult, PermutationResult
+from .Cumulative import Cumulative, CumulativeResult
+from .MetaRegression import MetaRegression, MetaRegressionResult
+from .Subgroup import Subgroup, SubgroupResult
+from .PublicationBias import PublicationBias, EggerResult, BeggResult, TrimAndFillResult, PetPeeseResult
+from .Gosh import Gosh
+from .OutcomeLoader import OutcomeLoader, LoadError
+from .PoolArchive import PoolArchive, ArchivedStudies
+from .Instrumentation import Instrumentation, TraceEvent
+from .BatchRunner import BatchRunner
+from .PoolBatch import PoolBatch
+from .PowerSimulation import PowerSimulation, PowerResult
\ No newline at end of file
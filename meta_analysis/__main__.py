@@ -0,0 +1,82 @@
+""" Batch meta-analysis of every outcome label of a pool.
+
+    Usage: python -m meta_analysis SOURCE [--method auto] [--tau-square-estimator DL]
+                                          [--diagnostics egger begg trim_and_fill pet_peese]
+                                          [--format csv|jsonl] [--output FILE] [--n-jobs N]
+
+    SOURCE is either a pool directory written by StudyPool.save() or a CSV extraction table
+    read with OutcomeLoader (one outcome per row). Results are written one label at a time as
+    they finish; rows of the table that could not be loaded are reported on stderr.
+"""
+import argparse
+import os
+import sys
+from .BatchRunner import BatchRunner
+from .OutcomeLoader import OutcomeLoader
+from .StudyPool import StudyPool
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='meta_analysis', description=__doc__.splitlines()[0])
+    parser.add_argument('source', help='pool directory written by StudyPool.save(), or CSV extraction table')
+    parser.add_argument('--labels', nargs='+', help='outcome labels to analyze; all by default')
+    parser.add_argument('--method', choices=['fe', 're', 'auto'], default='auto',
+                        help="fixed effects, random effects, or chosen per label from its Q test (default 'auto')")
+    parser.add_argument('--tau-square-estimator', choices=['DL', 'REML', 'ML', 'PM', 'SJ'], default='DL',
+                        help="between-study variance estimator (default 'DL')")
+    parser.add_argument('--diagnostics', nargs='+', default=[], choices=sorted(BatchRunner.diagnostic_columns),
+                        help='publication bias diagnostics to run per label')
+    parser.add_argument('--alpha', type=float, default=0.05, help='confidence intervals have coverage 1 - alpha')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv', help="output format (default 'csv')")
+    parser.add_argument('--output', help='file to write results to; stdout if omitted')
+    parser.add_argument('--n-jobs', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('--chunk-size', type=int, default=64, help='labels analyzed per task')
+    parser.add_argument('--outcome-type', choices=['binary', 'continuous'],
+                        help="outcome type of every table row; read from a 'type' column if omitted")
+    parser.add_argument('--use-pre', action='store_true', help='use gains scores for rows with pre-period data')
+    return parser.parse_args(argv)
+
+
+def load(args):
+    """ Open a saved pool, or load an extraction table and report the rows that were skipped. """
+    if os.path.isdir(args.source):
+        return StudyPool.load(args.source)
+    loader = OutcomeLoader(outcome_type=args.outcome_type, use_pre=args.use_pre)
+    studies = loader.load(args.source)
+    for error in loader.errors:
+        print(f'{args.source}:{error.line}: skipped ({error.citation}): {error.message}', file=sys.stderr)
+    if len(studies) < 2:
+        raise SystemExit(f'{args.source}: at least two studies are needed, found {len(studies)}')
+    # every label is analyzed; registering one only avoids the unset label warning on stdout
+    return StudyPool(studies, outcome_label=studies[0].outcomes[0].label)
+
+
+def main(argv=None):
+    """ Run the command line interface.
+
+    :param argv: (list) command line arguments; sys.argv[1:] if None
+    :return: (int) exit status
+    """
+    args = parse_args(argv)
+    study_pool = load(args)
+    runner = BatchRunner(method=args.method, tau_square_estimator=args.tau_square_estimator,
+                         diagnostics=args.diagnostics, alpha=args.alpha, n_jobs=args.n_jobs,
+                         chunk_size=args.chunk_size)
+    rows = runner.run(study_pool, args.labels)
+    if args.output:
+        with open(args.output, 'w', newline='') as file:
+            runner.write(rows, file, args.format)
+        return 0
+    try:
+        runner.write(rows, sys.stdout, args.format)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # the reader closed the pipe early (e.g. piped into head); silence the error at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,23 @@
+from .TauSquareEstimator import TauSquareEstimator
+import numpy as np
+
+
+class DerSimonianLaird(TauSquareEstimator):
+    """ DerSimonian-Laird method of moments estimator of tau-square. Non-iterative.
+
+    References (informal list):
+        DerSimonian, R., & Laird, N. (1986). Meta-analysis in clinical trials. Controlled clinical trials, 7(3), 177-188
+    """
+
+    name = 'DL'
+
+    def estimate_batch(self, effect_sizes, variances):
+        # imported here because MetaSummary imports the estimators package
+        from ..MetaSummary import MetaSummary
+        effect_sizes, variances, valid, k = self._prepare(effect_sizes, variances)
+        ivw = np.where(valid, 1 / variances, 0.0)
+        ivw_es = ivw * effect_sizes
+        # Q and the moment estimate come from the same weighted sums as every other summary
+        summary = MetaSummary(k, ivw.sum(axis=1), np.square(ivw).sum(axis=1), ivw_es.sum(axis=1),
+                              (ivw_es * effect_sizes).sum(axis=1))
+        return summary.tau_square
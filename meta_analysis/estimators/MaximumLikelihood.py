@@ -0,0 +1,36 @@
+from .TauSquareEstimator import TauSquareEstimator
+import numpy as np
+
+
+class MaximumLikelihood(TauSquareEstimator):
+    """ Maximum likelihood estimator of tau-square, solved by Fisher scoring.
+
+    References (informal list):
+        Viechtbauer, W. (2005). Bias and efficiency of meta-analytic variance estimators in the
+            random-effects model. Journal of Educational and Behavioral Statistics, 30(3), 261-293.
+    """
+
+    name = 'ML'
+
+    def estimate_batch(self, effect_sizes, variances):
+        effect_sizes, variances, valid, k = self._prepare(effect_sizes, variances)
+        tau_square = self._iterate(self._step, self._initial(effect_sizes, variances, valid, k),
+                                   effect_sizes, variances, valid)
+        return np.where(k > 1, tau_square, 0.0)
+
+    @staticmethod
+    def _initial(effect_sizes, variances, valid, k):
+        """ Hedges' unweighted method of moments estimate, used as starting value;
+            nan for pools with fewer than two effect sizes so they are not iterated. """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = effect_sizes.sum(axis=1) / k
+            residuals = np.where(valid, effect_sizes - mean[:, np.newaxis], 0.0)
+            tau_square = np.square(residuals).sum(axis=1) / (k - 1) - np.where(valid, variances, 0.0).sum(axis=1) / k
+        return np.where(k > 1, np.maximum(tau_square, 0), np.nan)
+
+    def _step(self, tau_square, effect_sizes, variances, valid):
+        weights = self._weights(variances, valid, tau_square)
+        square_weights = np.square(weights)
+        residuals = self._weighted_residuals(effect_sizes, weights)
+        # Fisher scoring update, which simplifies to a weighted fixed point equation
+        return (square_weights * (residuals - variances)).sum(axis=1) / square_weights.sum(axis=1)
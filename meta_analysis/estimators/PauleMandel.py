@@ -0,0 +1,32 @@
+from .TauSquareEstimator import TauSquareEstimator
+import numpy as np
+
+
+class PauleMandel(TauSquareEstimator):
+    """ Paule-Mandel estimator of tau-square. Solves generalized Q(tau-square) = k - 1 by Newton's
+        method; Q is convex and decreasing in tau-square, so iterates starting at zero increase
+        monotonically to the root.
+
+    References (informal list):
+        Paule, R. C., & Mandel, J. (1982). Consensus values and weighting factors.
+            Journal of Research of the National Bureau of Standards, 87(5), 377-385.
+    """
+
+    name = 'PM'
+
+    def estimate_batch(self, effect_sizes, variances):
+        effect_sizes, variances, valid, k = self._prepare(effect_sizes, variances)
+        dof = k - 1
+        tau_square = self._iterate(self._step, np.where(k > 1, 0.0, np.nan),
+                                   effect_sizes, variances, valid, dof)
+        return np.where(k > 1, tau_square, 0.0)
+
+    def _step(self, tau_square, effect_sizes, variances, valid, dof):
+        weights = self._weights(variances, valid, tau_square)
+        residuals = self._weighted_residuals(effect_sizes, weights)
+        q = (weights * residuals).sum(axis=1)
+        # derivative of generalized Q with respect to tau-square is -sum(w^2 * residual^2)
+        slope = (np.square(weights) * residuals).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            step = np.where(slope > 0, (q - dof) / slope, 0.0)
+        return tau_square + step
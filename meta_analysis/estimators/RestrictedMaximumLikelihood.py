@@ -0,0 +1,21 @@
+from .MaximumLikelihood import MaximumLikelihood
+import numpy as np
+
+
+class RestrictedMaximumLikelihood(MaximumLikelihood):
+    """ Restricted maximum likelihood estimator of tau-square, solved by Fisher scoring.
+
+    References (informal list):
+        Viechtbauer, W. (2005). Bias and efficiency of meta-analytic variance estimators in the
+            random-effects model. Journal of Educational and Behavioral Statistics, 30(3), 261-293.
+    """
+
+    name = 'REML'
+
+    def _step(self, tau_square, effect_sizes, variances, valid):
+        weights = self._weights(variances, valid, tau_square)
+        square_weights = np.square(weights)
+        residuals = self._weighted_residuals(effect_sizes, weights)
+        # ML update plus the correction for estimating the weighted mean
+        return (square_weights * (residuals - variances)).sum(axis=1) / square_weights.sum(axis=1) + \
+            1 / weights.sum(axis=1)
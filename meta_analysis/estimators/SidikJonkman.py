@@ -0,0 +1,25 @@
+from .TauSquareEstimator import TauSquareEstimator
+import numpy as np
+
+
+class SidikJonkman(TauSquareEstimator):
+    """ Sidik-Jonkman estimator of tau-square. Non-iterative: a single weighted residual
+        variance, with weights built from a crude unweighted starting estimate.
+
+    References (informal list):
+        Sidik, K., & Jonkman, J. N. (2005). Simple heterogeneity variance estimation for
+            meta-analysis. Journal of the Royal Statistical Society: Series C, 54(2), 367-384.
+    """
+
+    name = 'SJ'
+
+    def estimate_batch(self, effect_sizes, variances):
+        effect_sizes, variances, valid, k = self._prepare(effect_sizes, variances)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = effect_sizes.sum(axis=1) / k
+            residuals = np.where(valid, effect_sizes - mean[:, np.newaxis], 0.0)
+            initial = np.square(residuals).sum(axis=1) / k
+            weights = np.where(valid, 1 / (variances / initial[:, np.newaxis] + 1), 0.0)
+            residuals = self._weighted_residuals(effect_sizes, weights)
+            tau_square = (weights * residuals).sum(axis=1) / (k - 1)
+        return np.where((k > 1) & (initial > 0), tau_square, 0.0)
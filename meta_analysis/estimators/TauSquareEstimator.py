@@ -0,0 +1,134 @@
+import warnings
+import numpy as np
+
+
+class TauSquareEstimator:
+    """ Estimator of tau-square, the between-study variance used in random effects meta-analysis.
+        Every estimator works on a batch of independent pools at once: each row of the 2d
+        effect size and variance arrays is one pool, and shorter pools are padded with nan
+        (see pad()). Iterative estimators update all unconverged rows together in each step.
+
+    Attributes:
+        name (str) short name used to select the estimator, e.g. 'DL' or 'REML'
+        tol (float) iterative estimators stop once tau-square changes by less than tol
+        max_iter (int) maximum number of iterations for iterative estimators
+
+    References (informal list):
+        Viechtbauer, W. (2005). Bias and efficiency of meta-analytic variance estimators in the
+            random-effects model. Journal of Educational and Behavioral Statistics, 30(3), 261-293.
+
+        Veroniki, A. A., et al. (2016). Methods to estimate the between-study variance and its
+            uncertainty in meta-analysis. Research synthesis methods, 7(1), 55-79.
+    """
+
+    name = None
+    _registry = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.name:
+            TauSquareEstimator._registry[cls.name] = cls
+
+    def __init__(self, tol=1e-10, max_iter=100):
+        """
+        :param tol: (float) convergence tolerance on tau-square
+        :param max_iter: (int) maximum number of iterations
+        """
+        self.tol = tol
+        self.max_iter = max_iter
+
+    @classmethod
+    def from_name(cls, estimator, **kwargs):
+        """ Look up an estimator by name. Estimator instances are returned unchanged.
+
+        :param estimator: (str or TauSquareEstimator) estimator name ('DL', 'REML', 'ML', 'PM', 'SJ') or instance
+        :return: (TauSquareEstimator)
+        """
+        if isinstance(estimator, TauSquareEstimator):
+            return estimator
+        try:
+            return cls._registry[estimator.upper()](**kwargs)
+        except KeyError:
+            raise ValueError(f'Unknown tau-square estimator: {estimator}')
+
+    def estimate(self, effect_sizes, variances):
+        """ Estimate tau-square for a single pool.
+
+        :param effect_sizes: (numpy 1d array) effect sizes
+        :param variances: (numpy 1d array) variances
+        :return: (float) tau-square
+        """
+        effect_sizes = np.asarray(effect_sizes, dtype=float)[np.newaxis]
+        variances = np.asarray(variances, dtype=float)[np.newaxis]
+        return float(self.estimate_batch(effect_sizes, variances)[0])
+
+    def estimate_batch(self, effect_sizes, variances):
+        """ Estimate tau-square for many independent pools at once.
+
+        :param effect_sizes: (numpy 2d array) one pool per row, padded with nan
+        :param variances: (numpy 2d array) one pool per row, padded with nan
+        :return: (numpy 1d array) tau-square of each pool
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def pad(arrays):
+        """ Stack 1d arrays of different lengths into a nan-padded 2d array.
+
+        :param arrays: (list) 1d arrays, one per pool
+        :return: (numpy 2d array) one row per pool
+        """
+        lengths = np.array([len(array) for array in arrays], dtype=np.intp)
+        padded = np.full((len(arrays), lengths.max(initial=0)), np.nan)
+        padded[np.arange(padded.shape[1]) < lengths[:, np.newaxis]] = np.concatenate(arrays) if arrays else []
+        return padded
+
+    @staticmethod
+    def _prepare(effect_sizes, variances):
+        """ Replace padding with neutral values and count the effect sizes of each pool.
+
+        :return: (numpy 2d array, numpy 2d array, numpy 2d array, numpy 1d array)
+                 effect sizes, variances, mask of valid entries, number of valid entries per row
+        """
+        effect_sizes = np.atleast_2d(np.asarray(effect_sizes, dtype=float))
+        variances = np.atleast_2d(np.asarray(variances, dtype=float))
+        valid = ~(np.isnan(effect_sizes) | np.isnan(variances))
+        effect_sizes = np.where(valid, effect_sizes, 0.0)
+        variances = np.where(valid, variances, 1.0)
+        return effect_sizes, variances, valid, valid.sum(axis=1)
+
+    @staticmethod
+    def _weights(variances, valid, tau_square):
+        """ Random effects weights for the given tau-square of each row; zero on padding. """
+        return np.where(valid, 1 / (variances + tau_square[:, np.newaxis]), 0.0)
+
+    @staticmethod
+    def _weighted_residuals(effect_sizes, weights):
+        """ Squared residuals around the weighted mean of each row. """
+        mean = (weights * effect_sizes).sum(axis=1) / weights.sum(axis=1)
+        return np.square(effect_sizes - mean[:, np.newaxis])
+
+    def _iterate(self, step, tau_square, *arrays):
+        """ Apply step() to every row until tau-square converges. Rows that have converged
+            are dropped from later iterations. Estimates are truncated at zero.
+
+        :param step: (callable) maps (tau_square, *row_arrays) to the next tau-square of each row
+        :param tau_square: (numpy 1d array) starting values
+        :return: (numpy 1d array) tau-square of each row
+        """
+        tau_square = np.maximum(tau_square, 0)
+        active = np.flatnonzero(np.isfinite(tau_square))
+        for _ in range(self.max_iter):
+            if active.size == 0:
+                return tau_square
+            current = tau_square[active]
+            updated = np.maximum(step(current, *(array[active] for array in arrays)), 0)
+            tau_square[active] = updated
+            active = active[~(np.abs(updated - current) <= self.tol)]
+        if active.size:
+            warnings.warn(f'{self.name} tau-square estimate did not converge for {active.size} pool(s) '
+                          f'after {self.max_iter} iterations')
+        return tau_square
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(tol={self.tol}, max_iter={self.max_iter})'
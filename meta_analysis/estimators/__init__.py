@@ -0,0 +1,6 @@
+from .TauSquareEstimator import TauSquareEstimator
+from .DerSimonianLaird import DerSimonianLaird
+from .MaximumLikelihood import MaximumLikelihood
+from .RestrictedMaximumLikelihood import RestrictedMaximumLikelihood
+from .PauleMandel import PauleMandel
+from .SidikJonkman import SidikJonkman
\ No newline at end of file
@@ -0,0 +1,219 @@
+from .Outcome import Outcome
+import math
+import numpy as np
+
+
+class BinaryOutcome(Outcome):
+    """ A binary outcome of a research study.
+
+    Attributes:
+        label (str) type of outcome
+        treat_n (int) sample size of treatment group
+        control_n (int) sample size of control group
+        effect size (float) standardized mean difference or approximation
+        variance (float) variance of effect size
+        note (str) space for researcher notes
+        method (str) estimation method
+        id (int) unique id assigned to this outcome instance
+
+        treat_post (float) percent "successes" of treatment group in post period
+        control_post (float) percent "successes" of control group in post period
+        treat_pre (float) percent "successes" of treatment group in pre period
+        control_pre (float) percent "successes" of control group in pre period
+
+    References (informal list):
+        Lipsey, M. W., & Wilson, D. B. (2001). Practical meta-analysis. SAGE publications, Inc.
+
+        http://www.campbellcollaboration.org/images/pdf/plain-language/Calculating_Effect_Sizes_Wilson_2013.pdf
+
+        https://www.meta-analysis.com/downloads/Meta-analysis%20Converting%20among%20effect%20sizes.pdf
+
+        Sánchez-Meca, J., Marín-Martínez, F., & Chacón-Moscoso, S. (2003). Effect-size indices for
+            dichotomized outcomes in meta-analysis. Psychological methods, 8(4), 448.
+
+        Washington State Institute for Public Policy. (December 2018). Benefit-cost technical documentation.
+            Olympia, WA
+    """
+
+    __slots__ = ('treat_post', 'control_post', 'treat_pre', 'control_pre')
+
+    def __init__(self, label, treat_n, control_n, treat_post, control_post, treat_pre=None, control_pre=None):
+        super().__init__(label, treat_n, control_n)
+        self.treat_post = treat_post
+        self.control_post = control_post
+        self.treat_pre = treat_pre
+        self.control_pre = control_pre
+
+    def estimate(self, use_pre=False):
+        """ Calculates and updates effect size and variance. This is always inplace.
+
+            Args:
+                use_pre (bool) use gains scores if pre-period is available
+            Returns:
+                effect_size (float) Approximation of standardized mean difference
+                variance (float) Variance of effect size estimate
+        """
+        self._before_edit()
+        # construct effect size
+        logit = self.make_logit(self.treat_post, self.control_post)
+        effect_size = self.transform_logit(logit)
+        # construct variance
+        variance = self.calculate_variance(self.treat_post, self.control_post)
+        # track estimation method
+        self.method = 'logit_post'
+        # calculate effect size using gains scores if use_pre=True
+        if use_pre:
+            try:
+                pre_logit = self.make_logit(self.treat_pre, self.control_pre)
+                effect_size -= self.transform_logit(pre_logit)
+                variance += self.calculate_variance(self.treat_pre, self.control_pre)
+                # track estimation method
+                self.method = 'logit_gains'
+            except ReferenceError:
+                # TODO: set up logger, make error the right error to except
+                raise Exception('Pre-period scores not found or incomplete.')
+        # store effect size and variance calculations
+        self.set_estimate(effect_size, variance)
+
+    @staticmethod
+    def estimate_arrays(treat_n, control_n, treat_post, control_post, treat_pre=None, control_pre=None):
+        """ Vectorized counterpart of estimate(). Calculates effect sizes and variances
+            for many binary outcomes at once using NumPy array operations. Gains scores
+            are used when pre-period arrays are provided.
+
+            Args:
+                treat_n (array-like) sample sizes of treatment groups
+                control_n (array-like) sample sizes of control groups
+                treat_post (array-like) treatment group percent "successes" in post period
+                control_post (array-like) control group percent "successes" in post period
+                treat_pre (array-like) treatment group percent "successes" in pre period
+                control_pre (array-like) control group percent "successes" in pre period
+            Returns:
+                effect_sizes (numpy 1d array) Approximations of standardized mean difference
+                variances (numpy 1d array) Variances of effect size estimates
+        """
+        treat_n = np.asarray(treat_n, dtype=float)
+        control_n = np.asarray(control_n, dtype=float)
+        # finite sample bias correction shared by post and pre periods
+        adjustment = 1 - 3 / (4 * (treat_n + control_n) - 9)
+
+        def smd_and_variance(treat_p, control_p):
+            treat_p = np.asarray(treat_p, dtype=float)
+            control_p = np.asarray(control_p, dtype=float)
+            # log odds transformed to have unit variance
+            logit = np.log((treat_p * (1 - control_p)) / (control_p * (1 - treat_p)))
+            corrected_d = logit / (math.pi / math.sqrt(3)) * adjustment
+            # variance of the log odds ratio from the expected cell counts of both groups
+            variance_logit = 1 / (treat_n * treat_p) + 1 / (treat_n * (1 - treat_p)) + \
+                1 / (control_n * control_p) + 1 / (control_n * (1 - control_p))
+            variance_d = variance_logit / (math.pi ** 2 / 3)
+            return corrected_d, variance_d
+
+        effect_sizes, variances = smd_and_variance(treat_post, control_post)
+        if treat_pre is not None or control_pre is not None:
+            if treat_pre is None or control_pre is None:
+                raise Exception('Pre-period scores not found or incomplete.')
+            pre_effect_sizes, pre_variances = smd_and_variance(treat_pre, control_pre)
+            if np.isnan(pre_effect_sizes).any():
+                raise Exception('Pre-period scores not found or incomplete.')
+            effect_sizes -= pre_effect_sizes
+            variances += pre_variances
+        return effect_sizes, variances
+
+    @classmethod
+    def estimate_batch(cls, outcomes, use_pre=False):
+        """ Calculates and updates effect size and variance of many outcomes at once.
+            Produces the same estimates and method tags as calling estimate() on each outcome.
+
+            Args:
+                outcomes (list) BinaryOutcome instances to estimate
+                use_pre (bool) use gains scores if pre-period is available
+            Returns:
+                effect_sizes (numpy 1d array) Approximations of standardized mean difference
+                variances (numpy 1d array) Variances of effect size estimates
+        """
+        assert all(isinstance(x, BinaryOutcome) for x in outcomes), \
+            'outcomes can only contain objects of type BinaryOutcome'
+        treat_pre = control_pre = None
+        if use_pre:
+            treat_pre = [outcome.treat_pre for outcome in outcomes]
+            control_pre = [outcome.control_pre for outcome in outcomes]
+        effect_sizes, variances = cls.estimate_arrays([outcome.treat_n for outcome in outcomes],
+                                                      [outcome.control_n for outcome in outcomes],
+                                                      [outcome.treat_post for outcome in outcomes],
+                                                      [outcome.control_post for outcome in outcomes],
+                                                      treat_pre, control_pre)
+        # track estimation method and store effect size and variance calculations
+        method = 'logit_gains' if use_pre else 'logit_post'
+        for outcome, effect_size, variance in zip(outcomes, effect_sizes.tolist(), variances.tolist()):
+            outcome._before_edit()
+            outcome.method = method
+            outcome.effect_size = effect_size
+            outcome.variance = variance
+            outcome._notify()
+        return effect_sizes, variances
+
+    def transform_logit(self, logit):
+        """ Transforms logit to standardized mean difference approximation
+            by dividing by standard deviation.
+
+            Args:
+                logit (float) log odds; random variable with logistic distribution
+            Returns:
+                corrected_d (float) SMD approximation from logit
+        """
+        # transform logit to have unit variance
+        d = logit / (math.pi/math.sqrt(3))
+        # apply finite sample bias correction for small samples
+        adjustment = 1 - 3 / (4 * (self.treat_n + self.control_n) - 9)
+        corrected_d = d * adjustment
+        return corrected_d
+
+    def make_logit(self, treat_p, control_p):
+        """ Calculates log odds, a random variable with logistic distribution
+
+            Args:
+                treat_p (float) treatment group percent "successes"
+                control_p (float) control group percent "successes"
+            Returns:
+                logit (float) log odds
+        """
+        odds_numerator = treat_p*(1-control_p)
+        odds_denominator = control_p*(1-treat_p)
+        # NumPy's log, which can differ from math.log in the last bit, so that
+        # estimate_arrays() reproduces estimate() exactly
+        log_odds = float(np.log(odds_numerator/odds_denominator))
+        return log_odds
+
+    def calculate_variance(self, treat_p, control_p):
+        """ Calculates binary outcome effect size variance from the expected cell counts
+            (successes and failures) of both groups
+
+           Args:
+               treat_p (float) treatment group percent "successes"
+               control_p (float) control group percent "successes"
+           Returns:
+               variance_d (float) variance of logit-based effect size estimate
+        """
+
+        o1 = 1 / (self.treat_n * treat_p)
+        o2 = 1 / (self.treat_n * (1 - treat_p))
+        o3 = 1 / (self.control_n * control_p)
+        o4 = 1 / (self.control_n * (1 - control_p))
+        variance_logit = o1 + o2 + o3 + o4
+        variance_d = variance_logit / (math.pi**2 / 3)
+        return variance_d
+
+    def set_post_mean(self, treat_post, control_post):
+        self.treat_post = treat_post
+        self.control_post = control_post
+
+    def get_post_mean(self):
+        return self.treat_post, self.control_post
+
+    def set_pre_mean(self, treat_pre, control_pre):
+        self.treat_pre = treat_pre
+        self.control_pre = control_pre
+
+    def get_pre_mean(self):
+        return self.treat_pre, self.control_pre
\ No newline at end of file
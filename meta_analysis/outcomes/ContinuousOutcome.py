@@ -0,0 +1,272 @@
+from .Outcome import Outcome
+import math
+import numpy as np
+
+
+class ContinuousOutcome(Outcome):
+    """ A continous outcome of a research study.
+
+    Attributes:
+        label (str) type of outcome
+        treat_n (int) sample size of treatment group
+        control_n (int) sample size of control group
+        effect size (float) standardized mean difference or approximation
+        variance (float) variance of effect size
+        note (str) space for researcher notes
+        method (str) estimation method
+        id (int) unique id assigned to this outcome instance
+
+        treat_post (float) outcome mean for treatment group in post period
+        control_post (float) outcome mean for control group in post period
+        treat_post_sd (float) outcome standard deviation for treatment group in post period
+        control_post_sd (float) outcome standard deviation for control group in post period
+        treat_pre (float) outcome mean for treatment group in pre period
+        control_pre (float) outcome mean for control group in pre period
+        treat_pre_sd (float) outcome standard deviation for treatment group in pre period
+        control_pre_sd (float) outcome standard deviation for control group in pre period
+
+    References (informal list):
+        Lipsey, M. W., & Wilson, D. B. (2001). Practical meta-analysis. SAGE publications, Inc.
+
+        http://www.campbellcollaboration.org/images/pdf/plain-language/Calculating_Effect_Sizes_Wilson_2013.pdf
+
+        https://www.meta-analysis.com/downloads/Meta-analysis%20Converting%20among%20effect%20sizes.pdf
+
+        Sánchez-Meca, J., Marín-Martínez, F., & Chacón-Moscoso, S. (2003). Effect-size indices for
+            dichotomized outcomes in meta-analysis. Psychological methods, 8(4), 448.
+
+        Washington State Institute for Public Policy. (December 2018). Benefit-cost technical documentation.
+            Olympia, WA
+    """
+
+    __slots__ = ('treat_post', 'control_post', 'treat_pre', 'control_pre',
+                 'treat_post_sd', 'control_post_sd', 'treat_pre_sd', 'control_pre_sd')
+
+    def __init__(self, label, treat_n, control_n, treat_post, control_post,
+                 treat_post_sd, control_post_sd,
+                 treat_pre=None, control_pre=None,
+                 treat_pre_sd=None, control_pre_sd=None):
+        super().__init__(label, treat_n, control_n)
+        self.treat_post = treat_post
+        self.control_post = control_post
+        self.treat_pre = treat_pre
+        self.control_pre = control_pre
+        self.treat_post_sd = treat_post_sd
+        self.control_post_sd = control_post_sd
+        self.treat_pre_sd = treat_pre_sd
+        self.control_pre_sd = control_pre_sd
+
+    def estimate(self, use_pre=False):
+        """ Calculates and updates effect size and variance. This is always inplace.
+
+            Args:
+                use_pre (bool) use gains scores if pre-period is available
+            Returns:
+                effect_size (float) Approximation of standardized mean difference
+                variance (float) Variance of effect size estimate
+        """
+        self._before_edit()
+        # calculate effect size as standardized mean difference
+        post_pooled_sd = self.calculate_pooled_sd(self.treat_post_sd, self.control_post_sd)
+        effect_size = self.calculate_smd(self.treat_post, self.control_post, post_pooled_sd)
+        # construct variance
+        variance = self.calculate_variance(effect_size)
+        # track estimation method
+        self.method = 'SMD_post'
+        # calculate effect size using gains scores if use_pre=True
+        if use_pre:
+            try:
+                pre_pooled_sd = self.calculate_pooled_sd(self.treat_pre_sd, self.control_pre_sd)
+                pre_effect_size = self.calculate_smd(self.treat_pre, self.control_pre, pre_pooled_sd)
+                effect_size -= pre_effect_size
+                variance += self.calculate_variance(pre_effect_size)
+                # track estimation method
+                self.method = 'SMD_gains'
+            except ReferenceError:
+                # TODO: set up logger, make error the right error to except
+                raise Exception('Pre-period scores not found or incomplete.')
+        # store effect size and variance calculations
+        self.set_estimate(effect_size, variance)
+
+    @staticmethod
+    def estimate_arrays(treat_n, control_n, treat_post, control_post, treat_post_sd, control_post_sd,
+                        treat_pre=None, control_pre=None, treat_pre_sd=None, control_pre_sd=None):
+        """ Vectorized counterpart of estimate(). Calculates effect sizes and variances
+            for many continuous outcomes at once using NumPy array operations. Gains scores
+            are used when pre-period arrays are provided.
+
+            Args:
+                treat_n (array-like) sample sizes of treatment groups
+                control_n (array-like) sample sizes of control groups
+                treat_post (array-like) outcome means for treatment groups in post period
+                control_post (array-like) outcome means for control groups in post period
+                treat_post_sd (array-like) outcome standard deviations for treatment groups in post period
+                control_post_sd (array-like) outcome standard deviations for control groups in post period
+                treat_pre (array-like) outcome means for treatment groups in pre period
+                control_pre (array-like) outcome means for control groups in pre period
+                treat_pre_sd (array-like) outcome standard deviations for treatment groups in pre period
+                control_pre_sd (array-like) outcome standard deviations for control groups in pre period
+            Returns:
+                effect_sizes (numpy 1d array) Approximations of standardized mean difference
+                variances (numpy 1d array) Variances of effect size estimates
+        """
+        treat_n = np.asarray(treat_n, dtype=float)
+        control_n = np.asarray(control_n, dtype=float)
+        # finite sample bias correction shared by post and pre periods
+        adjustment = 1 - 3 / (4 * (treat_n + control_n) - 9)
+
+        def smd_and_variance(treat_mean, control_mean, treat_sd, control_sd):
+            treat_sd = np.asarray(treat_sd, dtype=float)
+            control_sd = np.asarray(control_sd, dtype=float)
+            # pooled standard deviation
+            pooled_variance = ((treat_n - 1) * (treat_sd * treat_sd) + (control_n - 1) * (control_sd * control_sd)) / \
+                              (treat_n + control_n - 2)
+            pooled_sd = np.sqrt(pooled_variance)
+            # standardized mean difference with small sample correction
+            d = (np.asarray(treat_mean, dtype=float) - np.asarray(control_mean, dtype=float)) / pooled_sd
+            corrected_d = d * adjustment
+            return corrected_d, ContinuousOutcome.variance_arrays(treat_n, control_n, corrected_d)
+
+        effect_sizes, variances = smd_and_variance(treat_post, control_post, treat_post_sd, control_post_sd)
+        pre = (treat_pre, control_pre, treat_pre_sd, control_pre_sd)
+        if any(x is not None for x in pre):
+            if any(x is None for x in pre):
+                raise Exception('Pre-period scores not found or incomplete.')
+            pre_effect_sizes, pre_variances = smd_and_variance(*pre)
+            if np.isnan(pre_effect_sizes).any():
+                raise Exception('Pre-period scores not found or incomplete.')
+            effect_sizes -= pre_effect_sizes
+            variances += pre_variances
+        return effect_sizes, variances
+
+    @staticmethod
+    def variance_arrays(treat_n, control_n, effect_sizes):
+        """ Vectorized counterpart of calculate_variance().
+
+            Args:
+                treat_n (array-like) sample sizes of treatment groups
+                control_n (array-like) sample sizes of control groups
+                effect_sizes (array-like) standardized mean differences
+            Returns:
+                variances (numpy array) variances of the effect sizes
+        """
+        treat_n = np.asarray(treat_n, dtype=float)
+        control_n = np.asarray(control_n, dtype=float)
+        term1 = (treat_n + control_n) / (treat_n * control_n)
+        effect_sizes = np.asarray(effect_sizes, dtype=float)
+        term2 = effect_sizes * effect_sizes
+        term3 = 2 * (treat_n + control_n)
+        return term1 + (term2 / term3)
+
+    @classmethod
+    def estimate_batch(cls, outcomes, use_pre=False):
+        """ Calculates and updates effect size and variance of many outcomes at once.
+            Produces the same estimates and method tags as calling estimate() on each outcome.
+
+            Args:
+                outcomes (list) ContinuousOutcome instances to estimate
+                use_pre (bool) use gains scores if pre-period is available
+            Returns:
+                effect_sizes (numpy 1d array) Approximations of standardized mean difference
+                variances (numpy 1d array) Variances of effect size estimates
+        """
+        assert all(isinstance(x, ContinuousOutcome) for x in outcomes), \
+            'outcomes can only contain objects of type ContinuousOutcome'
+        pre = ()
+        if use_pre:
+            pre = ([outcome.treat_pre for outcome in outcomes],
+                   [outcome.control_pre for outcome in outcomes],
+                   [outcome.treat_pre_sd for outcome in outcomes],
+                   [outcome.control_pre_sd for outcome in outcomes])
+        effect_sizes, variances = cls.estimate_arrays([outcome.treat_n for outcome in outcomes],
+                                                      [outcome.control_n for outcome in outcomes],
+                                                      [outcome.treat_post for outcome in outcomes],
+                                                      [outcome.control_post for outcome in outcomes],
+                                                      [outcome.treat_post_sd for outcome in outcomes],
+                                                      [outcome.control_post_sd for outcome in outcomes],
+                                                      *pre)
+        # track estimation method and store effect size and variance calculations
+        method = 'SMD_gains' if use_pre else 'SMD_post'
+        for outcome, effect_size, variance in zip(outcomes, effect_sizes.tolist(), variances.tolist()):
+            outcome._before_edit()
+            outcome.method = method
+            outcome.effect_size = effect_size
+            outcome.variance = variance
+            outcome._notify()
+        return effect_sizes, variances
+
+    def calculate_smd(self, treat_mean, control_mean, pooled_sd):
+        """ Calculates standardized mean difference
+
+            Args:
+                treat_mean (float) treatment group mean
+                control_mean (float) control group mean
+                pooled_sd (float) pooled standard deviation of groups
+            Returns:
+                corrected_d (float) standardized mean difference
+        """
+        # calculate standardized mean difference
+        d = (treat_mean - control_mean) / pooled_sd
+        # apply finite sample bias correction for small samples
+        adjustment = 1 - 3 / (4 * (self.treat_n + self.control_n) - 9)
+        corrected_d = d * adjustment
+        return corrected_d
+
+    def calculate_pooled_sd(self, treat_sd, control_sd):
+        """ Calculates pooled standard deviation
+
+            Args:
+                treat_sd (float) standard deviation of treatment group
+                control_sd (float) standard deviation of control group
+            Returns:
+                pooled_sd (float) pooled standard deviation
+        """
+        # squares are products, since pow() may round differently from the vectorized estimate_arrays()
+        term1 = (self.treat_n-1)*(treat_sd*treat_sd)
+        term2 = (self.control_n-1)*(control_sd*control_sd)
+        term3 = self.treat_n + self.control_n - 2
+        pooled_variance = (term1 + term2) / term3
+        pooled_sd = math.sqrt(pooled_variance)
+        return pooled_sd
+
+    def calculate_variance(self, effect_size):
+        """ Calculates continuous outcome effect size variance
+
+           Args:
+               effect size (float) standardized mean difference
+           Returns:
+               variance_d (float) variance of standardized mean difference
+        """
+        term1 = (self.treat_n + self.control_n) / (self.treat_n * self.control_n)
+        term2 = effect_size*effect_size
+        term3 = 2 * (self.treat_n + self.control_n)
+        variance_d = term1 + (term2 / term3)
+        return variance_d
+
+    def set_post_mean(self, treat_post, control_post):
+        self.treat_post = treat_post
+        self.control_post = control_post
+
+    def get_post_mean(self):
+        return self.treat_post, self.control_post
+
+    def set_pre_mean(self, treat_pre, control_pre):
+        self.treat_pre = treat_pre
+        self.control_pre = control_pre
+
+    def get_pre_mean(self):
+        return self.treat_pre, self.control_pre
+
+    def set_post_sd(self, treat_post_sd, control_post_sd):
+        self.treat_post_sd = treat_post_sd
+        self.control_post_sd = control_post_sd
+
+    def get_post_sd(self):
+        return self.treat_post_sd, self.control_post_sd
+
+    def set_pre_sd(self, treat_pre_sd, control_pre_sd):
+        self.treat_pre = treat_pre_sd
+        self.control_pre = control_pre_sd
+
+    def get_pre_sd(self):
+        return self.treat_pre_sd, self.control_pre_sd
\ No newline at end of file
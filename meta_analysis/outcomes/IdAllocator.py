@@ -0,0 +1,95 @@
+import os
+import sys
+import threading
+import weakref
+
+
+class IdAllocator:
+    """ Allocates unique integer ids, safely across threads and processes.
+
+        Ids are namespaced: the upper bits hold the namespace of the process and the lower
+        sequence_bits a sequence number, so processes with different namespaces never hand
+        out the same id. The main process uses namespace 0; worker processes (forked or
+        spawned through multiprocessing) switch to their pid unless a namespace is set
+        explicitly, e.g. from a pool initializer with set_namespace().
+
+        Within a process, each thread reserves blocks of block_size sequence numbers from a
+        shared counter under a lock and then hands them out without locking, so ids from one
+        thread are increasing and ids from different threads never collide.
+
+    Attributes:
+        namespace (int) namespace of this process
+        block_size (int) number of sequence numbers reserved by a thread at a time
+        sequence_bits (int) number of low bits holding the sequence number
+    """
+
+    sequence_bits = 40
+
+    def __init__(self, namespace=0, block_size=1024):
+        """
+        :param namespace: (int) namespace of this process
+        :param block_size: (int) number of sequence numbers reserved by a thread at a time
+        """
+        self.block_size = block_size
+        # multiprocessing is only imported here if it is already loaded, as it is in every worker it starts
+        multiprocessing = sys.modules.get('multiprocessing')
+        if multiprocessing is not None and multiprocessing.parent_process() is not None:
+            # spawned worker: the parent may be allocating from the same sequence numbers
+            namespace = os.getpid()
+        self._reset(namespace)
+        _allocators.add(self)
+
+    def next_id(self):
+        """ Allocate one id.
+
+        :return: (int) unique id
+        """
+        local = self._local
+        value = next(getattr(local, 'block', iter(())), None)
+        if value is None:
+            local.block = iter(self.reserve(self.block_size))
+            value = next(local.block)
+        return value
+
+    def reserve(self, count):
+        """ Reserve a contiguous range of ids, e.g. for a batch of outcomes.
+
+        :param count: (int) number of ids
+        :return: (range) reserved ids
+        """
+        with self._lock:
+            start = self._next
+            assert start + count <= 1 << self.sequence_bits, 'id sequence exhausted'
+            self._next += count
+        base = self.namespace << self.sequence_bits
+        return range(base + start, base + start + count)
+
+    def set_namespace(self, namespace):
+        """ Switch to a new namespace and restart the sequence, e.g. in a process pool initializer.
+
+        :param namespace: (int) namespace unique to this process
+        :return: None
+        """
+        self._reset(namespace)
+
+    def _reset(self, namespace):
+        """ Start a fresh sequence in the given namespace and drop blocks reserved by threads. """
+        self._lock = threading.Lock()
+        self.namespace = namespace
+        self._next = 0
+        self._local = threading.local()
+
+    def __repr__(self):
+        return f'IdAllocator(namespace={self.namespace}, block_size={self.block_size})'
+
+
+_allocators = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    """ A forked child inherits the parent's sequence; move every allocator to the child's own namespace. """
+    for allocator in list(_allocators):
+        allocator._reset(os.getpid())
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -1,4 +1,5 @@
-import copy
+from .IdAllocator import IdAllocator
+import weakref
 
 
 class Outcome:
@@ -15,10 +16,22 @@ class Outcome:
         id (int) unique id assigned to this outcome instance
 
     Global variables:
-        _outcome_id_tracker (int) facilitates assignment of unique id to each Outcome instance
+        _id_allocator (IdAllocator) assigns a unique id to each Outcome instance, safely across
+            threads and process pool workers
+
+    Attributes are stored in __slots__ rather than a per-instance __dict__, which keeps
+    large pools of outcomes compact; subclasses declare their own extra slots.
+
+    Each outcome keeps weak references to the studies holding it (_studies). Edits through the
+    setters notify those studies, which mark their pools' columnar copies stale, so an edit only
+    invalidates pools that contain the outcome. The setters also warn the studies before the edit,
+    so that pools sharing a study with a copied pool take their own copy first. Parents are not
+    copied or pickled.
     """
 
-    _outcome_id_tracker = 0
+    __slots__ = ('label', 'treat_n', 'control_n', 'effect_size', 'variance', 'note', 'method', 'id', '_studies')
+
+    _id_allocator = IdAllocator()
 
     def __init__(self, label, treat_n, control_n, effect_size=0.0, variance=float('inf'), note=''):
         self.label = label
@@ -29,42 +42,97 @@ class Outcome:
         self.note = note
         self.method = 'custom'
 
-        self.id = 0 + Outcome._outcome_id_tracker
-        Outcome._outcome_id_tracker += 1
+        self.id = Outcome._id_allocator.next_id()
 
     def set_label(self, label):
+        self._before_edit()
         self.label = label
+        self._notify()
 
     def get_label(self):
         return self.label
 
     def set_n(self, treat_n, control_n):
+        self._before_edit()
         self.treat_n = treat_n
         self.control_n = control_n
+        self._notify()
 
     def get_n(self):
         return self.treat_n, self.control_n
 
     def set_estimate(self, effect_size, variance):
+        self._before_edit()
         self.effect_size = effect_size
         self.variance = variance
+        self._notify()
 
     def get_estimate(self):
         return self.effect_size, self.variance
 
     def set_note(self, note):
+        self._before_edit()
         self.note = note
 
     def get_note(self):
         return self.note
 
+    def _attach(self, study):
+        """ Register a study holding this outcome, so that it is notified of edits. """
+        studies = getattr(self, '_studies', None)
+        if studies is None:
+            self._studies = [weakref.ref(study)]
+        else:
+            studies[:] = [ref for ref in studies if ref() is not None]
+            studies.append(weakref.ref(study))
+
+    def _detach(self, study):
+        """ Stop notifying a study that no longer holds this outcome. """
+        studies = getattr(self, '_studies', None)
+        if studies:
+            studies[:] = [ref for ref in studies if ref() is not None and ref() is not study]
+
+    def _before_edit(self):
+        """ Tell the studies holding this outcome that it is about to be edited. """
+        for ref in getattr(self, '_studies', None) or ():
+            study = ref()
+            if study is not None:
+                study._before_edit()
+
+    def _notify(self):
+        """ Tell the studies holding this outcome that it was edited. """
+        for ref in getattr(self, '_studies', None) or ():
+            study = ref()
+            if study is not None:
+                study._notify()
+
+    @classmethod
+    def _state_slots(cls):
+        """ Slots copied and pickled: every slot of the class and its bases except the parent
+            studies, which belong to one object only. Computed once per class. """
+        names = cls.__dict__.get('_state_slot_names')
+        if names is None:
+            names = tuple(name for base in cls.__mro__ for name in getattr(base, '__slots__', ())
+                          if name != '_studies')
+            cls._state_slot_names = names
+        return names
+
+    def __getstate__(self):
+        return None, {name: getattr(self, name) for name in self._state_slots() if hasattr(self, name)}
+
     def copy(self):
-        """ Create a copy of class instance
+        """ Create a copy of class instance. Every attribute is an immutable value,
+            so a shallow copy is independent of the original. The copy belongs to no study.
 
         :param None
-        :return: deep copy of calling instance
+        :return: copy of calling instance
         """
-        return copy.deepcopy(self)
+        cls = type(self)
+        outcome = cls.__new__(cls)
+        for name in self._state_slots():
+            if hasattr(self, name):
+                setattr(outcome, name, getattr(self, name))
+        return outcome
 
     def __repr__(self):
         return f'Outcome(id={self.id}, Outcome={self.label}, Method={self.method}, ' \
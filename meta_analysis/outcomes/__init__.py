@@ -1,3 +1,4 @@
 from .BinaryOutcome import BinaryOutcome
 from .ContinuousOutcome import ContinuousOutcome
-from .Outcome import Outcome
\ No newline at end of file
+from .Outcome import Outcome
+from .IdAllocator import IdAllocator
\ No newline at end of file
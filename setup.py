@@ -6,4 +6,5 @@ setup(name='meta-analysis',
       author="Kris Bitney",
       keywords="meta-analysis meta analysis",
       packages=find_packages(),
+      entry_points={'console_scripts': ['meta-analysis=meta_analysis.__main__:main']},
       install_requires=['numpy>=1.16.3', 'scipy>=1.2.1'])
\ No newline at end of file
@@ -0,0 +1,82 @@
+from meta_analysis.BatchRunner import BatchRunner
+from meta_analysis.StudyPool import StudyPool
+from meta_analysis.Study import Study
+from meta_analysis.outcomes.Outcome import Outcome
+from meta_analysis.__main__ import main
+import numpy as np
+import io
+import json
+import csv
+import math
+
+
+def make_pool():
+    rng = np.random.default_rng(3)
+    studies = []
+    for i in range(12):
+        outcomes = [Outcome(f'label{(i + j) % 5}', 30, 30, float(rng.normal(0.2, 0.3)), float(rng.uniform(0.01, 0.05)))
+                    for j in range(3)]
+        studies.append(Study('', f'Kris et al {2000 + i}', outcomes=outcomes))
+    studies.append(Study('', 'Kris et al 2020', outcomes=[Outcome('rare', 30, 30, 0.1, 0.02)]))
+    return StudyPool(studies, outcome_label='label0')
+
+
+def test_run():
+    study_pool = make_pool()
+    expected = study_pool.meta_analysis_by_label(method='auto', tau_square_estimator='REML')
+    runner = BatchRunner(method='auto', tau_square_estimator='REML', diagnostics=['egger', 'pet_peese'],
+                         chunk_size=2)
+    rows = list(runner.run(study_pool))
+    assert sorted(row['label'] for row in rows) == sorted(expected)
+    for row in rows:
+        assert list(row) == runner.fields
+        assert row['method'] == expected[row['label']].method
+        assert math.isclose(row['effect_size'], expected[row['label']].effect_size)
+        assert np.allclose(row['p'], expected[row['label']].p, equal_nan=True)
+        assert row['ci_lower'] < row['effect_size'] < row['ci_upper']
+    rare = next(row for row in rows if row['label'] == 'rare')
+    assert rare['k'] == 1 and math.isnan(rare['egger_p'])
+    assert not math.isnan(next(row for row in rows if row['label'] == 'label0')['egger_p'])
+
+    parallel = BatchRunner(method='auto', tau_square_estimator='REML', diagnostics=['egger', 'pet_peese'],
+                           chunk_size=2, n_jobs=2)
+    by_label = {row['label']: row for row in parallel.run(study_pool)}
+    for row in rows:
+        assert by_label[row['label']]['effect_size'] == row['effect_size']
+
+
+def test_write():
+    study_pool = make_pool()
+    runner = BatchRunner(method='fe', diagnostics=['begg'])
+    file = io.StringIO()
+    assert runner.write(runner.run(study_pool, labels=['label0', 'rare']), file, 'jsonl') == 2
+    lines = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert [line['label'] for line in lines] == ['label0', 'rare']
+    assert lines[1]['begg_p'] is None
+
+    file = io.StringIO()
+    runner.write(runner.run(study_pool), file, 'csv')
+    table = list(csv.DictReader(io.StringIO(file.getvalue())))
+    assert len(table) == 6 and list(table[0]) == runner.fields
+
+
+def test_main(tmp_path):
+    study_pool = make_pool()
+    study_pool.save(str(tmp_path / 'pool'))
+    output = str(tmp_path / 'results.jsonl')
+    assert main([str(tmp_path / 'pool'), '--method', 're', '--format', 'jsonl', '--output', output,
+                 '--n-jobs', '1']) == 0
+    with open(output) as file:
+        rows = [json.loads(line) for line in file]
+    expected = study_pool.meta_analysis_by_label(method='re')
+    assert len(rows) == len(expected)
+    for row in rows:
+        assert math.isclose(row['effect_size'], expected[row['label']].effect_size)
+
+    table = tmp_path / 'table.csv'
+    table.write_text('citation,label,treat_n,control_n,treat_post,control_post\n'
+                     'A,crime,30,30,0.4,0.3\nB,crime,40,35,0.5,0.45\nB,school,40,35,0.6,0.5\n')
+    output = str(tmp_path / 'results.csv')
+    assert main([str(table), '--outcome-type', 'binary', '--output', output, '--n-jobs', '1']) == 0
+    with open(output) as file:
+        assert [row['label'] for row in csv.DictReader(file)] == ['crime', 'school']
@@ -1,5 +1,6 @@
-from outcomes.BinaryOutcome import BinaryOutcome
+from meta_analysis.outcomes.BinaryOutcome import BinaryOutcome
 import math
+import numpy as np
 
 
 def test_init():
@@ -29,8 +30,16 @@ def test_transform_logit():
 
 
 def test_calculate_variance():
-    # This is directly tested in the test_estimate() method
-    pass
+    outcome1 = BinaryOutcome('hi', 10, 15, 0.5, 0.4)
+    # expected cell counts 5 and 5 in the treatment group, 6 and 9 in the control group
+    assert math.isclose(outcome1.calculate_variance(0.5, 0.4), (1 / 5 + 1 / 5 + 1 / 6 + 1 / 9) / (math.pi ** 2 / 3),
+                        rel_tol=1e-12)
+    # the variance shrinks as the groups grow
+    outcome2 = BinaryOutcome('hi', 100, 150, 0.5, 0.4)
+    assert math.isclose(outcome2.calculate_variance(0.5, 0.4), outcome1.calculate_variance(0.5, 0.4) / 10,
+                        rel_tol=1e-12)
+    effect_sizes, variances = BinaryOutcome.estimate_arrays([10, 100], [15, 150], [0.5, 0.5], [0.4, 0.4])
+    assert list(variances) == [outcome1.calculate_variance(0.5, 0.4), outcome2.calculate_variance(0.5, 0.4)]
 
 
 def test_estimate():
@@ -57,25 +66,25 @@ def test_estimate():
     outcome7.estimate(use_pre=True)
 
     assert math.isclose(outcome1.effect_size, 0.214099082431041, rel_tol=1e6)
-    assert math.isclose(outcome1.variance, 5.01539859029572, rel_tol=1e6)
+    assert math.isclose(outcome1.variance, 0.417105539327624, rel_tol=1e6)
 
     assert math.isclose(outcome2.effect_size, 0, rel_tol=1e6)
-    assert math.isclose(outcome2.variance, 5.06605918211689, rel_tol=1e6)
+    assert math.isclose(outcome2.variance, 0.422171598509741, rel_tol=1e6)
 
     assert math.isclose(outcome3.effect_size, -0.303811432905619, rel_tol=1e6)
-    assert math.isclose(outcome3.variance, 5.64865598806033, rel_tol=1e6)
+    assert math.isclose(outcome3.variance, 0.459322699178598, rel_tol=1e6)
 
     assert math.isclose(outcome4.effect_size, 0.428198164862082, rel_tol=1e6)
-    assert math.isclose(outcome4.variance, 4.96473799847455, rel_tol=1e6)
+    assert math.isclose(outcome4.variance, 0.413728166539546, rel_tol=1e6)
 
     assert math.isclose(outcome5.effect_size, 0.214099082431041, rel_tol=1e6)
-    assert math.isclose(outcome5.variance, 2.48236899923728, rel_tol=1e6)
+    assert math.isclose(outcome5.variance, 0.206019740072753, rel_tol=1e6)
 
     assert math.isclose(outcome6.effect_size, -0.214099082431041, rel_tol=1e6)
-    assert math.isclose(outcome6.variance, 2.48236899923728, rel_tol=1e6)
+    assert math.isclose(outcome6.variance, 0.207708426466792, rel_tol=1e6)
 
     assert math.isclose(outcome7.effect_size, 5.79067966012675, rel_tol=1e6)
-    assert math.isclose(outcome7.variance, 122.813555930106, rel_tol=1e6)
+    assert math.isclose(outcome7.variance, 92.1101669475798, rel_tol=1e6)
 
 
 def test_eq():
@@ -88,3 +97,50 @@ def test_eq():
 
     assert outcome1 == outcome2
     assert outcome1 != outcome3
+
+
+def test_estimate_batch():
+    outcomes = [BinaryOutcome('hi', 10, 15, 0.5, 0.4, treat_pre=0.4, control_pre=0.4),
+                BinaryOutcome('hi', 10, 15, 0.5, 0.4, treat_pre=0.4, control_pre=0.2),
+                BinaryOutcome('hi', 2, 1, 0.99, 0.01, treat_pre=0.01, control_pre=0.99)]
+    scalar = [BinaryOutcome('hi', 10, 15, 0.5, 0.4, treat_pre=0.4, control_pre=0.4),
+              BinaryOutcome('hi', 10, 15, 0.5, 0.4, treat_pre=0.4, control_pre=0.2),
+              BinaryOutcome('hi', 2, 1, 0.99, 0.01, treat_pre=0.01, control_pre=0.99)]
+    for outcome in scalar:
+        outcome.estimate(use_pre=True)
+
+    effect_sizes, variances = BinaryOutcome.estimate_batch(outcomes, use_pre=True)
+    for batch_outcome, outcome, effect_size, variance in zip(outcomes, scalar, effect_sizes, variances):
+        assert batch_outcome.method == outcome.method == 'logit_gains'
+        assert batch_outcome.effect_size == outcome.effect_size
+        assert batch_outcome.variance == outcome.variance
+        assert batch_outcome.effect_size == effect_size
+        assert batch_outcome.variance == variance
+
+    BinaryOutcome.estimate_batch(outcomes)
+    for outcome in outcomes:
+        assert outcome.method == 'logit_post'
+
+
+def test_estimate_batch_random():
+    rng = np.random.default_rng(0)
+    columns = zip(rng.integers(5, 500, 1000).tolist(), rng.integers(5, 500, 1000).tolist(),
+                  *rng.uniform(0.01, 0.99, (4, 1000)).tolist())
+    outcomes = [BinaryOutcome('hi', *values) for values in columns]
+    scalar = [outcome.copy() for outcome in outcomes]
+    for outcome in scalar:
+        outcome.estimate(use_pre=True)
+    BinaryOutcome.estimate_batch(outcomes, use_pre=True)
+    assert [outcome.effect_size for outcome in outcomes] == [outcome.effect_size for outcome in scalar]
+    assert [outcome.variance for outcome in outcomes] == [outcome.variance for outcome in scalar]
+
+
+def test_estimate_batch_missing_pre():
+    outcomes = [BinaryOutcome('hi', 10, 15, 0.5, 0.4, treat_pre=0.4, control_pre=0.4),
+                BinaryOutcome('hi', 10, 15, 0.5, 0.4)]
+    try:
+        BinaryOutcome.estimate_batch(outcomes, use_pre=True)
+    except Exception as e:
+        assert str(e) == 'Pre-period scores not found or incomplete.'
+    else:
+        assert False
@@ -1,5 +1,6 @@
-from outcomes.ContinuousOutcome import ContinuousOutcome
+from meta_analysis.outcomes.ContinuousOutcome import ContinuousOutcome
 import math
+import numpy as np
 
 
 def test_init():
@@ -48,10 +49,62 @@ def test_calculate_variance():
     assert math.isclose(outcome1.calculate_variance(es2), 0.077708761716434, rel_tol=1e6)
 
 
+def test_calculate_variance_regression():
+    outcome1 = ContinuousOutcome('hello', 30, 25, treat_post=8, control_post=7, treat_post_sd=2, control_post_sd=1)
+    # (n_t + n_c) / (n_t * n_c) + d^2 / (2 * (n_t + n_c))
+    assert math.isclose(outcome1.calculate_variance(0.0), 55 / 750, rel_tol=1e-12)
+    assert math.isclose(outcome1.calculate_variance(0.5), 55 / 750 + 0.25 / 110, rel_tol=1e-12)
+    es = outcome1.calculate_smd(8, 7, outcome1.calculate_pooled_sd(2, 1))
+    assert math.isclose(outcome1.calculate_variance(es), 0.076677723271016, rel_tol=1e-9)
+    variances = ContinuousOutcome.variance_arrays([30, 30], [25, 25], [0.0, 0.5])
+    assert list(variances) == [outcome1.calculate_variance(0.0), outcome1.calculate_variance(0.5)]
+
+
 def test_estimate():
     outcome1 = ContinuousOutcome('hello', 30, 25, treat_post=10, control_post=8, treat_post_sd=2.1,
                                  control_post_sd=1.9, treat_pre=3, control_pre=4, treat_pre_sd=1.3,
                                  control_pre_sd=1.2)
     outcome1.estimate(use_pre=True)
     assert math.isclose(outcome1.effect_size, 1.73321673159002, rel_tol=1e6)
-    assert math.isclose(outcome1.variance, 0.16055497274011, rel_tol=1e6)
\ No newline at end of file
+    assert math.isclose(outcome1.variance, 0.16055497274011, rel_tol=1e6)
+
+
+def test_estimate_batch():
+    def make_outcomes():
+        return [ContinuousOutcome('hello', 30, 25, treat_post=10, control_post=8, treat_post_sd=2.1,
+                                  control_post_sd=1.9, treat_pre=3, control_pre=4, treat_pre_sd=1.3,
+                                  control_pre_sd=1.2),
+                ContinuousOutcome('hello', 30, 25, treat_post=8, control_post=7, treat_post_sd=2, control_post_sd=1,
+                                  treat_pre=7, control_pre=6, treat_pre_sd=1.5, control_pre_sd=1.2)]
+    outcomes = make_outcomes()
+    scalar = make_outcomes()
+    for outcome in scalar:
+        outcome.estimate(use_pre=True)
+
+    effect_sizes, variances = ContinuousOutcome.estimate_batch(outcomes, use_pre=True)
+    for batch_outcome, outcome in zip(outcomes, scalar):
+        assert batch_outcome.method == outcome.method == 'SMD_gains'
+        assert batch_outcome.effect_size == outcome.effect_size
+        assert batch_outcome.variance == outcome.variance
+    assert list(effect_sizes) == [outcome.effect_size for outcome in scalar]
+
+    ContinuousOutcome.estimate_batch(outcomes)
+    for outcome in outcomes:
+        assert outcome.method == 'SMD_post'
+
+
+def test_estimate_batch_random():
+    rng = np.random.default_rng(0)
+    sizes = rng.integers(5, 500, (2, 1000)).tolist()
+    means = rng.uniform(-5, 5, (4, 1000)).tolist()
+    sds = rng.uniform(0.5, 3, (4, 1000)).tolist()
+    outcomes = [ContinuousOutcome('hello', treat_n, control_n, treat_post, control_post, treat_post_sd,
+                                  control_post_sd, treat_pre, control_pre, treat_pre_sd, control_pre_sd)
+                for treat_n, control_n, treat_post, control_post, treat_pre, control_pre,
+                treat_post_sd, control_post_sd, treat_pre_sd, control_pre_sd in zip(*sizes, *means, *sds)]
+    scalar = [outcome.copy() for outcome in outcomes]
+    for outcome in scalar:
+        outcome.estimate(use_pre=True)
+    ContinuousOutcome.estimate_batch(outcomes, use_pre=True)
+    assert [outcome.effect_size for outcome in outcomes] == [outcome.effect_size for outcome in scalar]
+    assert [outcome.variance for outcome in outcomes] == [outcome.variance for outcome in scalar]
@@ -0,0 +1,40 @@
+from meta_analysis.Cumulative import Cumulative
+from meta_analysis.MetaSummary import MetaSummary
+import numpy as np
+import math
+
+
+effect_sizes = np.array([0.1, 0.17, 0.2, 0.3, 0.5, -0.2, 0.8])
+variances = np.array([0.02, 0.03, 0.01, 0.025, 0.035, 0.04, 0.05])
+
+
+def test_partial_pools():
+    for method in ['fe', 're']:
+        for estimator in ['DL', 'REML']:
+            result = Cumulative(effect_sizes, variances).result(method=method, tau_square_estimator=estimator)
+            assert result.method == method
+            for i in range(1, effect_sizes.size):
+                expected = MetaSummary.from_arrays(effect_sizes[:i + 1], variances[:i + 1])
+                assert result.k[i] == i + 1
+                assert math.isclose(result.q[i], expected.q)
+                assert math.isclose(result.i_square[i], expected.i_square)
+                assert math.isclose(result.effect_size[i], expected.effect_size(method, estimator))
+                assert math.isclose(result.variance[i], expected.variance(method, estimator))
+                margin = 1.959963984540054 * math.sqrt(expected.variance(method, estimator))
+                assert math.isclose(result.ci_upper[i] - result.effect_size[i], margin)
+                if method == 're':
+                    assert math.isclose(result.tau_square[i], expected.estimate_tau_square(estimator),
+                                        rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_units():
+    offsets = np.array([0, 2, 5, 7])
+    cumulative = Cumulative(effect_sizes, variances, offsets)
+    cumulative._block_elements = 7
+    result = cumulative.result(method='re', units=['a', 'b', 'c'])
+    assert result.unit == ['a', 'b', 'c']
+    assert list(result.k) == [2, 5, 7]
+    expected = MetaSummary.from_arrays(effect_sizes[:5], variances[:5])
+    assert math.isclose(result.effect_size[1], expected.re_effect_size)
+    full = MetaSummary.from_arrays(effect_sizes, variances)
+    assert math.isclose(result.effect_size[-1], full.re_effect_size)
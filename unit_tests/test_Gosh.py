@@ -0,0 +1,42 @@
+from meta_analysis.Gosh import Gosh
+from meta_analysis.MetaSummary import MetaSummary
+import numpy as np
+import math
+
+
+effect_sizes = np.array([0.1, 0.17, 0.2, 0.3, 0.5, -0.2, 0.8])
+variances = np.array([0.02, 0.03, 0.01, 0.025, 0.035, 0.04, 0.05])
+
+
+def test_exhaustive():
+    result = Gosh(effect_sizes, variances, block_size=10).run()
+    assert result.shape == (2 ** 7 - 1,)
+    for i in [0, 2, 44, 126]:
+        members = np.array([(i + 1) >> j & 1 for j in range(7)], dtype=bool)
+        expected = MetaSummary.from_arrays(effect_sizes[members], variances[members])
+        assert result['k'][i] == members.sum()
+        assert math.isclose(result['effect_size'][i], expected.fe_effect_size)
+        if members.sum() > 1:
+            assert math.isclose(result['i_square'][i], expected.i_square)
+        else:
+            assert math.isnan(result['i_square'][i])
+
+
+def test_sampled(tmp_path):
+    gosh = Gosh(effect_sizes, variances, block_size=30, seed=5)
+    result = gosh.run(n_subsets=100)
+    assert result.shape == (100,)
+    assert np.all(result['k'] >= 1)
+    path = str(tmp_path / 'gosh.npy')
+    parallel = Gosh(effect_sizes, variances, block_size=30, n_jobs=2, seed=5).run(n_subsets=100, path=path)
+    assert isinstance(parallel, np.memmap)
+    in_memory = Gosh(effect_sizes, variances, block_size=30, n_jobs=2, seed=5).run(n_subsets=100)
+    for other in [np.load(path), in_memory]:
+        for field in Gosh.dtype.names:
+            assert np.array_equal(other[field], result[field], equal_nan=field != 'k')
+
+
+def test_wide_subsets():
+    members = Gosh.subsets(80, 0, 50, np.random.SeedSequence(0))
+    assert members.shape == (50, 80)
+    assert members.any(axis=1).all()
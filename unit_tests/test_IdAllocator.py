@@ -0,0 +1,39 @@
+from meta_analysis.outcomes.IdAllocator import IdAllocator
+from meta_analysis.outcomes.Outcome import Outcome
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+
+
+def allocate(allocator, n):
+    return [allocator.next_id() for _ in range(n)]
+
+
+def outcome_ids(n):
+    return [Outcome('crime', 10, 10).id for _ in range(n)]
+
+
+def test_threads():
+    allocator = IdAllocator(block_size=7)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        blocks = list(executor.map(allocate, [allocator] * 16, [500] * 16))
+    ids = [value for block in blocks for value in block]
+    assert len(set(ids)) == len(ids)
+    for block in blocks:
+        assert block == sorted(block)
+
+
+def test_reserve_and_namespace():
+    allocator = IdAllocator(block_size=4)
+    assert allocator.reserve(3) == range(0, 3)
+    assert allocator.next_id() == 3
+    allocator.set_namespace(5)
+    assert allocator.next_id() == 5 << IdAllocator.sequence_bits
+
+
+def test_processes():
+    parent_ids = outcome_ids(10)
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+        child_ids = [value for block in executor.map(outcome_ids, [10] * 4) for value in block]
+    ids = parent_ids + child_ids
+    assert len(set(ids)) == len(ids)
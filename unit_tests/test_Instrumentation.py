@@ -0,0 +1,84 @@
+from meta_analysis.Instrumentation import Instrumentation
+from meta_analysis.StudyPool import StudyPool
+from meta_analysis.Study import Study
+from meta_analysis.outcomes.Outcome import Outcome
+from meta_analysis.outcomes.BinaryOutcome import BinaryOutcome
+
+
+def make_pool():
+    studies = [Study('', f'Kris et al {2010 + i}', outcomes=[Outcome('crime', 20, 20, 0.1 * i, 0.01 + 0.01 * i)])
+               for i in range(4)]
+    return StudyPool(studies, outcome_label='crime')
+
+
+def test_enable_disable():
+    original = StudyPool.__dict__['calculate_q']
+    instrumentation = Instrumentation()
+    with instrumentation:
+        assert StudyPool.__dict__['calculate_q'] is not original
+        make_pool().calculate_q()
+        outcome = BinaryOutcome('crime', 30, 30, 0.4, 0.3)
+        outcome.estimate()
+        BinaryOutcome.estimate_batch([outcome, outcome.copy()])
+    assert StudyPool.__dict__['calculate_q'] is original
+    assert not instrumentation.enabled
+
+    stats = instrumentation.to_dict()
+    assert stats['StudyPool.calculate_q']['calls'] == 1
+    assert stats['StudyPool.calculate_q']['size_max'] == 4
+    assert stats['StudyPool.calculate_q']['seconds'] > 0
+    assert stats['BinaryOutcome.estimate']['calls'] == 1
+    assert stats['Outcome.set_estimate']['calls'] == 1
+    assert stats['BinaryOutcome.estimate_batch']['size_total'] == 2
+
+    # nothing is recorded once disabled
+    make_pool().calculate_q()
+    assert instrumentation.to_dict()['StudyPool.calculate_q']['calls'] == 1
+
+
+def test_copy_on_write():
+    study_pool = make_pool()
+    instrumentation = Instrumentation()
+    with instrumentation:
+        cpy = study_pool.copy()
+        cpy.studies[1].outcomes[0].set_estimate(0.5, 0.02)
+        study_pool.studies[2].set_note('edited')
+    stats = instrumentation.to_dict()
+    assert stats['StudyPool.copy']['calls'] == 1
+    assert stats['StudyList._own']['calls'] == 2
+    assert stats['Study.copy']['calls'] == 2
+    assert stats['Outcome.copy']['calls'] == 2
+
+
+def test_trace():
+    study_pool = make_pool()
+    instrumentation = Instrumentation()
+    with instrumentation:
+        with instrumentation.trace() as first:
+            study_pool.summarize(method='re', tau_square_estimator='REML')
+        with instrumentation.trace() as second:
+            study_pool.summarize(method='re', tau_square_estimator='REML')
+
+    def cached(events, operation):
+        return [event.cached for event in events if event.operation == operation]
+
+    assert cached(first, 'WeightedAccumulator.summary') == [False]
+    assert cached(first, 'OutcomeStore.arrays') == [False, True]
+    assert False in cached(first, 'MetaSummary.estimate_tau_square')
+    assert cached(second, 'WeightedAccumulator.summary') == [True]
+    assert set(cached(second, 'MetaSummary.estimate_tau_square')) == {True}
+    assert 'OutcomeStore.arrays' not in [event.operation for event in second]
+    assert first[-1].operation == 'StudyPool.summarize' and first[-1].cached is None
+
+    stats = instrumentation.to_dict()['MetaSummary.estimate_tau_square']
+    assert stats['cache_hits'] >= 2 and stats['cache_misses'] == 1
+
+
+def test_to_prometheus():
+    instrumentation = Instrumentation()
+    with instrumentation:
+        make_pool().meta_analysis(method='fe')
+    text = instrumentation.to_prometheus()
+    assert '# TYPE meta_analysis_calls_total counter' in text
+    assert 'meta_analysis_calls_total{operation="StudyPool.meta_analysis"} 1' in text
+    assert 'meta_analysis_cache_misses_total{operation="StudyPool._accumulator"} 1' in text
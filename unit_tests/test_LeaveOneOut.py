@@ -0,0 +1,62 @@
+from meta_analysis.LeaveOneOut import LeaveOneOut
+from meta_analysis.MetaSummary import MetaSummary
+import numpy as np
+import math
+
+
+effect_sizes = np.array([0.1, 0.17, 0.2, 0.3, 0.5, -0.2, 0.8])
+variances = np.array([0.02, 0.03, 0.01, 0.025, 0.035, 0.04, 0.05])
+
+
+def test_reduced_pools():
+    for method in ['fe', 're']:
+        for estimator in ['DL', 'REML']:
+            result = LeaveOneOut(effect_sizes, variances).result(method=method, tau_square_estimator=estimator)
+            assert result.method == method
+            for i in range(effect_sizes.size):
+                keep = np.arange(effect_sizes.size) != i
+                expected = MetaSummary.from_arrays(effect_sizes[keep], variances[keep])
+                assert math.isclose(result.q[i], expected.q)
+                assert math.isclose(result.p[i], expected.p)
+                assert math.isclose(result.i_square[i], expected.i_square)
+                assert math.isclose(result.effect_size[i], expected.effect_size(method, estimator))
+                assert math.isclose(result.variance[i], expected.variance(method, estimator))
+                if method == 're':
+                    assert math.isclose(result.tau_square[i], expected.estimate_tau_square(estimator),
+                                        rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_units():
+    offsets = np.array([0, 2, 5, 7])
+    result = LeaveOneOut(effect_sizes, variances, offsets).result(method='re', units=['a', 'b', 'c'])
+    assert result.unit == ['a', 'b', 'c']
+    keep = np.r_[0:2, 5:7]
+    expected = MetaSummary.from_arrays(effect_sizes[keep], variances[keep])
+    assert math.isclose(result.effect_size[1], expected.re_effect_size)
+    assert math.isclose(result.tau_square[1], expected.tau_square)
+
+
+def test_influence():
+    full = MetaSummary.from_arrays(effect_sizes, variances)
+    result = LeaveOneOut(effect_sizes, variances).result(method='re')
+    tau_square = full.tau_square
+    hat = (1 / (variances + tau_square)) * full.re_variance
+    assert np.allclose(result.hat, hat)
+    assert math.isclose(result.hat.sum(), 1)
+    difference = full.re_effect_size - result.effect_size
+    assert np.allclose(result.cooks_distance, difference ** 2 / full.re_variance)
+    assert np.allclose(result.covariance_ratio, result.variance / full.re_variance)
+    assert np.allclose(result.dffits, difference / np.sqrt(hat * (result.tau_square + variances)))
+    assert np.allclose(result.standardized_residual,
+                       (effect_sizes - result.effect_size) / np.sqrt(variances + result.tau_square + result.variance))
+    # the most extreme effect size is the most influential
+    assert np.argmax(result.cooks_distance) == 6
+
+
+def test_blocks():
+    leave_one_out = LeaveOneOut(effect_sizes, variances)
+    leave_one_out._block_elements = 10
+    blocked = leave_one_out.result(method='re', tau_square_estimator='PM')
+    unblocked = LeaveOneOut(effect_sizes, variances).result(method='re', tau_square_estimator='PM')
+    assert np.allclose(blocked.effect_size, unblocked.effect_size)
+    assert np.allclose(blocked.tau_square, unblocked.tau_square)
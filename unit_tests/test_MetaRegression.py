@@ -0,0 +1,84 @@
+from meta_analysis.MetaRegression import MetaRegression
+from meta_analysis.estimators import RestrictedMaximumLikelihood
+from scipy.optimize import minimize_scalar
+import numpy as np
+import math
+
+
+effect_sizes = np.array([0.1, 0.17, 0.2, 0.3, 0.5, -0.2, 0.8, 0.45])
+variances = np.array([0.02, 0.03, 0.01, 0.025, 0.035, 0.04, 0.05, 0.015])
+moderators = np.array([[1, 20], [2, 35], [2, 18], [3, 40], [5, 22], [0, 30], [6, 50], [4, 25]], dtype=float)
+
+
+def restricted_log_likelihood(tau_square, design):
+    weights = 1 / (variances + tau_square)
+    gram = design.T @ (design * weights[:, np.newaxis])
+    coefficients = np.linalg.solve(gram, design.T @ (weights * effect_sizes))
+    residuals = effect_sizes - design @ coefficients
+    return 0.5 * (np.sum(np.log(weights)) - np.log(np.linalg.det(gram)) - np.sum(weights * np.square(residuals)))
+
+
+def test_intercept_only():
+    model = MetaRegression(effect_sizes, variances, np.empty((effect_sizes.size, 0)))
+    weights = 1 / variances
+    mean = np.dot(weights, effect_sizes) / weights.sum()
+    q = np.dot(weights, np.square(effect_sizes - mean))
+    dl = max(0.0, (q - 7) / (weights.sum() - np.square(weights).sum() / weights.sum()))
+
+    result = model.fit(method='fe')
+    assert result.moderators == ['intercept']
+    assert math.isclose(result.coefficients[0], mean)
+    assert math.isclose(result.qe, q)
+    assert result.qm_dof == 0
+
+    result = model.fit(method='re')
+    assert math.isclose(result.tau_square, dl)
+    re_weights = 1 / (variances + dl)
+    assert math.isclose(result.coefficients[0], np.dot(re_weights, effect_sizes) / re_weights.sum())
+    assert math.isclose(result.covariance[0, 0], 1 / re_weights.sum())
+
+    result = model.fit(method='re', tau_square_estimator='REML')
+    assert math.isclose(result.tau_square, RestrictedMaximumLikelihood().estimate(effect_sizes, variances),
+                        rel_tol=1e-8)
+
+
+def test_moderators():
+    model = MetaRegression(effect_sizes, variances, moderators, names=['dose', 'age'])
+    design = np.column_stack([np.ones(effect_sizes.size), moderators])
+    scale = 1 / np.sqrt(variances)
+    expected = np.linalg.lstsq(design * scale[:, np.newaxis], effect_sizes * scale, rcond=None)[0]
+
+    result = model.fit(method='fe')
+    assert result.moderators == ['intercept', 'dose', 'age']
+    assert np.allclose(result.coefficients, expected)
+    assert math.isclose(result.qe, np.sum(np.square((effect_sizes - design @ expected) * scale)))
+    assert result.qe_dof == 5
+    assert result.qm_dof == 2
+    assert 0 <= result.qm_p <= 1
+
+    result = model.fit(method='re', tau_square_estimator='REML')
+    optimum = minimize_scalar(lambda tau_square: -restricted_log_likelihood(tau_square, design),
+                              bounds=(0, 1), method='bounded', options={'xatol': 1e-12})
+    assert math.isclose(result.tau_square, max(optimum.x, 0), abs_tol=1e-7)
+
+
+def test_subsets():
+    model = MetaRegression(effect_sizes, variances, moderators, names=['dose', 'age'])
+    results = model.fit_subsets([['dose'], ['age'], ['dose', 'age']], method='re')
+    alone = MetaRegression(effect_sizes, variances, moderators[:, :1], names=['dose'])
+    for method in ['fe', 're']:
+        assert np.allclose(model.fit(['dose'], method=method).coefficients,
+                           alone.fit(method=method).coefficients)
+    assert results[0].moderators == ['intercept', 'dose']
+    assert np.allclose(results[0].coefficients, alone.fit().coefficients)
+    assert math.isclose(results[0].tau_square, alone.fit().tau_square)
+    assert np.allclose(results[2].coefficients, model.fit().coefficients)
+
+
+def test_qe_p_far_tail():
+    from scipy.stats import chi2
+    # residual heterogeneity so large that 1 - cdf of QE rounds to zero
+    model = MetaRegression(effect_sizes * 10, variances / 10, moderators)
+    result = model.fit(method='fe')
+    assert 0 < result.qe_p < 1e-50
+    assert math.isclose(result.qe_p, chi2.sf(result.qe, result.qe_dof))
@@ -0,0 +1,119 @@
+from meta_analysis.MetaSummary import MetaSummary
+import numpy as np
+import math
+import warnings
+
+
+effect_sizes = np.array([0.1, 0.17, 0.2, 0.3, 0.5])
+variances = np.array([0.02, 0.03, 0.01, 0.025, 0.035])
+
+
+def test_from_arrays():
+    summary = MetaSummary.from_arrays(effect_sizes, variances)
+    ivw = 1 / variances
+    assert summary.k == 5
+    assert summary.dof == 4
+    assert math.isclose(summary.sum_w, ivw.sum())
+    assert math.isclose(summary.sum_w2, np.square(ivw).sum())
+    assert math.isclose(summary.sum_wy, np.dot(ivw, effect_sizes))
+    assert math.isclose(summary.sum_wy2, np.dot(ivw, np.square(effect_sizes)))
+
+
+def test_statistics():
+    summary = MetaSummary.from_arrays(effect_sizes, variances)
+    # Q by hand: weights 50, 33.33, 100, 40, 28.57 give a fixed effects mean of 0.226087, and
+    # 50(0.126087)^2 + 33.33(0.056087)^2 + 100(0.026087)^2 + 40(0.073913)^2 + 28.57(0.273913)^2 = 3.33
+    assert math.isclose(summary.q, 3.33, rel_tol=1e-9)
+    assert math.isclose(summary.q, np.dot(1 / variances, np.square(effect_sizes - summary.fe_effect_size)))
+    assert math.isclose(summary.p, 0.504193103521982, rel_tol=1e-6)
+    assert summary.tau_square == 0
+    assert math.isclose(summary.i_square, (3.33 - 4) / 3.33)
+    assert math.isclose(summary.fe_effect_size, 0.226086956521739)
+    assert math.isclose(summary.fe_variance, 0.003969754253308)
+    assert summary.re_effect_size == summary.fe_effect_size
+    assert summary.re_variance == summary.fe_variance
+
+
+def test_heterogeneous_statistics():
+    # six-study example of Borenstein et al. (2009), Introduction to Meta-Analysis
+    summary = MetaSummary.from_arrays(np.array([0.095, 0.277, 0.367, 0.664, 0.462, 0.185]),
+                                      np.array([0.033, 0.031, 0.050, 0.011, 0.043, 0.023]))
+    assert math.isclose(summary.fe_effect_size, 0.409258, rel_tol=1e-5)
+    assert math.isclose(summary.q, 11.743341, rel_tol=1e-6)
+    assert math.isclose(summary.p, 0.038479, rel_tol=1e-4)
+    assert math.isclose(summary.tau_square, 0.036282, rel_tol=1e-4)
+    assert math.isclose(summary.i_square, 0.574227, rel_tol=1e-5)
+    assert math.isclose(summary.re_effect_size, 0.357668, rel_tol=1e-5)
+    assert math.isclose(summary.re_variance, 0.010927, rel_tol=1e-4)
+
+
+def test_result():
+    summary = MetaSummary.from_arrays(effect_sizes, variances)
+    result = summary.result(method='auto')
+    # Q = 3.33 on 4 degrees of freedom is not significant
+    assert result.method == 'fe'
+    assert result.effect_size == summary.fe_effect_size
+    assert result.variance == summary.fe_variance
+    assert result.q == summary.q
+    assert result.dof == 4
+    assert result.tau_square == summary.tau_square
+
+    result = summary.result(method='re')
+    assert result.method == 're'
+    assert result.effect_size == summary.re_effect_size
+
+
+def test_no_heterogeneity():
+    summary = MetaSummary.from_arrays(np.array([0.1, 0.1, 0.1]), np.array([0.02, 0.03, 0.01]))
+    assert summary.tau_square == 0
+    assert summary.re_effect_size == summary.fe_effect_size
+    assert summary.re_variance == summary.fe_variance
+
+
+def test_from_segments():
+    offsets = np.array([0, 5, 5, 8])
+    grouped_effect_sizes = np.concatenate([effect_sizes, [0.4, 0.1, -0.3]])
+    grouped_variances = np.concatenate([variances, [0.01, 0.02, 0.04]])
+    summary = MetaSummary.from_segments(grouped_effect_sizes, grouped_variances, offsets)
+    assert list(summary.k) == [5, 0, 3]
+    assert summary.sum_w[1] == 0
+    # the empty segment has no estimates, and yields nan without RuntimeWarnings
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        result = summary.result(method='re')
+    assert np.isnan([result.effect_size[1], result.q[1], result.i_square[1]]).all()
+    assert result.variance[1] == math.inf
+
+    for pool, (start, stop) in enumerate([(0, 5), (5, 8)]):
+        expected = MetaSummary.from_arrays(grouped_effect_sizes[start:stop], grouped_variances[start:stop])
+        index = [0, 2][pool]
+        assert math.isclose(summary.q[index], expected.q)
+        assert math.isclose(summary.p[index], expected.p)
+        assert math.isclose(summary.tau_square[index], expected.tau_square)
+        assert math.isclose(summary.effect_size('re')[index], expected.re_effect_size)
+        assert math.isclose(summary.estimate_tau_square('REML')[index], expected.estimate_tau_square('REML'),
+                            rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_segmented_p_far_tail():
+    # strongly heterogeneous pools, where 1 - cdf of Q rounds to zero
+    grouped_effect_sizes = np.array([-2.0, 0.0, 2.0, -1.5, 1.5, 0.0])
+    grouped_variances = np.full(6, 0.01)
+    offsets = np.array([0, 3, 6])
+    summary = MetaSummary.from_segments(grouped_effect_sizes, grouped_variances, offsets)
+    for index, (start, stop) in enumerate([(0, 3), (3, 6)]):
+        expected = MetaSummary.from_arrays(grouped_effect_sizes[start:stop], grouped_variances[start:stop])
+        assert 0 < summary.p[index] < 1e-50
+        assert math.isclose(summary.p[index], expected.p, rel_tol=1e-8)
+
+
+def test_chi2_sf():
+    from scipy.stats import chi2
+    for dof in [1, 2, 3, 4.5, 10, 99, 1000, 10 ** 6]:
+        for x in [1e-3, 0.5 * dof, dof, dof + 3 * math.sqrt(dof), 2 * dof + 10]:
+            assert math.isclose(MetaSummary.chi2_sf(x, dof), chi2.sf(x, dof), rel_tol=1e-8, abs_tol=1e-14)
+    assert MetaSummary.chi2_sf(0.0, 3) == 1.0
+    assert MetaSummary.chi2_sf(-1.0, 3) == 1.0
+    assert MetaSummary.chi2_sf(math.inf, 3) == 0.0
+    assert math.isnan(MetaSummary.chi2_sf(2.0, 0))
+    assert math.isnan(MetaSummary.chi2_sf(math.nan, 3))
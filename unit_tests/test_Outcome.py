@@ -1,4 +1,8 @@
-from Outcome import Outcome
+from meta_analysis.outcomes.Outcome import Outcome
+from meta_analysis.outcomes.BinaryOutcome import BinaryOutcome
+from meta_analysis.outcomes.ContinuousOutcome import ContinuousOutcome
+from meta_analysis.Study import Study
+import pickle
 
 
 def test_init():
@@ -48,3 +52,45 @@ def test_neq():
     assert outcome1 != outcome3
     assert not outcome1 != outcome4
 
+
+def make_slotted_outcomes():
+    binary = BinaryOutcome('crime', 30, 30, 0.4, 0.3, treat_pre=0.5, control_pre=0.45)
+    binary.estimate(use_pre=True)
+    continuous = ContinuousOutcome('education', 25, 20, 10.0, 9.0, 2.0, 2.1)
+    continuous.estimate()
+    return [Outcome('crime', 20, 25, 0.3, 0.04, note='hand coded'), binary, continuous]
+
+
+def slot_values(outcome):
+    return {name: getattr(outcome, name) for name in outcome._state_slots() if hasattr(outcome, name)}
+
+
+def test_pickle_round_trip():
+    outcomes = make_slotted_outcomes()
+    study = Study('', 'Kris et al 2019', outcomes=outcomes)
+    for outcome in outcomes:
+        assert not hasattr(outcome, '__dict__')
+        loaded = pickle.loads(pickle.dumps(outcome))
+        assert type(loaded) is type(outcome)
+        assert slot_values(loaded) == slot_values(outcome)
+        # the parent study is not pickled, so the unpickled outcome belongs to no study
+        assert not getattr(loaded, '_studies', None)
+        assert [ref() for ref in outcome._studies] == [study]
+
+    loaded_study = pickle.loads(pickle.dumps(study))
+    for outcome, loaded in zip(outcomes, loaded_study.outcomes):
+        assert slot_values(loaded) == slot_values(outcome)
+        assert [ref() for ref in loaded._studies] == [loaded_study]
+
+
+def test_copy():
+    outcomes = make_slotted_outcomes()
+    study = Study('', 'Kris et al 2019', outcomes=outcomes)
+    for outcome in outcomes:
+        copy = outcome.copy()
+        assert type(copy) is type(outcome)
+        assert slot_values(copy) == slot_values(outcome)
+        assert not getattr(copy, '_studies', None)
+        copy.set_estimate(0.9, 0.5)
+        assert outcome.get_estimate() != (0.9, 0.5)
+        assert [ref() for ref in outcome._studies] == [study]
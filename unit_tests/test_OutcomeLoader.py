@@ -0,0 +1,58 @@
+from meta_analysis.OutcomeLoader import OutcomeLoader
+from meta_analysis.outcomes.BinaryOutcome import BinaryOutcome
+from meta_analysis.outcomes.ContinuousOutcome import ContinuousOutcome
+import io
+import math
+
+
+CSV = """citation,note,type,label,treat_n,control_n,treat_post,control_post,treat_post_sd,control_post_sd,year
+Kris et al 2019,first,binary,crime,100,100,0.3,0.4,,,2019
+Kris et al 2019,first,binary,crime,80,90,0.25,0.35,,,2019
+Kris et al 2018,second,continuous,education,50,50,10.5,9.8,2.0,2.2,2018
+Kris et al 2018,second,binary,crime,60,60,0,0.4,,,2018
+Kris et al 2017,third,binary,crime,abc,60,0.2,0.4,,,2017
+Kris et al 2017,third,binary,crime,70,70,0.2,0.4,,,2017
+,,binary,crime,70,70,0.2,0.4,,,
+"""
+
+
+def test_load():
+    loader = OutcomeLoader(moderators=['year'], chunk_size=2)
+    studies = loader.load(io.StringIO(CSV))
+    assert [study.citation for study in studies] == ['Kris et al 2019', 'Kris et al 2018', 'Kris et al 2017']
+    assert [len(study.outcomes) for study in studies] == [2, 1, 1]
+    assert studies[0].note == 'first'
+    assert studies[1].get_moderator('year') == 2018
+
+    outcome = studies[0].outcomes[0]
+    expected = BinaryOutcome('crime', 100, 100, 0.3, 0.4)
+    expected.estimate()
+    assert outcome.method == 'logit_post'
+    assert math.isclose(outcome.effect_size, expected.effect_size, rel_tol=1e-12)
+    assert math.isclose(outcome.variance, expected.variance, rel_tol=1e-12)
+    assert isinstance(studies[1].outcomes[0], ContinuousOutcome)
+
+    assert [error.line for error in loader.errors] == [5, 6, 8]
+    assert loader.errors[0].citation == 'Kris et al 2018'
+    assert 'proportion' in loader.errors[0].message
+
+
+def test_rows_and_columns():
+    rows = [{'study': 'a', 'outcome': 'crime', 'treat_n': 10, 'control_n': 10, 'treat_post': 0.2,
+             'control_post': 0.3, 'treat_pre': 0.25, 'control_pre': 0.3},
+            {'study': 'b', 'outcome': 'crime', 'treat_n': 10, 'control_n': 10, 'treat_post': 0.2,
+             'control_post': 0.3}]
+    loader = OutcomeLoader('binary', columns={'citation': 'study', 'label': 'outcome'}, use_pre=True)
+    study_pool = loader.load_pool(rows, 'crime')
+    assert [study.outcomes[0].method for study in study_pool.studies] == ['logit_gains', 'logit_post']
+    assert len(study_pool.effect_sizes) == 2
+    assert loader.errors == []
+
+
+def test_edit_after_load():
+    study_pool = OutcomeLoader(moderators=['year']).load_pool(io.StringIO(CSV), 'crime')
+    effect_sizes = list(study_pool.effect_sizes)
+    before = study_pool.meta_analysis(method='fe')
+    study_pool.studies[0].outcomes[0].set_estimate(1.5, 0.05)
+    assert list(study_pool.effect_sizes) == [1.5] + effect_sizes[1:]
+    assert study_pool.meta_analysis(method='fe') != before
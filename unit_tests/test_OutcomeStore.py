@@ -0,0 +1,87 @@
+from meta_analysis.OutcomeStore import OutcomeStore
+from meta_analysis.Study import Study
+from meta_analysis.outcomes.Outcome import Outcome
+
+
+def test_from_studies():
+    outcome1 = Outcome('education', 30, 30, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.03)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2])
+    outcome3 = Outcome('education', 20, 25, effect_size=0.3, variance=0.04)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome3])
+
+    store = OutcomeStore.from_studies([study1, study2])
+    assert len(store) == 3
+    assert store.labels == ['education', 'crime']
+    assert list(store.label_codes) == [0, 1, 0]
+    assert list(store.study_index) == [0, 0, 1]
+    assert list(store.treat_ns) == [30, 25, 20]
+    assert list(store.effect_sizes[store.mask('education')]) == [0.1, 0.3]
+    assert not store.mask('employment').any()
+
+
+def test_append_grows_capacity():
+    store = OutcomeStore(capacity=1)
+    for i in range(100):
+        store.append('crime', i, 10, 10, 0.1 * i, 0.02)
+    assert len(store) == 100
+    assert store.effect_sizes[99] == 0.1 * 99
+    assert store.study_index[99] == 99
+
+
+def test_remove_study():
+    store = OutcomeStore()
+    store.extend(['crime', 'crime'], 0, 10, 10, [0.1, 0.2], [0.01, 0.02])
+    store.extend(['crime'], 1, 10, 10, [0.3], [0.03])
+    store.extend(['education'], 2, 10, 10, [0.4], [0.04])
+
+    store.remove_study(1)
+    assert len(store) == 3
+    assert list(store.effect_sizes) == [0.1, 0.2, 0.4]
+    assert list(store.study_index) == [0, 0, 1]
+
+
+def test_set_estimates():
+    store = OutcomeStore()
+    store.extend(['crime', 'crime'], 0, 10, 10, [0.1, 0.2], [0.01, 0.02])
+    store.set_estimates([1], [0.5], [0.05])
+    assert list(store.effect_sizes) == [0.1, 0.5]
+    assert list(store.variances) == [0.01, 0.05]
+
+
+def test_rows_and_arrays_cache():
+    store = OutcomeStore()
+    store.extend(['crime', 'education', 'crime'], 0, 10, 10, [0.1, 0.2, 0.3], [0.01, 0.02, 0.03])
+    assert list(store.rows('crime')) == [0, 2]
+    assert list(store.rows('employment')) == []
+
+    effect_sizes, variances = store.arrays('crime')
+    assert list(effect_sizes) == [0.1, 0.3]
+    assert store.arrays('crime')[0] is effect_sizes
+    education = store.arrays('education')
+
+    store.append('crime', 1, 10, 10, 0.4, 0.04)
+    assert list(store.arrays('crime')[0]) == [0.1, 0.3, 0.4]
+    assert store.arrays('education') is education
+
+    store.set_estimates([1], [0.5], [0.05])
+    assert list(store.arrays('education')[0]) == [0.5]
+
+
+def test_share():
+    store = OutcomeStore()
+    store.extend(['crime', 'crime'], 0, 10, 10, [0.1, 0.2], [0.01, 0.02])
+    store.extend(['crime'], 1, 10, 10, [0.3], [0.03])
+    shared = store.share()
+    assert shared.effect_sizes.base is store.effect_sizes.base
+
+    shared.append('education', 2, 10, 10, 0.4, 0.04)
+    assert len(store) == 3
+    assert store.labels == ['crime']
+    assert list(shared.effect_sizes) == [0.1, 0.2, 0.3, 0.4]
+
+    shared = store.share()
+    shared.remove_study(0)
+    assert list(shared.effect_sizes) == [0.3]
+    assert list(store.effect_sizes) == [0.1, 0.2, 0.3]
+    assert list(store.arrays('crime')[0]) == [0.1, 0.2, 0.3]
@@ -0,0 +1,127 @@
+from meta_analysis.PoolArchive import PoolArchive
+from meta_analysis.StudyPool import StudyPool
+from meta_analysis.Study import Study
+from meta_analysis.outcomes.Outcome import Outcome
+from meta_analysis.outcomes.BinaryOutcome import BinaryOutcome
+from meta_analysis.outcomes.ContinuousOutcome import ContinuousOutcome
+import numpy as np
+import math
+
+
+def make_pool():
+    binary = BinaryOutcome('crime', 30, 30, 0.4, 0.3, 0.5, 0.45)
+    binary.estimate()
+    continuous = ContinuousOutcome('education', 25, 20, 10.0, 9.0, 2.0, 2.1)
+    continuous.estimate()
+    study1 = Study('note é', 'Kris et al 2019', outcomes=[binary, continuous],
+                   moderators={'year': 2019, 'country': 'US'})
+    study2 = Study('', 'Kris et al 2018', outcomes=[Outcome('crime', 20, 25, 0.3, 0.04, note='hand coded')],
+                   moderators={'year': 2018})
+    study3 = Study('', 'Kris et al 2017', outcomes=[Outcome('crime', 40, 40, 0.1, 0.02)])
+    return StudyPool([study1, study2, study3], outcome_label='crime')
+
+
+def test_round_trip(tmp_path):
+    study_pool = make_pool()
+    path = str(tmp_path / 'pool')
+    study_pool.save(path)
+    loaded = StudyPool.load(path, outcome_label='crime')
+
+    assert isinstance(loaded._store.effect_sizes, np.memmap)
+    assert np.array_equal(loaded.effect_sizes, study_pool.effect_sizes)
+    assert math.isclose(loaded.summarize('re').effect_size, study_pool.summarize('re').effect_size)
+    assert len(loaded.studies) == 3
+    assert loaded.studies._built == {}
+
+    study = loaded.studies[0]
+    assert study.citation == 'Kris et al 2019' and study.note == 'note é'
+    assert study.moderators == {'year': 2019, 'country': 'US'}
+    assert loaded.studies[1].moderators == {'year': 2018}
+    assert loaded.studies[0] is study
+    binary, continuous = study.outcomes
+    original = study_pool.studies[0].outcomes
+    assert isinstance(binary, BinaryOutcome) and isinstance(continuous, ContinuousOutcome)
+    assert binary == original[0] and continuous == original[1]
+    assert binary.method == original[0].method and binary.treat_pre == 0.5 and continuous.treat_pre is None
+    assert loaded.studies[1].outcomes[0].note == 'hand coded'
+    assert list(loaded._store.outcome_ids) == [outcome.id for s in loaded.studies for outcome in s.outcomes]
+    assert loaded.leave_one_out(by='study').unit == ['Kris et al 2019', 'Kris et al 2018', 'Kris et al 2017']
+
+
+def test_modify_loaded(tmp_path):
+    path = str(tmp_path / 'pool')
+    make_pool().save(path)
+    loaded = StudyPool.load(path, outcome_label='crime')
+    copy = loaded.copy()
+
+    loaded.remove_study('Kris et al 2018', inplace=True)
+    loaded.append_study(Study('', 'Kris et al 2020', outcomes=[Outcome('crime', 10, 10, 0.5, 0.05)]))
+    assert [study.citation for study in loaded.studies] == ['Kris et al 2019', 'Kris et al 2017', 'Kris et al 2020']
+    assert np.allclose(loaded.effect_sizes[1:], [0.1, 0.5])
+    assert len(copy.studies) == 3
+    assert np.allclose(copy.effect_sizes[1:], [0.3, 0.1])
+
+    # the mapped files are read-only; edits go to the store's own copy
+    loaded.studies[1].outcomes[0].set_estimate(0.2, 0.02)
+    assert np.allclose(loaded.effect_sizes[1:], [0.2, 0.5])
+    assert np.allclose(PoolArchive(path).store().effect_sizes[2:], [0.3, 0.1])
+
+    # built studies are copied, so edits made through a copy stay in it
+    study = loaded.studies[0]
+    copy = loaded.copy()
+    copy.studies[0].outcomes[0].set_estimate(0.7, 0.07)
+    copy.studies[0].set_citation('copy')
+    assert study.citation == 'Kris et al 2019' and study.outcomes[0].effect_size != 0.7
+    assert loaded.effect_sizes[0] == study.outcomes[0].effect_size and copy.effect_sizes[0] == 0.7
+
+
+def test_unrelated_edits(tmp_path):
+    path = str(tmp_path / 'pool')
+    study_pool = make_pool()
+    study_pool.save(path)
+    loaded = StudyPool.load(path, outcome_label='crime')
+    store = loaded._store
+    loaded.summarize()
+
+    # edits to outcomes of other pools neither rebuild the loaded store nor build its studies
+    study_pool.studies[0].outcomes[0].estimate(use_pre=True)
+    BinaryOutcome('crime', 50, 50, 0.4, 0.3).estimate()
+    study_pool.studies[1].append_outcome(Outcome('crime', 10, 10, 0.2, 0.05))
+    loaded.summarize('re')
+    assert loaded._store is store and isinstance(store.effect_sizes, np.memmap)
+    assert loaded.studies._built == {}
+
+
+def test_append_many(tmp_path):
+    path = str(tmp_path / 'pool')
+    make_pool().save(path)
+    loaded = StudyPool.load(path, outcome_label='crime')
+    added = [Study('', f'Kris et al {2020 + i}', outcomes=[Outcome('crime', 10, 10, 0.1 * i, 0.05)])
+             for i in range(40)]
+    for study in added:
+        loaded.append_study(study)
+    loaded.studies.insert(1, Study('', 'inserted'))
+    loaded.studies.insert(-1, Study('', 'before last'))
+    citations = [study.citation for study in loaded.studies]
+    assert len(citations) == 45 and citations[:3] == ['Kris et al 2019', 'inserted', 'Kris et al 2018']
+    assert citations[-2:] == ['before last', 'Kris et al 2059']
+    assert loaded.studies[-1] is added[-1]
+    assert loaded.studies._buffer.size < 2 * len(loaded.studies)
+
+
+def test_append_outcome_to_loaded(tmp_path):
+    path = str(tmp_path / 'pool')
+    make_pool().save(path)
+    loaded = StudyPool.load(path, outcome_label='crime')
+    added = [Study('', f'Kris et al {2020 + i}', outcomes=[Outcome('crime', 10, 10, 0.1 * i, 0.05)])
+             for i in range(20)]
+    for study in added:
+        loaded.append_study(study)
+    # outcomes appended to built and added studies go to the position of their study
+    loaded.remove_study('Kris et al 2018', inplace=True)
+    loaded.studies[0].append_outcome(Outcome('crime', 10, 10, 0.7, 0.05))
+    added[10].append_outcome(Outcome('crime', 10, 10, 0.8, 0.05))
+    assert not loaded._stale
+    rebuilt = StudyPool(list(loaded.studies), outcome_label='crime')
+    assert np.array_equal(np.sort(loaded.effect_sizes), np.sort(rebuilt.effect_sizes))
+    assert math.isclose(loaded.calculate_ivw_effect_size(), rebuilt.calculate_ivw_effect_size())
@@ -0,0 +1,59 @@
+from meta_analysis.PoolBatch import PoolBatch
+from meta_analysis.StudyPool import StudyPool
+from meta_analysis.Study import Study
+from meta_analysis.outcomes.Outcome import Outcome
+import numpy as np
+import math
+
+
+rng = np.random.default_rng(5)
+sizes = [5, 2, 12, 7]
+effect_sizes = [rng.normal(0.2, 0.4, k) for k in sizes]
+variances = [rng.uniform(0.01, 0.05, k) for k in sizes]
+
+
+def make_pools():
+    pools = []
+    for ys, vs in zip(effect_sizes, variances):
+        studies = [Study('', f'Kris et al {2000 + i}', outcomes=[Outcome('crime', 30, 30, y, v),
+                                                                 Outcome('education', 30, 30, -y, 2 * v)])
+                   for i, (y, v) in enumerate(zip(ys.tolist(), vs.tolist()))]
+        pools.append(StudyPool(studies, outcome_label='crime'))
+    return pools
+
+
+def test_from_pools():
+    pools = make_pools()
+    batch = PoolBatch.from_pools(pools, names=['a', 'b', 'c', 'd'])
+    assert len(batch) == 4 and list(batch.offsets) == [0, 5, 7, 19, 26]
+    for method in ['fe', 're', 'auto']:
+        for tau_square_estimator in ['DL', 'REML', 'PM']:
+            results = batch.results(method=method, tau_square_estimator=tau_square_estimator)
+            for study_pool, result in zip(pools, results):
+                expected = study_pool.summarize(method=method, tau_square_estimator=tau_square_estimator)
+                assert result.method == expected.method
+                assert result.dof == expected.dof
+                for field in ['effect_size', 'variance', 'q', 'p', 'tau_square', 'i_square']:
+                    assert math.isclose(getattr(result, field), getattr(expected, field), rel_tol=1e-6,
+                                        abs_tol=1e-10)
+
+    other = PoolBatch.from_pools(pools, outcome_label='education').result(method='fe')
+    assert np.allclose(other.effect_size, -batch.result(method='fe').effect_size)
+    assert np.array_equal(PoolBatch.from_pools(pools, outcome_label='missing').offsets, [0, 0, 0, 0, 0])
+
+
+def test_from_arrays_and_padded():
+    ragged = PoolBatch.from_arrays(effect_sizes, variances)
+    padded = PoolBatch.from_padded(np.array([np.pad(ys, (0, 12 - ys.size), constant_values=np.nan)
+                                             for ys in effect_sizes]),
+                                   np.array([np.pad(vs, (0, 12 - vs.size), constant_values=np.nan)
+                                             for vs in variances]))
+    assert np.array_equal(ragged.offsets, padded.offsets)
+    assert np.array_equal(ragged.effect_sizes, padded.effect_sizes)
+    result = padded.result(method='re', tau_square_estimator='REML')
+    for i, (ys, vs) in enumerate(zip(effect_sizes, variances)):
+        expected = StudyPool([Study('', str(j), outcomes=[Outcome('crime', 30, 30, y, v)])
+                              for j, (y, v) in enumerate(zip(ys.tolist(), vs.tolist()))],
+                             outcome_label='crime').summarize(method='re', tau_square_estimator='REML')
+        assert math.isclose(result.effect_size[i], expected.effect_size, rel_tol=1e-6)
+        assert math.isclose(result.tau_square[i], expected.tau_square, rel_tol=1e-6, abs_tol=1e-10)
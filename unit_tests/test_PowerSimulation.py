@@ -0,0 +1,58 @@
+from meta_analysis.PowerSimulation import PowerSimulation
+from meta_analysis.StudyPool import StudyPool
+from meta_analysis.Study import Study
+from meta_analysis.outcomes.Outcome import Outcome
+import numpy as np
+import math
+
+
+def test_power():
+    null = PowerSimulation(0.0, method='fe', seed=1).run(4000)
+    assert null.n_replicates == 4000 and null.effect_size_draws.shape == (4000,)
+    assert abs(null.power - 0.05) < 4 * null.power_se
+    assert null.random_effects_rate == 0
+
+    weak = PowerSimulation(0.1, seed=1).run(4000)
+    strong = PowerSimulation(0.1, k=30, seed=1).run(4000)
+    assert null.power < weak.power < strong.power
+    assert math.isclose(strong.effect_size, 0.1, abs_tol=0.01)
+
+    heterogeneous = PowerSimulation(0.2, tau_square=0.05, k=(5, 20), method='re', tau_square_estimator='REML',
+                                    seed=1).run(2000)
+    assert heterogeneous.random_effects_rate == 1
+    assert math.isclose(heterogeneous.tau_square, 0.05, rel_tol=0.3)
+
+
+def test_outcome_types():
+    # coded outcomes lose little power against normal draws; binary outcomes carry less information
+    results = {outcome_type: PowerSimulation(0.2, k=10, outcome_type=outcome_type, method='fe', seed=1).run(2000)
+               for outcome_type in ['normal', 'continuous', 'binary']}
+    normal, continuous, binary = results.values()
+    assert abs(normal.power - continuous.power) < 4 * math.hypot(normal.power_se, continuous.power_se)
+    assert 0.85 < binary.power <= normal.power
+    for result in results.values():
+        assert math.isclose(result.effect_size, 0.2, abs_tol=0.01)
+
+
+def test_reproducible():
+    simulation = PowerSimulation(0.1, k=(3, 9), outcome_type='binary', chunk_size=250, seed=7)
+    first = simulation.run(1000)
+    simulation.n_jobs = 2
+    second = simulation.run(1000)
+    assert np.array_equal(first.effect_size_draws, second.effect_size_draws)
+    assert np.array_equal(first.detected, second.detected)
+
+
+def test_matches_pool():
+    # every replicate is pooled as StudyPool.summarize() would pool the same coded studies
+    for outcome_type in ['binary', 'continuous', 'normal']:
+        simulation = PowerSimulation(0.3, tau_square=0.02, k=(2, 6), outcome_type=outcome_type, seed=3)
+        effect_sizes, variances = simulation.draw(5, np.random.default_rng(3))
+        assert np.isnan(effect_sizes).any() == np.isnan(variances).any()
+        expected = []
+        for ys, vs in zip(effect_sizes, variances):
+            studies = [Study('', str(i), outcomes=[Outcome('crime', 30, 30, y, v)])
+                       for i, (y, v) in enumerate(zip(ys.tolist(), vs.tolist())) if not math.isnan(y)]
+            expected.append(StudyPool(studies, outcome_label='crime').summarize().effect_size)
+        simulation.draw = lambda n_replicates, rng: (effect_sizes, variances)
+        assert np.allclose(simulation._chunk(5, None)[0], expected)
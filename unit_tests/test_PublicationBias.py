@@ -0,0 +1,61 @@
+from meta_analysis.PublicationBias import PublicationBias
+from meta_analysis.MetaSummary import MetaSummary
+import numpy as np
+import math
+
+
+variances = np.array([0.01, 0.02, 0.04, 0.06, 0.09, 0.12, 0.16, 0.2, 0.25, 0.3])
+# small studies report larger effects
+effect_sizes = 0.2 + 1.2 * np.sqrt(variances) + np.array([0.02, -0.03, 0.01, 0.04, -0.02,
+                                                          0.03, -0.01, 0.02, -0.04, 0.01])
+
+
+def test_egger():
+    result = PublicationBias(effect_sizes, variances).egger()
+    standard_errors = np.sqrt(variances)
+    design = np.column_stack([np.ones(variances.size), 1 / standard_errors])
+    expected = np.linalg.lstsq(design, effect_sizes / standard_errors, rcond=None)[0]
+    assert math.isclose(result.intercept, expected[0])
+    assert math.isclose(result.slope, expected[1])
+    assert result.intercept > 0
+    assert result.p < 0.05
+
+
+def test_begg():
+    result = PublicationBias(effect_sizes, variances).begg()
+    assert result.tau > 0
+    assert 0 <= result.p <= 1
+
+
+def test_trim_and_fill():
+    bias = PublicationBias(effect_sizes, variances)
+    full = MetaSummary.from_arrays(effect_sizes, variances)
+    for estimator in ['L0', 'R0']:
+        result = bias.trim_and_fill(estimator=estimator)
+        assert result.side == 'left'
+        assert result.k0 > 0
+        assert result.filled_effect_sizes.size == result.k0
+        assert result.effect_size < full.fe_effect_size
+        # filled effect sizes mirror the largest effect sizes around the trimmed estimate
+        assert np.all(result.filled_effect_sizes < full.fe_effect_size)
+
+    mirrored = PublicationBias(-effect_sizes, variances).trim_and_fill(side='right', method='re')
+    result = bias.trim_and_fill(side='left', method='re')
+    assert mirrored.k0 == result.k0
+    assert math.isclose(mirrored.effect_size, -result.effect_size)
+    assert np.allclose(mirrored.filled_effect_sizes, -result.filled_effect_sizes)
+
+
+def test_trim_and_fill_symmetric():
+    symmetric = np.array([-0.3, -0.1, 0.0, 0.1, 0.3])
+    result = PublicationBias(symmetric, np.full(5, 0.05)).trim_and_fill(side='left')
+    assert result.k0 == 0
+    assert math.isclose(result.effect_size, 0.0, abs_tol=1e-12)
+
+
+def test_pet_peese():
+    result = PublicationBias(effect_sizes, variances).pet_peese()
+    assert abs(result.pet_effect_size - 0.2) < 0.05
+    assert result.method == 'PEESE'
+    assert result.effect_size == result.peese_effect_size
+    assert result.peese_effect_size > result.pet_effect_size
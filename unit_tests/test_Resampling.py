@@ -0,0 +1,41 @@
+from meta_analysis.Resampling import Resampler
+from meta_analysis.MetaSummary import MetaSummary
+from meta_analysis.estimators import RestrictedMaximumLikelihood
+import numpy as np
+import math
+
+
+effect_sizes = np.array([0.1, 0.17, 0.2, 0.3, 0.5, -0.2, 0.8])
+variances = np.array([0.02, 0.03, 0.01, 0.025, 0.035, 0.04, 0.05])
+
+
+def test_bootstrap():
+    summary = MetaSummary.from_arrays(effect_sizes, variances)
+    result = Resampler(effect_sizes, variances, method='re', chunk_size=300, seed=1).bootstrap(n_resamples=1000)
+    assert math.isclose(result.effect_size, summary.re_effect_size)
+    assert math.isclose(result.tau_square, summary.tau_square)
+    assert result.effect_size_draws.shape == (1000,)
+    assert result.effect_size_ci[0] < result.effect_size < result.effect_size_ci[1]
+    assert 0 <= result.tau_square_ci[0] <= result.tau_square_ci[1]
+
+
+def test_reproducible():
+    # resamples with a small tau-square need more than the default 100 Fisher scoring steps to converge
+    reml = RestrictedMaximumLikelihood(max_iter=1000)
+    first = Resampler(effect_sizes, variances, method='re', tau_square_estimator=reml, chunk_size=100, seed=7)
+    second = Resampler(effect_sizes, variances, method='re', tau_square_estimator=reml, chunk_size=100, seed=7,
+                       n_jobs=2)
+    assert np.array_equal(first.bootstrap(n_resamples=400).tau_square_draws,
+                          second.bootstrap(n_resamples=400).tau_square_draws)
+
+
+def test_permutation_test():
+    result = Resampler(effect_sizes, variances, method='fe', seed=3).permutation_test(n_permutations=2000)
+    summary = MetaSummary.from_arrays(effect_sizes, variances)
+    assert math.isclose(result.q, summary.q)
+    assert result.n_permutations == 2000
+    assert 0 < result.effect_size_p < 0.1
+    assert 0 < result.q_p <= 1
+
+    homogeneous = Resampler(np.array([0.0, 0.01, -0.01]), np.array([0.1, 0.1, 0.1]), method='fe', seed=3)
+    assert homogeneous.permutation_test(n_permutations=500).effect_size_p > 0.5
@@ -1,5 +1,5 @@
-from Study import Study
-from outcomes.Outcome import Outcome
+from meta_analysis.Study import Study
+from meta_analysis.outcomes.Outcome import Outcome
 
 
 def test_init_():
@@ -58,4 +58,46 @@ def test_get_outcomes_by_label():
     edu_outcome_list = study.get_outcomes_by_label('education')
     assert len(edu_outcome_list) == 2
     for outcome in edu_outcome_list:
-        assert outcome.label == 'education'
\ No newline at end of file
+        assert outcome.label == 'education'
+
+
+def test_copy():
+    outcome1 = Outcome('education', 30, 30)
+    outcome2 = Outcome('education', 25, 25)
+    study = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2], moderators={'year': 2019})
+    cpy = study.copy()
+    assert cpy.outcomes[0] is not outcome1 and cpy.outcomes[0] == outcome1
+    cpy.set_moderator('year', 2020)
+    assert study.get_moderator('year') == 2019
+    cpy.set_citation('Kris et al 2020')
+    cpy.outcomes[0].set_estimate(0.5, 0.1)
+    cpy.get_outcome_by_id(outcome1.id).set_n(10, 10)
+    study.copy().outcomes[0].set_estimate(0.6, 0.1)
+    assert study.citation == 'Kris et al 2019'
+    assert outcome1.get_estimate() == (0.0, float('inf')) and outcome1.get_n() == (30, 30)
+    assert cpy.outcomes[0].get_estimate() == (0.5, 0.1)
+
+    reduced = study.remove_outcome(outcome1.id)
+    assert len(reduced.outcomes) == 1
+    assert len(study.outcomes) == 2
+
+    detached = cpy.detach_outcome(outcome2.id)
+    detached.set_n(5, 5)
+    assert outcome2.treat_n == 25
+    assert cpy.get_outcome_by_id(outcome2.id).treat_n == 5
+
+
+def test_outcome_index():
+    outcome1 = Outcome('education', 30, 30)
+    outcome2 = Outcome('education', 25, 25)
+    study = Study("hello", "Kris et al 2019", outcomes=[outcome1])
+    assert study.get_outcome_by_id(outcome1.id) is outcome1
+    study.outcomes.append(outcome2)
+    assert study.get_outcome_by_id(outcome2.id) is outcome2
+    study.outcomes = [outcome2]
+    assert study.get_outcome_by_id(outcome1.id) is False
+    try:
+        study.remove_outcome(outcome1.id)
+        assert False
+    except ValueError:
+        pass
@@ -1,7 +1,10 @@
-from StudyPool import StudyPool
-from Study import Study
-from outcomes.Outcome import Outcome
+from meta_analysis.StudyPool import StudyPool
+from meta_analysis.Study import Study
+from meta_analysis.outcomes.Outcome import Outcome
+from meta_analysis.outcomes.BinaryOutcome import BinaryOutcome
+import numpy as np
 import math
+import pickle
 
 
 def test_set_outcome():
@@ -35,9 +38,9 @@ def test_calculate_q():
 
     study_pool = StudyPool([study1, study2], outcome_label='crime')
     q, dof, p = study_pool.calculate_q()
-    assert math.isclose(q, 16.1418558826177, rel_tol=1e6)
+    assert math.isclose(q, 3.33, rel_tol=1e-9)
     assert dof == 4
-    assert math.isclose(p, 0.00283460303776, rel_tol=1e6)
+    assert math.isclose(p, 0.504193103521982, rel_tol=1e-6)
 
 
 def test_calculate_re():
@@ -111,3 +114,454 @@ def test_meta_analysis():
     assert math.isclose(fe_variance, meta_var_fe)
     assert math.isclose(re_variance, meta_var_re)
     assert math.isclose(re_variance, meta_var_auto)
+
+
+def test_remove_study():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1])
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.3, variance=0.025)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome2, outcome3])
+    outcome4 = Outcome('crime', 25, 25, effect_size=0.5, variance=0.035)
+    study3 = Study("hello", "Kris et al 2017", outcomes=[outcome4])
+
+    study_pool = StudyPool([study1, study2, study3], outcome_label='crime')
+    reduced_pool = study_pool.remove_study('Kris et al 2018')
+    assert len(study_pool.studies) == 3
+    assert len(reduced_pool.studies) == 2
+    assert list(reduced_pool.effect_sizes) == [0.1, 0.5]
+
+
+def test_set_outcome_after_edit():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1])
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome2])
+
+    study_pool = StudyPool([study1, study2], outcome_label='crime')
+    outcome1.set_estimate(0.4, 0.05)
+    study2.append_outcome(Outcome('crime', 25, 25, effect_size=0.3, variance=0.03))
+    study_pool.set_outcome('crime')
+    assert list(study_pool.effect_sizes) == [0.4, 0.2, 0.3]
+    assert list(study_pool.variances) == [0.05, 0.01, 0.03]
+
+
+def test_edit_invalidates_holding_pools_only():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    study_pool = StudyPool([Study('', 'Kris et al 2019', outcomes=[outcome1]),
+                            Study('', 'Kris et al 2018', outcomes=[outcome2])], outcome_label='crime')
+    other_pool = StudyPool([Study('', 'Kris et al 2017', outcomes=[Outcome('crime', 25, 25, 0.3, 0.02)]),
+                            Study('', 'Kris et al 2016', outcomes=[Outcome('crime', 25, 25, 0.4, 0.02)])],
+                           outcome_label='crime')
+    store = other_pool._store
+
+    outcome1.set_estimate(0.4, 0.05)
+    Outcome('crime', 25, 25).set_estimate(0.5, 0.01)
+    assert study_pool._stale and not other_pool._stale
+    assert list(study_pool.effect_sizes) == [0.4, 0.2]
+    other_pool.meta_analysis(method='fe')
+    assert other_pool._store is store
+
+    # unpickled pools are notified of edits to their own outcomes
+    copy = pickle.loads(pickle.dumps(study_pool))
+    copy.studies[1].outcomes[0].set_estimate(0.6, 0.01)
+    assert list(copy.effect_sizes) == [0.4, 0.6]
+    assert list(study_pool.effect_sizes) == [0.4, 0.2]
+
+
+def test_set_outcome_cache():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('education', 25, 25, effect_size=0.2, variance=0.01)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2])
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.3, variance=0.03)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome3])
+
+    study_pool = StudyPool([study1, study2], outcome_label='crime')
+    crime_effect_sizes = study_pool.effect_sizes
+    study_pool.set_outcome('education')
+    study_pool.set_outcome('crime')
+    assert study_pool.effect_sizes is crime_effect_sizes
+
+    outcome3.set_estimate(0.6, 0.06)
+    study_pool.set_outcome('crime')
+    assert list(study_pool.effect_sizes) == [0.1, 0.6]
+
+    study_pool.append_study(Study("hello", "Kris et al 2017",
+                                  outcomes=[Outcome('crime', 25, 25, effect_size=0.7, variance=0.07)]))
+    study_pool.set_outcome('crime')
+    assert list(study_pool.effect_sizes) == [0.1, 0.6, 0.7]
+
+
+def test_summarize():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2])
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    outcome4 = Outcome('crime', 25, 25, effect_size=0.3, variance=0.025)
+    outcome5 = Outcome('crime', 25, 25, effect_size=0.5, variance=0.035)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome3, outcome4, outcome5])
+
+    study_pool = StudyPool([study1, study2], outcome_label='crime')
+    result = study_pool.summarize(method='auto')
+    q, dof, p = study_pool.calculate_q()
+    assert result.method == 'fe'
+    assert result.effect_size == study_pool.calculate_ivw_effect_size(method='fe')
+    assert result.variance == study_pool.calculate_variance(method='fe')
+    assert (result.q, result.dof, result.p) == (q, dof, p)
+    assert result.tau_square == study_pool.calculate_re()
+    assert result.i_square == study_pool.calculate_i_square()
+    assert study_pool.summary() is study_pool.summary()
+
+
+def test_incremental_append_remove():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2])
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome3])
+    outcome4 = Outcome('crime', 25, 25, effect_size=0.3, variance=0.025)
+    outcome5 = Outcome('crime', 25, 25, effect_size=0.5, variance=0.035)
+    study3 = Study("hello", "Kris et al 2017", outcomes=[outcome4, outcome5])
+
+    study_pool = StudyPool([study1, study2], outcome_label='crime')
+    study_pool.summarize()
+    study_pool.append_study(study3)
+    full_pool = StudyPool([study1, study2, study3], outcome_label='crime')
+    assert math.isclose(study_pool.calculate_q()[0], full_pool.calculate_q()[0])
+    assert math.isclose(study_pool.calculate_re(), full_pool.calculate_re())
+    assert math.isclose(study_pool.calculate_ivw_effect_size(method='re'),
+                        full_pool.calculate_ivw_effect_size(method='re'))
+    assert len(study_pool.effect_sizes) == 5
+
+    study_pool.remove_study('Kris et al 2017', inplace=True)
+    assert len(study_pool.studies) == 2
+    assert study_pool.summary().k == 3
+    assert list(study_pool.effect_sizes) == [0.1, 0.17, 0.2]
+
+
+def test_build_by_appends():
+    studies = [Study("hello", f"Kris et al {i}", outcomes=[Outcome('crime', 25, 25, 0.01 * i, 0.02)]) for i in range(2)]
+    study_pool = StudyPool(studies, outcome_label='crime')
+    study_pool.summarize()
+    for i in range(2, 300):
+        study = Study("hello", f"Kris et al {i}", outcomes=[Outcome('crime', 25, 25, 0.01 * i, 0.02)])
+        study_pool.append_study(study)
+        study_pool.studies[i // 2].append_outcome(Outcome('crime', 25, 25, -0.01 * i, 0.03))
+        if i % 50 == 0:
+            study_pool.remove_study(f"Kris et al {i - 25}", inplace=True)
+    assert not study_pool._stale
+    rebuilt = StudyPool(list(study_pool.studies), outcome_label='crime')
+    assert np.array_equal(np.sort(study_pool.effect_sizes), np.sort(rebuilt.effect_sizes))
+    assert math.isclose(study_pool.calculate_ivw_effect_size(), rebuilt.calculate_ivw_effect_size())
+    k = len(study_pool.effect_sizes)
+
+    # a study held twice cannot be placed in the store and leaves it to a rebuild
+    study_pool.append_study(study_pool.studies[0])
+    study_pool.studies[0].append_outcome(Outcome('crime', 25, 25, 0.5, 0.02))
+    assert study_pool._stale
+    assert len(study_pool.effect_sizes) == k + 1 + len(study_pool.studies[0].outcomes)
+
+
+def test_append_estimated_outcome(tmp_path):
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1])
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome2])
+    study_pool = StudyPool([study1, study2], outcome_label='crime')
+    study_pool.summarize()
+    store = study_pool._store
+
+    outcome3 = BinaryOutcome('crime', 50, 50, 0.4, 0.3)
+    outcome3.estimate()
+    study1.append_outcome(outcome3)
+    outcome4 = BinaryOutcome('crime', 60, 60, 0.2, 0.3)
+    outcome4.estimate()
+    study_pool.append_study(Study("hello", "Kris et al 2017", outcomes=[outcome4]))
+    assert not study_pool._stale and study_pool._store is store
+
+    full_pool = StudyPool([Study("hello", "Kris et al 2019", outcomes=[outcome1.copy(), outcome3.copy()]),
+                           study2, Study("hello", "Kris et al 2017", outcomes=[outcome4.copy()])],
+                          outcome_label='crime')
+    assert math.isclose(study_pool.calculate_q()[0], full_pool.calculate_q()[0])
+    assert math.isclose(study_pool.calculate_ivw_effect_size(), full_pool.calculate_ivw_effect_size())
+
+    # rows are mapped to their outcomes explicitly, though the appended row is not next to its study's
+    result = study_pool.subgroup_analysis(lambda outcome: outcome.treat_n, by='outcome', method='fe')
+    assert result.groups == [25, 50, 60]
+    assert np.allclose(result.within.effect_size[1:], [outcome3.effect_size, outcome4.effect_size])
+    assert study_pool.cumulative(key=lambda outcome: outcome.treat_n, by='outcome').unit == \
+        [outcome1.id, outcome2.id, outcome3.id, outcome4.id]
+
+    study_pool.save(tmp_path)
+    loaded = StudyPool.load(tmp_path, outcome_label='crime')
+    assert [outcome.effect_size for outcome in loaded.studies[0].outcomes] == \
+        [outcome1.effect_size, outcome3.effect_size]
+    assert math.isclose(loaded.calculate_q()[0], full_pool.calculate_q()[0])
+
+
+def test_tau_square_estimator():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2])
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    outcome4 = Outcome('crime', 25, 25, effect_size=0.3, variance=0.025)
+    outcome5 = Outcome('crime', 25, 25, effect_size=0.5, variance=0.035)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome3, outcome4, outcome5])
+
+    study_pool = StudyPool([study1, study2], outcome_label='crime')
+    tau_square = study_pool.calculate_re(tau_square_estimator='REML')
+    ivw = 1 / (study_pool.variances + tau_square)
+    effect_size = study_pool.calculate_ivw_effect_size(method='re', tau_square_estimator='REML')
+    variance = study_pool.calculate_variance(method='re', tau_square_estimator='REML')
+    assert math.isclose(effect_size, np.dot(ivw, study_pool.effect_sizes) / ivw.sum())
+    assert math.isclose(variance, 1 / ivw.sum())
+    assert study_pool.meta_analysis(method='re', tau_square_estimator='REML') == (effect_size, variance)
+    assert study_pool.summarize(method='re', tau_square_estimator='REML').tau_square_estimator == 'REML'
+    assert study_pool.calculate_re() == study_pool.calculate_re(tau_square_estimator='DL')
+
+
+def test_meta_analysis_by_label():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('education', 25, 25, effect_size=0.17, variance=0.03)
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2, outcome3])
+    outcome4 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    outcome5 = Outcome('education', 25, 25, effect_size=0.3, variance=0.025)
+    outcome6 = Outcome('crime', 25, 25, effect_size=0.5, variance=0.035)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome4, outcome5, outcome6])
+
+    study_pool = StudyPool([study1, study2], outcome_label='crime')
+    table = study_pool.meta_analysis_by_label()
+    assert list(table) == ['crime', 'education']
+    for label in table:
+        study_pool.set_outcome(label)
+        expected = study_pool.summarize(method='auto')
+        result = table[label]
+        assert result.method == expected.method
+        assert result.dof == expected.dof
+        for field in ['effect_size', 'variance', 'q', 'p', 'tau_square', 'i_square']:
+            assert math.isclose(getattr(result, field), getattr(expected, field))
+
+    table = study_pool.meta_analysis_by_label(['education'], method='re', tau_square_estimator='PM')
+    study_pool.set_outcome('education')
+    assert list(table) == ['education']
+    assert math.isclose(table['education'].effect_size,
+                        study_pool.calculate_ivw_effect_size(method='re', tau_square_estimator='PM'))
+
+
+def test_leave_one_out():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2])
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    outcome4 = Outcome('education', 25, 25, effect_size=0.3, variance=0.025)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome3, outcome4])
+    outcome5 = Outcome('crime', 25, 25, effect_size=0.5, variance=0.035)
+    study3 = Study("hello", "Kris et al 2017", outcomes=[outcome5])
+
+    study_pool = StudyPool([study1, study2, study3], outcome_label='crime')
+    result = study_pool.leave_one_out(by='outcome', method='re')
+    assert result.unit == [outcome1.id, outcome2.id, outcome3.id, outcome5.id]
+
+    result = study_pool.leave_one_out(by='study', method='re')
+    assert result.unit == ['Kris et al 2019', 'Kris et al 2018', 'Kris et al 2017']
+    for i, citation in enumerate(result.unit):
+        reduced_pool = study_pool.remove_study(citation)
+        reduced_pool.set_outcome('crime')
+        assert math.isclose(result.effect_size[i], reduced_pool.calculate_ivw_effect_size(method='re'))
+        assert math.isclose(result.variance[i], reduced_pool.calculate_variance(method='re'))
+        assert math.isclose(result.q[i], reduced_pool.calculate_q()[0])
+
+
+def test_bootstrap():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2])
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    outcome4 = Outcome('crime', 25, 25, effect_size=0.3, variance=0.025)
+    outcome5 = Outcome('crime', 25, 25, effect_size=0.5, variance=0.035)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome3, outcome4, outcome5])
+
+    study_pool = StudyPool([study1, study2], outcome_label='crime')
+    result = study_pool.bootstrap(n_resamples=500, method='re', seed=0)
+    assert result.method == 're'
+    assert math.isclose(result.effect_size, study_pool.calculate_ivw_effect_size(method='re'))
+    result = study_pool.permutation_test(n_permutations=500, method='fe', seed=0)
+    assert math.isclose(result.q, study_pool.calculate_q()[0])
+
+
+def test_cumulative():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2])
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    outcome4 = Outcome('crime', 40, 40, effect_size=0.3, variance=0.025)
+    outcome5 = Outcome('theft', 25, 25, effect_size=0.5, variance=0.035)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome3, outcome4, outcome5])
+
+    study_pool = StudyPool([study1, study2], outcome_label='crime')
+    result = study_pool.cumulative(key=lambda study: study.citation)
+    assert result.unit == ['Kris et al 2018', 'Kris et al 2019']
+    assert list(result.k) == [2, 4]
+    assert math.isclose(result.effect_size[0], (0.2 / 0.01 + 0.3 / 0.025) / (1 / 0.01 + 1 / 0.025))
+    assert math.isclose(result.effect_size[1], study_pool.calculate_ivw_effect_size())
+
+    result = study_pool.cumulative(key=lambda outcome: -outcome.treat_n, by='outcome', method='re')
+    assert result.unit[0] == outcome4.id
+    assert math.isclose(result.effect_size[-1], study_pool.calculate_ivw_effect_size(method='re'))
+
+
+def test_meta_regression():
+    study1 = Study("hello", "Kris et al 2019", outcomes=[Outcome('crime', 25, 25, effect_size=0.1, variance=0.02),
+                                                         Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)],
+                   moderators={'dose': 1})
+    study2 = Study("hello", "Kris et al 2018", outcomes=[Outcome('crime', 25, 25, effect_size=0.5, variance=0.01)],
+                   moderators={'dose': 3})
+    study3 = Study("hello", "Kris et al 2017", outcomes=[Outcome('crime', 25, 25, effect_size=0.3, variance=0.025)])
+    study3.set_moderator('dose', 2)
+
+    study_pool = StudyPool([study1, study2, study3], outcome_label='crime')
+    result = study_pool.meta_regression(['dose'], method='fe')
+    assert result.moderators == ['intercept', 'dose']
+    assert result.qe_dof == 2
+    model = study_pool.regression_model(['dose'])
+    assert np.array_equal(model.design[:, 1], [1, 1, 3, 2])
+
+    study3.moderators = {}
+    try:
+        study_pool.meta_regression(['dose'])
+        assert False
+    except ValueError:
+        pass
+
+
+def test_subgroup_analysis():
+    study1 = Study("hello", "Kris et al 2019", outcomes=[Outcome('crime', 25, 25, effect_size=0.1, variance=0.02),
+                                                         Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)],
+                   moderators={'country': 'US'})
+    study2 = Study("hello", "Kris et al 2018", outcomes=[Outcome('crime', 25, 25, effect_size=0.5, variance=0.01)],
+                   moderators={'country': 'UK'})
+    study3 = Study("hello", "Kris et al 2017", outcomes=[Outcome('crime', 25, 25, effect_size=0.3, variance=0.025)],
+                   moderators={'country': 'US'})
+
+    study_pool = StudyPool([study1, study2, study3], outcome_label='crime')
+    result = study_pool.subgroup_analysis(lambda study: study.moderators['country'], method='fe')
+    assert result.groups == ['US', 'UK']
+    assert list(result.within.dof) == [2, 0]
+    assert math.isclose(result.within.effect_size[1], 0.5)
+    us = (0.1 / 0.02 + 0.17 / 0.03 + 0.3 / 0.025) / (1 / 0.02 + 1 / 0.03 + 1 / 0.025)
+    assert math.isclose(result.within.effect_size[0], us)
+
+    result = study_pool.subgroup_analysis(lambda outcome: outcome.effect_size > 0.15, by='outcome', method='fe')
+    assert result.groups == [False, True]
+
+
+def test_publication_bias():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2])
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    outcome4 = Outcome('crime', 25, 25, effect_size=0.3, variance=0.025)
+    outcome5 = Outcome('crime', 25, 25, effect_size=0.5, variance=0.035)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome3, outcome4, outcome5])
+
+    study_pool = StudyPool([study1, study2], outcome_label='crime')
+    assert 0 <= study_pool.egger_test().p <= 1
+    assert -1 <= study_pool.begg_test().tau <= 1
+    result = study_pool.trim_and_fill()
+    assert result.k0 == len(result.filled_effect_sizes)
+    assert study_pool.pet_peese().method in ('PET', 'PEESE')
+
+
+def test_gosh():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2])
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome3])
+
+    study_pool = StudyPool([study1, study2], outcome_label='crime')
+    result = study_pool.gosh()
+    assert result.shape == (7,)
+    assert math.isclose(result['effect_size'][-1], study_pool.calculate_ivw_effect_size())
+
+
+def test_copy_on_write():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.17, variance=0.03)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1, outcome2])
+    outcome3 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome3])
+    outcome4 = Outcome('crime', 25, 25, effect_size=0.3, variance=0.025)
+    study3 = Study("hello", "Kris et al 2017", outcomes=[outcome4])
+
+    study_pool = StudyPool([study1, study2, study3], outcome_label='crime')
+    effect_size = study_pool.calculate_ivw_effect_size()
+    cpy = study_pool.copy()
+    assert cpy.studies[0] is not study1 and cpy.studies[0].outcomes[0] is not outcome1
+    assert cpy.effect_sizes is study_pool.effect_sizes
+
+    # edits made through the copy stay in the copy
+    cpy.studies[0].outcomes[0].set_estimate(0.9, 0.05)
+    cpy.studies[1].set_citation('Kris et al 2000')
+    assert outcome1.get_estimate() == (0.1, 0.02) and study2.citation == 'Kris et al 2018'
+    assert cpy.effect_sizes[0] == 0.9 and study_pool.effect_sizes[0] == 0.1
+    assert not study_pool._stale
+    study_pool.copy(full=False).studies[0].outcomes[1].set_estimate(0.9, 0.05)
+    assert outcome2.get_estimate() == (0.17, 0.03)
+
+    reduced_pool = study_pool.remove_study('Kris et al 2018')
+    assert len(study_pool.studies) == 3
+    assert list(study_pool.effect_sizes) == [0.1, 0.17, 0.2, 0.3]
+    assert list(reduced_pool.effect_sizes) == [0.1, 0.17, 0.3]
+    assert math.isclose(study_pool.calculate_ivw_effect_size(), effect_size)
+
+    cpy.append_study(Study("hello", "Kris et al 2016", outcomes=[Outcome('crime', 25, 25, 0.5, 0.05)]))
+    assert len(study_pool.effect_sizes) == 4
+    assert len(cpy.effect_sizes) == 5
+
+
+def test_copy_shares_untouched_studies():
+    outcome1 = Outcome('crime', 25, 25, effect_size=0.1, variance=0.02)
+    study1 = Study("hello", "Kris et al 2019", outcomes=[outcome1])
+    outcome2 = Outcome('crime', 25, 25, effect_size=0.2, variance=0.01)
+    study2 = Study("hello", "Kris et al 2018", outcomes=[outcome2])
+    study3 = Study("hello", "Kris et al 2017", outcomes=[Outcome('crime', 25, 25, effect_size=0.3, variance=0.025)])
+
+    study_pool = StudyPool([study1, study2, study3], outcome_label='crime')
+    cpy = study_pool.copy()
+    reduced_pool = study_pool.remove_study('Kris et al 2018')
+    assert all(a is b for a, b in zip(cpy.studies._objects(), [study1, study2, study3]))
+    assert all(a is b for a, b in zip(reduced_pool.studies._objects(), [study1, study3]))
+
+    # edits made through the original are copied away from the other pools first
+    outcome1.set_estimate(0.5, 0.04)
+    study2.append_outcome(Outcome('crime', 25, 25, effect_size=0.6, variance=0.05))
+    study3.set_moderator('year', 2017)
+    assert list(study_pool.effect_sizes) == [0.5, 0.2, 0.6, 0.3]
+    assert list(cpy.effect_sizes) == [0.1, 0.2, 0.3]
+    assert list(reduced_pool.effect_sizes) == [0.1, 0.3]
+    assert cpy.studies[2].moderators == {} and reduced_pool.studies[1].moderators == {}
+    assert study_pool.studies[0] is study1 and study_pool.studies[2] is study3
+    assert cpy.studies[0] is not study1 and cpy.studies[0].outcomes[0].get_estimate() == (0.1, 0.02)
+    assert not cpy._stale and not reduced_pool._stale
+
+    # a copied study is no longer notified of edits to the original
+    outcome2.set_estimate(0.7, 0.03)
+    assert list(cpy.effect_sizes) == [0.1, 0.2, 0.3]
+    assert study_pool.effect_sizes[1] == 0.7
+
+
+def test_fixed_effects_without_scipy():
+    import os
+    import subprocess
+    import sys
+    script = ('import sys\n'
+              'from meta_analysis import StudyPool, Study\n'
+              'from meta_analysis.outcomes import Outcome\n'
+              'studies = [Study("", str(i), outcomes=[Outcome("crime", 25, 25, 0.1 * i, 0.02)]) for i in range(3)]\n'
+              'StudyPool(studies, outcome_label="crime").meta_analysis(method="auto")\n'
+              'assert "scipy" not in sys.modules\n')
+    subprocess.run([sys.executable, '-c', script], check=True,
+                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+from meta_analysis.Subgroup import Subgroup
+from meta_analysis.MetaSummary import MetaSummary
+import numpy as np
+import math
+
+
+effect_sizes = np.array([0.1, 0.17, 0.2, 0.3, 0.5, -0.2, 0.8])
+variances = np.array([0.02, 0.03, 0.01, 0.025, 0.035, 0.04, 0.05])
+offsets = np.array([0, 3, 7])
+
+
+def test_groups():
+    for method in ['fe', 're']:
+        result = Subgroup(effect_sizes, variances, offsets).result(method=method, groups=['a', 'b'])
+        assert result.groups == ['a', 'b']
+        estimates = []
+        for i, (start, stop) in enumerate(zip(offsets[:-1], offsets[1:])):
+            expected = MetaSummary.from_arrays(effect_sizes[start:stop], variances[start:stop]).result(method)
+            assert math.isclose(result.within.effect_size[i], expected.effect_size)
+            assert math.isclose(result.within.variance[i], expected.variance)
+            assert math.isclose(result.within.q[i], expected.q)
+            estimates.append((expected.effect_size, expected.variance))
+        (y1, v1), (y2, v2) = estimates
+        mean = (y1 / v1 + y2 / v2) / (1 / v1 + 1 / v2)
+        assert math.isclose(result.q_between, (y1 - mean) ** 2 / v1 + (y2 - mean) ** 2 / v2)
+        assert result.dof_between == 1
+        assert 0 <= result.p_between <= 1
+
+
+def test_fixed_effects_partition():
+    # under fixed effects the between-group Q is the total Q minus the within-group Qs
+    result = Subgroup(effect_sizes, variances, offsets).result(method='fe')
+    weights = 1 / variances
+    pooled = np.dot(weights, effect_sizes) / weights.sum()
+    total = np.dot(weights, np.square(effect_sizes - pooled))
+    within = 0.0
+    for start, stop in zip(offsets[:-1], offsets[1:]):
+        group_weights = weights[start:stop]
+        group_mean = np.dot(group_weights, effect_sizes[start:stop]) / group_weights.sum()
+        within += np.dot(group_weights, np.square(effect_sizes[start:stop] - group_mean))
+    assert math.isclose(result.q_between, total - within)
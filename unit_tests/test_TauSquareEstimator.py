@@ -0,0 +1,71 @@
+from meta_analysis.estimators import TauSquareEstimator, DerSimonianLaird, RestrictedMaximumLikelihood, PauleMandel
+from meta_analysis.MetaSummary import MetaSummary
+import numpy as np
+import math
+
+
+effect_sizes = np.array([0.1, 0.17, 0.2, 0.3, 0.5, -0.2, 0.8])
+variances = np.array([0.02, 0.03, 0.01, 0.025, 0.035, 0.04, 0.05])
+
+
+def test_from_name():
+    assert isinstance(TauSquareEstimator.from_name('reml'), RestrictedMaximumLikelihood)
+    estimator = PauleMandel(tol=1e-6)
+    assert TauSquareEstimator.from_name(estimator) is estimator
+    try:
+        TauSquareEstimator.from_name('XX')
+    except ValueError:
+        pass
+    else:
+        assert False
+
+
+def test_dersimonian_laird():
+    summary = MetaSummary.from_arrays(effect_sizes, variances)
+    assert math.isclose(DerSimonianLaird().estimate(effect_sizes, variances), summary.tau_square)
+    # moment estimate from Q = sum(w * (y - mean)^2) computed directly
+    weights = 1 / variances
+    q = np.dot(weights, np.square(effect_sizes - np.dot(weights, effect_sizes) / weights.sum()))
+    expected = (q - 6) / (weights.sum() - np.square(weights).sum() / weights.sum())
+    assert math.isclose(DerSimonianLaird().estimate(effect_sizes, variances), expected)
+    # six-study example of Borenstein et al. (2009), Introduction to Meta-Analysis: Q = 11.7433, C = 185.857
+    assert math.isclose(DerSimonianLaird().estimate(np.array([0.095, 0.277, 0.367, 0.664, 0.462, 0.185]),
+                                                    np.array([0.033, 0.031, 0.050, 0.011, 0.043, 0.023])),
+                        (11.743341 - 5) / 185.856718, rel_tol=1e-6)
+    # DL and PM agree that a pool whose Q is below its degrees of freedom is homogeneous
+    homogeneous = (np.array([0.1, 0.17, 0.2, 0.3, 0.5]), np.array([0.02, 0.03, 0.01, 0.025, 0.035]))
+    assert DerSimonianLaird().estimate(*homogeneous) == PauleMandel().estimate(*homogeneous) == 0
+
+
+def test_iterative_estimators():
+    # reference values from direct numerical optimization / root finding of the
+    # likelihood, restricted likelihood and generalized Q equation
+    assert math.isclose(TauSquareEstimator.from_name('ML').estimate(effect_sizes, variances),
+                        0.0253290224854, rel_tol=1e-6)
+    assert math.isclose(TauSquareEstimator.from_name('REML').estimate(effect_sizes, variances),
+                        0.0414043989195, rel_tol=1e-6)
+    assert math.isclose(TauSquareEstimator.from_name('PM').estimate(effect_sizes, variances),
+                        0.0574464893994, rel_tol=1e-9)
+    assert math.isclose(TauSquareEstimator.from_name('SJ').estimate(effect_sizes, variances),
+                        0.0667214104648, rel_tol=1e-9)
+
+
+def test_no_heterogeneity():
+    for name in ['DL', 'ML', 'REML', 'PM', 'SJ']:
+        tau_square = TauSquareEstimator.from_name(name).estimate(np.array([0.1, 0.1, 0.1]),
+                                                                 np.array([0.02, 0.03, 0.01]))
+        assert tau_square == 0
+
+
+def test_estimate_batch():
+    pools = [(effect_sizes, variances), (effect_sizes[:4], variances[:4]), (effect_sizes[:1], variances[:1])]
+    padded_effect_sizes = TauSquareEstimator.pad([pool[0] for pool in pools])
+    padded_variances = TauSquareEstimator.pad([pool[1] for pool in pools])
+    assert padded_effect_sizes.shape == (3, 7)
+    assert np.isnan(padded_effect_sizes[1, 4:]).all()
+    for name in ['DL', 'ML', 'REML', 'PM', 'SJ']:
+        estimator = TauSquareEstimator.from_name(name)
+        batch = estimator.estimate_batch(padded_effect_sizes, padded_variances)
+        for tau_square, pool in zip(batch, pools):
+            assert math.isclose(tau_square, estimator.estimate(*pool), rel_tol=1e-9, abs_tol=1e-12)
+        assert batch[2] == 0
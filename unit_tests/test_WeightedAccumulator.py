@@ -0,0 +1,46 @@
+from meta_analysis.WeightedAccumulator import WeightedAccumulator
+from meta_analysis.MetaSummary import MetaSummary
+import numpy as np
+import math
+
+
+def test_add_remove():
+    effect_sizes = np.array([0.1, 0.17, 0.2, 0.3, 0.5])
+    variances = np.array([0.02, 0.03, 0.01, 0.025, 0.035])
+    accumulator = WeightedAccumulator()
+    for effect_size, variance in zip(effect_sizes, variances):
+        accumulator.add(effect_size, variance)
+    accumulator.add(0.9, 0.001)
+    accumulator.remove(0.9, 0.001)
+
+    summary = accumulator.summary()
+    expected = MetaSummary.from_arrays(effect_sizes, variances)
+    assert summary.k == 5
+    assert math.isclose(summary.fe_effect_size, expected.fe_effect_size)
+    assert math.isclose(summary.q, expected.q)
+    assert math.isclose(summary.tau_square, expected.tau_square)
+
+
+def test_compensated_sums():
+    rng = np.random.default_rng(0)
+    effect_sizes = rng.normal(0, 1, 20000)
+    variances = rng.uniform(1e-4, 1, 20000)
+    accumulator = WeightedAccumulator.from_arrays(effect_sizes[:10], variances[:10])
+    for effect_size, variance in zip(effect_sizes[10:], variances[10:]):
+        accumulator.add(effect_size, variance)
+    for effect_size, variance in zip(effect_sizes[:-10], variances[:-10]):
+        accumulator.remove(effect_size, variance)
+
+    summary = accumulator.summary()
+    expected = MetaSummary.from_arrays(effect_sizes[-10:], variances[-10:])
+    assert summary.k == 10
+    assert math.isclose(summary.sum_w, expected.sum_w, rel_tol=1e-12)
+    assert math.isclose(summary.sum_wy2, expected.sum_wy2, rel_tol=1e-12)
+
+
+def test_empty():
+    accumulator = WeightedAccumulator()
+    accumulator.add(0.5, 0.01)
+    accumulator.remove(0.5, 0.01)
+    assert accumulator.k == 0
+    assert accumulator.summary().sum_w == 0